@@ -1,6 +1,6 @@
 from django.contrib import admin
 from unfold.admin import ModelAdmin
-from .models import Alteration, Tailor, Customer
+from .models import Alteration, Tailor, Customer, Notification
 
 
 # ===============================
@@ -37,7 +37,7 @@ class TailorAdmin(ModelAdmin):
 @admin.register(Customer)
 class CustomerAdmin(ModelAdmin):
     list_display = ["name", "phone_number", "email"]
-    search_fields = ["name", "phone_number", "email"]
+    search_fields = ["name", "phone_number", "phone_e164", "email"]
     ordering = ["name"]
     list_per_page = 20
 
@@ -105,3 +105,17 @@ class AlterationAdmin(ModelAdmin):
             },
         ),
     )
+
+
+# ===============================
+# Notification Outbox Admin
+# ===============================
+@admin.register(Notification)
+class NotificationAdmin(ModelAdmin):
+    list_display = ["id", "channel", "recipient", "status", "attempts", "next_attempt_at", "sent_at"]
+    list_filter = ["status", "channel", "created_at"]
+    search_fields = ["recipient", "dedup_key", "alteration__id"]
+    readonly_fields = ["alteration", "dedup_key", "attempts", "last_error", "created_at", "sent_at"]
+    list_select_related = ["alteration"]
+    ordering = ["-created_at"]
+    list_per_page = 50
@@ -1,36 +1,272 @@
-from datetime import datetime, timedelta
-import random
+import json
+import os
+import threading
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+
+
+def model_path():
+    return str(getattr(settings, 'ALTERATION_PICKUP_MODEL_PATH', 'alteration_pickup_model.json'))
+
+
+def _normalise_outfit(outfit_type):
+    return (outfit_type or '').strip().lower()
+
+
+def _tailor_key(tailor_id):
+    return '' if tailor_id in (None, '') else str(tailor_id)
+
 
 class AlterationPredictor:
-    # Simple rule-based prediction (can be replaced with ML model)
+    """Pickup-time model trained on completed alterations.
+
+    Turnaround is modelled in log-days as a ridge regression over one-hot
+    outfit type and tailor, the number of outfits and the workshop queue
+    depth when the job came in. Parameters are plain JSON, so a saved model
+    loads without unpickling and every prediction is one matrix product.
+    """
+
+    # Fallback turnaround (days) until a model has been trained
     OUTFIT_TIMES = {
-        'Bridal': 7,  # days
-        'Lehenga': 5,
-        'Suit': 3,
-        'Dress': 2,
-        'Blouse': 1,
+        'bridal': 7,
+        'lehenga': 5,
+        'suit': 3,
+        'dress': 2,
+        'blouse': 1,
     }
-    
-    TAILOR_EFFICIENCY = {
-        'experienced': 0.8,  # 20% faster
-        'standard': 1.0,
-        'new': 1.3,  # 30% slower
+    DEFAULT_DAYS = 3
+    FALLBACK_CONFIDENCE = 0.5
+
+    def __init__(self, params=None):
+        self.params = params
+        if params:
+            self._outfit_index = {name: i for i, name in enumerate(params['outfit_types'])}
+            self._tailor_index = {key: i for i, key in enumerate(params['tailors'])}
+            self._coef = np.asarray(params['coef'], dtype=float)
+
+    @property
+    def is_trained(self):
+        return self.params is not None
+
+    @property
+    def version(self):
+        return self.params['version'] if self.params else None
+
+    def _design_matrix(self, outfit_types, tailor_ids, number_of_outfits, queue_depths,
+                       outfit_index, tailor_index):
+        n = len(outfit_types)
+        n_outfits = len(outfit_index)
+        X = np.zeros((n, 3 + n_outfits + len(tailor_index)))
+        X[:, 0] = 1.0
+        X[:, 1] = np.log1p(np.asarray(number_of_outfits, dtype=float))
+        X[:, 2] = np.log1p(np.asarray(queue_depths, dtype=float))
+
+        outfit_cols = np.array([outfit_index.get(_normalise_outfit(o), -1) for o in outfit_types], dtype=int)
+        tailor_cols = np.array([tailor_index.get(_tailor_key(t), -1) for t in tailor_ids], dtype=int)
+        rows = np.arange(n)
+        known_outfit = outfit_cols >= 0
+        known_tailor = tailor_cols >= 0
+        X[rows[known_outfit], 3 + outfit_cols[known_outfit]] = 1.0
+        X[rows[known_tailor], 3 + n_outfits + tailor_cols[known_tailor]] = 1.0
+        return X, known_outfit
+
+    @classmethod
+    def fit(cls, outfit_types, tailor_ids, number_of_outfits, queue_depths, durations, alpha=1.0):
+        """Fit on parallel sequences; ``durations`` are turnaround times in days."""
+        outfit_names = sorted({_normalise_outfit(o) for o in outfit_types} - {''})
+        tailor_keys = sorted({_tailor_key(t) for t in tailor_ids} - {''})
+        outfit_index = {name: i for i, name in enumerate(outfit_names)}
+        tailor_index = {key: i for i, key in enumerate(tailor_keys)}
+
+        predictor = cls()
+        X, _ = predictor._design_matrix(
+            outfit_types, tailor_ids, number_of_outfits, queue_depths, outfit_index, tailor_index
+        )
+        y = np.log1p(np.clip(np.asarray(durations, dtype=float), 0, None))
+
+        # Ridge solve; the intercept is left unpenalised
+        penalty = alpha * np.eye(X.shape[1])
+        penalty[0, 0] = 0.0
+        coef = np.linalg.solve(X.T @ X + penalty, X.T @ y)
+
+        predicted_days = np.expm1(X @ coef)
+        within_a_day = np.abs(predicted_days - np.asarray(durations, dtype=float)) <= 1.0
+
+        params = {
+            'version': timezone.now().strftime('%Y%m%d%H%M%S'),
+            'alpha': alpha,
+            'n_samples': int(len(y)),
+            'outfit_types': outfit_names,
+            'tailors': tailor_keys,
+            'coef': coef.tolist(),
+            'confidence': round(float(within_a_day.mean()), 4),
+        }
+        return cls(params)
+
+    def predict_days(self, outfit_types, tailor_ids, number_of_outfits, queue_depths):
+        """Vectorised turnaround prediction.
+
+        Returns ``(days, confidence)`` as float arrays aligned with the inputs.
+        """
+        n = len(outfit_types)
+        if not self.is_trained:
+            days = np.array(
+                [self.OUTFIT_TIMES.get(_normalise_outfit(o), self.DEFAULT_DAYS) for o in outfit_types],
+                dtype=float,
+            )
+            return days, np.full(n, self.FALLBACK_CONFIDENCE)
+
+        X, known_outfit = self._design_matrix(
+            outfit_types, tailor_ids, number_of_outfits, queue_depths,
+            self._outfit_index, self._tailor_index,
+        )
+        days = np.clip(np.expm1(X @ self._coef), 0.5, None)
+        confidence = np.where(known_outfit, self.params['confidence'], self.params['confidence'] * 0.8)
+        return days, confidence
+
+    def predict_pickup_dates(self, outfit_types, tailor_ids, number_of_outfits, queue_depths, start_dates=None):
+        """Pickup dates for many jobs at once; ``start_dates`` default to today."""
+        days, confidence = self.predict_days(outfit_types, tailor_ids, number_of_outfits, queue_depths)
+        today = timezone.localdate()
+        if start_dates is None:
+            start_dates = [today] * len(days)
+        whole_days = np.ceil(days).astype(int).tolist()
+        dates = [max(start + timedelta(days=d), today) for start, d in zip(start_dates, whole_days)]
+        return dates, confidence
+
+    def predict_pickup_date(self, outfit_type, tailor_id=None, number_of_outfits=1, queue_depth=0):
+        dates, confidence = self.predict_pickup_dates(
+            [outfit_type], [tailor_id], [number_of_outfits], [queue_depth]
+        )
+        return dates[0], round(float(confidence[0]), 2)
+
+    def save(self, path=None):
+        """Write the model atomically so running processes never see a partial file."""
+        path = path or model_path()
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.params, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=None):
+        with open(path or model_path()) as f:
+            return cls(json.load(f))
+
+
+_cache_lock = threading.Lock()
+_cache = {'key': None, 'predictor': AlterationPredictor()}
+
+
+def get_predictor():
+    """Process-wide predictor, reloaded when a new model file is saved."""
+    path = model_path()
+    try:
+        stat = os.stat(path)
+        key = (path, stat.st_mtime_ns, stat.st_size)
+    except FileNotFoundError:
+        key = None
+
+    if key != _cache['key']:
+        with _cache_lock:
+            if key != _cache['key']:
+                _cache['predictor'] = AlterationPredictor.load(path) if key else AlterationPredictor()
+                _cache['key'] = key
+    return _cache['predictor']
+
+
+def queue_depths_at(created_ts, all_created_ts, all_completed_ts):
+    """Open jobs in the workshop at each of ``created_ts`` (epoch seconds).
+
+    Jobs still open have ``nan`` completion times and never leave the queue.
+    """
+    created_sorted = np.sort(np.asarray(all_created_ts, dtype=float))
+    completed = np.asarray(all_completed_ts, dtype=float)
+    completed_sorted = np.sort(completed[~np.isnan(completed)])
+    t = np.asarray(created_ts, dtype=float)
+    return np.searchsorted(created_sorted, t, side='left') - np.searchsorted(completed_sorted, t, side='right')
+
+
+def current_queue_depth():
+    from .models import Alteration
+    return Alteration.objects.exclude(status='COMPLETED').count()
+
+
+def intake_queue_depths(created_ts):
+    """Queue depth when each job came in, computed as for training."""
+    from .models import Alteration
+
+    rows = Alteration.objects.values_list('status', 'created_at', 'updated_at')
+    all_created = [r[1].timestamp() for r in rows]
+    all_completed = [r[2].timestamp() if r[0] == 'COMPLETED' else np.nan for r in rows]
+    return queue_depths_at(created_ts, all_created, all_completed)
+
+
+def load_training_data():
+    """Feature columns and turnaround (days) for every completed alteration.
+
+    Completion time is the ``updated_at`` of rows in COMPLETED status.
+    """
+    from .models import Alteration
+
+    rows = list(
+        Alteration.objects.values_list(
+            'outfit_type', 'tailor_id', 'number_of_outfits', 'status', 'created_at', 'updated_at'
+        )
+    )
+    if not rows:
+        return None
+
+    created = np.array([r[4].timestamp() for r in rows])
+    completed = np.array([r[5].timestamp() if r[3] == 'COMPLETED' else np.nan for r in rows])
+    depths = queue_depths_at(created, created, completed)
+
+    done = ~np.isnan(completed)
+    idx = np.flatnonzero(done)
+    return {
+        'outfit_types': [rows[i][0] for i in idx],
+        'tailor_ids': [rows[i][1] for i in idx],
+        'number_of_outfits': [rows[i][2] for i in idx],
+        'queue_depths': depths[done],
+        'durations': (completed[done] - created[done]) / 86400.0,
+        'created': created[done],
     }
-    
-    def predict_pickup_date(self, outfit_type, tailor_id=None):
-        base_days = self.OUTFIT_TIMES.get(outfit_type, 3)
-        
-        # Add tailor efficiency factor
-        if tailor_id:
-            # Simple efficiency based on tailor specialties
-            efficiency = self.TAILOR_EFFICIENCY['standard']
-        else:
-            efficiency = self.TAILOR_EFFICIENCY['standard']
-        
-        # Add some randomness for complexity
-        complexity_factor = random.uniform(0.8, 1.2)
-        
-        total_days = int(base_days * efficiency * complexity_factor)
-        pickup_date = datetime.now().date() + timedelta(days=total_days)
-        
-        return pickup_date, min(0.9, 0.7 + (0.2 * random.random()))
\ No newline at end of file
+
+
+def refresh_pickup_predictions(queryset):
+    """Predict and store ``predicted_pickup_date`` for every alteration in ``queryset``.
+
+    The model was trained on the queue depth each job met at intake, so that
+    is what existing jobs are predicted with, not today's queue. Runs two
+    selects and one ``bulk_update`` regardless of how many jobs are
+    refreshed. Returns ``(alterations, confidence)``.
+    """
+    from api.sync import log_changes
+    from .models import Alteration
+
+    alterations = list(
+        queryset.only('id', 'outfit_type', 'tailor_id', 'number_of_outfits', 'created_at', 'predicted_pickup_date', 'updated_at')
+    )
+    if not alterations:
+        return alterations, np.array([])
+
+    depths = intake_queue_depths([a.created_at.timestamp() for a in alterations])
+    dates, confidence = get_predictor().predict_pickup_dates(
+        [a.outfit_type for a in alterations],
+        [a.tailor_id for a in alterations],
+        [a.number_of_outfits for a in alterations],
+        depths,
+        start_dates=[timezone.localdate(a.created_at) for a in alterations],
+    )
+    # bulk_update skips auto_now; updated_at feeds the conditional GET validators
+    now = timezone.now()
+    for alteration, pickup_date in zip(alterations, dates):
+        alteration.predicted_pickup_date = pickup_date
+        alteration.updated_at = now
+    Alteration.objects.bulk_update(alterations, ['predicted_pickup_date', 'updated_at'])
+    # bulk_update sends no post_save, so tell the sync feed directly
+    log_changes(Alteration, [a.pk for a in alterations])
+    return alterations, confidence
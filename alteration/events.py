@@ -0,0 +1,169 @@
+"""Push channel for alteration status changes.
+
+Model signals publish the id of each saved or deleted alteration; the
+broadcaster fans it out to every connected status-board stream in this
+process, loading the board payload once per change and only when a stream
+is connected, so saves cost no extra queries on an idle board. With
+``ALTERATION_EVENTS_BACKEND = 'postgres'`` events go through
+``pg_notify`` and each worker process relays them from a single LISTEN
+connection, so every screen sees changes made by any worker.
+"""
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections, connection
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = 'alteration_events'
+QUEUE_SIZE = 500
+
+
+def alteration_event(alteration):
+    """Board payload for one alteration; join ``customer`` and ``tailor`` before calling."""
+    return {
+        'type': 'change',
+        'id': alteration.pk,
+        'status': alteration.status,
+        'outfit_type': alteration.outfit_type,
+        'number_of_outfits': alteration.number_of_outfits,
+        'customer_name': alteration.customer.name,
+        'tailor_name': alteration.tailor.name if alteration.tailor_id else None,
+        'predicted_pickup_date': alteration.predicted_pickup_date,
+        'updated_at': alteration.updated_at,
+    }
+
+
+def load_event(event):
+    """The board payload for a ``saved`` event, or a delete if the alteration is gone."""
+    from .models import Alteration
+    if event['type'] != 'saved':
+        return event
+    alteration = Alteration.objects.select_related('customer', 'tailor').filter(pk=event['id']).first()
+    return alteration_event(alteration) if alteration else {'type': 'delete', 'id': event['id']}
+
+
+class Broadcaster:
+    """Fans events out to asyncio queues, one per connected client."""
+
+    def __init__(self):
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self):
+        queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.add((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, queue):
+        with self._lock:
+            self._subscribers = {(loop, q) for loop, q in self._subscribers if q is not queue}
+
+    @property
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+    def publish(self, event):
+        self.publish_local(event)
+
+    def publish_local(self, event):
+        """Deliver to subscribers in this process; safe to call from any thread."""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        if not subscribers:
+            return
+        event = load_event(event)
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(_offer, queue, event)
+            except RuntimeError:
+                # The subscriber's event loop has closed
+                self.unsubscribe(queue)
+
+
+def _offer(queue, event):
+    try:
+        queue.put_nowait(event)
+    except asyncio.QueueFull:
+        # A client that cannot keep up gets a fresh snapshot instead of a backlog
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait({'type': 'resync'})
+
+
+class PostgresBroadcaster(Broadcaster):
+    """Routes events through LISTEN/NOTIFY so all worker processes receive them."""
+
+    def __init__(self):
+        super().__init__()
+        self._listener = None
+
+    def subscribe(self):
+        self._ensure_listener()
+        return super().subscribe()
+
+    def publish(self, event):
+        payload = json.dumps(event, cls=DjangoJSONEncoder)
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, %s)', [CHANNEL, payload])
+
+    def _ensure_listener(self):
+        with self._lock:
+            if self._listener is None or not self._listener.is_alive():
+                self._listener = threading.Thread(target=self._listen, name='alteration-events-listener', daemon=True)
+                self._listener.start()
+
+    def _connect(self):
+        import psycopg2
+        db = settings.DATABASES['default']
+        conn = psycopg2.connect(
+            dbname=db['NAME'], user=db.get('USER'), password=db.get('PASSWORD'),
+            host=db.get('HOST') or None, port=db.get('PORT') or None,
+        )
+        conn.autocommit = True
+        return conn
+
+    def _listen(self):
+        while True:
+            conn = None
+            try:
+                conn = self._connect()
+                with conn.cursor() as cursor:
+                    cursor.execute(f'LISTEN {CHANNEL}')
+                while True:
+                    if select.select([conn], [], [], 30) == ([], [], []):
+                        continue
+                    conn.poll()
+                    close_old_connections()
+                    while conn.notifies:
+                        self.publish_local(json.loads(conn.notifies.pop(0).payload))
+            except Exception:
+                logger.exception('Alteration event listener failed; reconnecting')
+                if conn is not None:
+                    conn.close()
+                time.sleep(5)
+
+
+_broadcaster = None
+_broadcaster_lock = threading.Lock()
+
+
+def get_broadcaster():
+    global _broadcaster
+    if _broadcaster is None:
+        with _broadcaster_lock:
+            if _broadcaster is None:
+                backend = getattr(settings, 'ALTERATION_EVENTS_BACKEND', 'local')
+                _broadcaster = PostgresBroadcaster() if backend == 'postgres' else Broadcaster()
+    return _broadcaster
+
+
+def format_sse(event_name, data):
+    return f'event: {event_name}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n'
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from alteration.models import Customer
+from alteration.utils import normalize_phone
+
+class Command(BaseCommand):
+    help = 'Backfill Customer.phone_e164 from phone_number in primary-key batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_pk = 0
+        scanned = updated = 0
+
+        while True:
+            batch = list(
+                Customer.objects.filter(pk__gt=last_pk)
+                .order_by('pk')
+                .only('id', 'phone_number', 'phone_e164')[:batch_size]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            scanned += len(batch)
+
+            changed = []
+            for customer in batch:
+                normalized = normalize_phone(customer.phone_number)
+                if customer.phone_e164 != normalized:
+                    customer.phone_e164 = normalized
+                    changed.append(customer)
+            Customer.objects.bulk_update(changed, ['phone_e164'], batch_size=500)
+            updated += len(changed)
+
+        self.stdout.write(f'Normalised {updated} of {scanned} customer phone numbers')
@@ -0,0 +1,13 @@
+import time
+from django.core.management.base import BaseCommand
+from alteration.ai_service import refresh_pickup_predictions
+from alteration.models import Alteration
+
+class Command(BaseCommand):
+    help = 'Recompute predicted pickup dates for all open alterations (run nightly)'
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        alterations, _ = refresh_pickup_predictions(Alteration.objects.exclude(status='COMPLETED'))
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f'Refreshed {len(alterations)} pickup predictions in {elapsed:.2f}s')
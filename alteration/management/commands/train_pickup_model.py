@@ -0,0 +1,41 @@
+import numpy as np
+from django.core.management.base import BaseCommand
+from alteration.ai_service import AlterationPredictor, load_training_data, model_path
+
+class Command(BaseCommand):
+    help = 'Train the alteration pickup-time model from completed alterations'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--alpha', type=float, default=1.0, help='Ridge regularisation strength')
+        parser.add_argument('--min-samples', type=int, default=20)
+        parser.add_argument('--holdout', type=float, default=0.2,
+                            help='Share of the most recent jobs held out to report MAE')
+
+    def handle(self, *args, **options):
+        data = load_training_data()
+        n = 0 if data is None else len(data['durations'])
+        if n < options['min_samples']:
+            self.stdout.write(f'Only {n} completed alterations, need {options["min_samples"]} to train')
+            return
+
+        columns = ['outfit_types', 'tailor_ids', 'number_of_outfits', 'queue_depths']
+        order = np.argsort(data['created'])
+        split = int(n * (1 - options['holdout']))
+        train_idx, test_idx = order[:split], order[split:]
+
+        def take(idx):
+            return [[data[c][i] for i in idx] for c in columns]
+
+        if len(test_idx):
+            holdout_model = AlterationPredictor.fit(
+                *take(train_idx), data['durations'][train_idx], alpha=options['alpha']
+            )
+            predicted, _ = holdout_model.predict_days(*take(test_idx))
+            mae = float(np.mean(np.abs(predicted - data['durations'][test_idx])))
+            self.stdout.write(f'Holdout MAE on {len(test_idx)} recent jobs: {mae:.2f} days')
+
+        predictor = AlterationPredictor.fit(
+            *take(order), data['durations'][order], alpha=options['alpha']
+        )
+        predictor.save()
+        self.stdout.write(f'Saved pickup model {predictor.version} ({n} samples) to {model_path()}')
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:31
+
+from django.db import migrations, models
+
+
+def backfill_ready_at(apps, schema_editor):
+    Alteration = apps.get_model('alteration', 'Alteration')
+    Alteration.objects.filter(status='READY').update(ready_at=models.F('updated_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alteration', '0005_customer_phone_e164'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='alteration',
+            name='ready_at',
+            field=models.DateTimeField(blank=True, editable=False, help_text='When the alteration last became ready for pickup', null=True),
+        ),
+        migrations.RunPython(backfill_ready_at, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,10 @@
 from django.db import models
+from django.db.models.functions import Upper
+from django.contrib.postgres.indexes import OpClass
+from django.utils import timezone
 from supplier.models import Order
 from sku.models import ProductSKU
+from .utils import normalize_phone
 
 class Tailor(models.Model):
     name = models.CharField(max_length=255)
@@ -14,10 +18,27 @@ class Tailor(models.Model):
 class Customer(models.Model):
     name = models.CharField(max_length=255)
     phone_number = models.CharField(max_length=20)
+    # Normalised copy of phone_number used for lookups; kept in sync in save().
+    # Not unique: family members often share a number.
+    phone_e164 = models.CharField(max_length=20, blank=True, editable=False)
     email = models.EmailField(blank=True)
     chest = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)
     waist = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)
     length = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # pattern_ops indexes serve LIKE 'prefix%' regardless of the database collation
+            models.Index(fields=['phone_e164'], name='customer_phone_e164_idx', opclasses=['varchar_pattern_ops']),
+            models.Index(OpClass(Upper('name'), name='text_pattern_ops'), name='customer_name_upper_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.phone_e164 = normalize_phone(self.phone_number)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'phone_number' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'phone_e164'}
+        super().save(*args, **kwargs)
     
     def __str__(self):
         return self.name
@@ -40,8 +61,57 @@ class Alteration(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
     notes = models.TextField(blank=True)
     predicted_pickup_date = models.DateField(null=True, blank=True)
+    ready_at = models.DateTimeField(null=True, blank=True, editable=False, help_text="When the alteration last became ready for pickup")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    def save(self, *args, **kwargs):
+        if self.status != 'READY':
+            self.ready_at = None
+        elif self.ready_at is None:
+            self.ready_at = timezone.now()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'status' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'ready_at'}
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"Alteration {self.pk} - {self.status}"
+
+
+class Notification(models.Model):
+    """Outbox row written alongside the change that triggers a customer message.
+
+    ``send_notifications`` drains pending rows in batches; ``dedup_key`` makes
+    enqueueing idempotent so the same event is never delivered twice.
+    """
+    CHANNEL_CHOICES = [
+        ('SMS', 'SMS'),
+        ('EMAIL', 'Email'),
+    ]
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('SENT', 'Sent'),
+        ('FAILED', 'Failed'),
+    ]
+
+    alteration = models.ForeignKey(Alteration, on_delete=models.SET_NULL, null=True, blank=True, related_name='notifications')
+    channel = models.CharField(max_length=10, choices=CHANNEL_CHOICES)
+    recipient = models.CharField(max_length=255)
+    subject = models.CharField(max_length=255, blank=True)
+    message = models.TextField()
+    dedup_key = models.CharField(max_length=255, unique=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='notification_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.channel} to {self.recipient} - {self.status}"
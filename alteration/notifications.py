@@ -0,0 +1,237 @@
+"""Customer notification outbox: enqueueing, delivery backends and the worker loop.
+
+Views only ever write ``Notification`` rows inside their own transaction;
+``send_notifications`` picks them up later, so a slow SMS or mail provider
+never blocks a request.
+"""
+import json
+import sys
+from datetime import timedelta
+from functools import lru_cache
+
+import requests
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Notification
+
+DEFAULT_BACKENDS = {
+    'SMS': 'alteration.notifications.ConsoleBackend',
+    'EMAIL': 'alteration.notifications.ConsoleBackend',
+}
+MAX_ATTEMPTS = 6
+RETRY_BASE_SECONDS = 30
+
+
+class BaseBackend:
+    """Delivers notifications for one channel.
+
+    ``open``/``close`` bracket a batch so backends can reuse one connection
+    for every message in it.
+    """
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def send(self, notification):
+        raise NotImplementedError
+
+
+class ConsoleBackend(BaseBackend):
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def send(self, notification):
+        self.stream.write(f'[{notification.channel}] {notification.recipient}: {notification.message}\n')
+
+
+class FileBackend(BaseBackend):
+    """Appends one JSON line per message to ``NOTIFICATION_FILE_PATH``; handy in tests."""
+
+    def __init__(self, path=None):
+        self.path = path or getattr(settings, 'NOTIFICATION_FILE_PATH', 'notifications.log')
+        self._file = None
+
+    def open(self):
+        self._file = open(self.path, 'a')
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def send(self, notification):
+        self._file.write(json.dumps({
+            'id': notification.pk,
+            'channel': notification.channel,
+            'recipient': notification.recipient,
+            'subject': notification.subject,
+            'message': notification.message,
+        }) + '\n')
+
+
+class SMTPBackend(BaseBackend):
+    """Sends through Django's configured email backend over one connection per batch."""
+
+    def __init__(self):
+        self.connection = None
+
+    def open(self):
+        self.connection = get_connection()
+        self.connection.open()
+
+    def close(self):
+        if self.connection:
+            self.connection.close()
+            self.connection = None
+
+    def send(self, notification):
+        email = EmailMessage(
+            subject=notification.subject or 'Laajavab Boutique',
+            body=notification.message,
+            to=[notification.recipient],
+            connection=self.connection,
+        )
+        email.send(fail_silently=False)
+
+
+class SMSGatewayBackend(BaseBackend):
+    """POSTs to an HTTP SMS gateway configured by ``NOTIFICATION_SMS_GATEWAY``.
+
+    The ``requests.Session`` lives as long as the backend, so keep-alive
+    connections are reused across batches.
+    """
+
+    def __init__(self):
+        config = getattr(settings, 'NOTIFICATION_SMS_GATEWAY', {})
+        self.url = config.get('url')
+        self.sender = config.get('sender', '')
+        self.timeout = config.get('timeout', 10)
+        self.session = requests.Session()
+        if config.get('token'):
+            self.session.headers['Authorization'] = f"Bearer {config['token']}"
+
+    def send(self, notification):
+        response = self.session.post(self.url, json={
+            'to': notification.recipient,
+            'from': self.sender,
+            'message': notification.message,
+        }, timeout=self.timeout)
+        response.raise_for_status()
+
+
+@lru_cache(maxsize=None)
+def get_backend(channel):
+    backends = {**DEFAULT_BACKENDS, **getattr(settings, 'NOTIFICATION_BACKENDS', {})}
+    return import_string(backends[channel])()
+
+
+def build_ready_notifications(alterations):
+    """Unsaved 'ready for pickup' notifications; ``customer`` must be loaded.
+
+    The dedup key includes ``ready_at``, which only changes when the
+    alteration moves to READY, so other saves never notify again but a job
+    that becomes ready a second time does. Rows marked ready without
+    ``save()`` have no ``ready_at`` and are keyed on ``created_at`` instead.
+    """
+    notifications = []
+    for alteration in alterations:
+        customer = alteration.customer
+        ready_at = alteration.ready_at or alteration.created_at
+        message = f"Hello {customer.name}, your {alteration.outfit_type} alteration is ready for pickup!"
+        targets = [('SMS', customer.phone_number), ('EMAIL', customer.email)]
+        for channel, recipient in targets:
+            if not recipient:
+                continue
+            notifications.append(Notification(
+                alteration=alteration,
+                channel=channel,
+                recipient=recipient,
+                subject='Your alteration is ready',
+                message=message,
+                dedup_key=f'ready:{alteration.pk}:{channel}:{ready_at.isoformat()}',
+            ))
+    return notifications
+
+
+def enqueue(notifications, batch_size=1000):
+    """Insert outbox rows, skipping any whose ``dedup_key`` already exists.
+
+    Returns the notifications that were actually inserted. Skipped rows get no
+    primary key from an ignore-conflicts insert, so they are told apart by the
+    ``created_at`` stamped on each instance.
+    """
+    notifications = list(notifications)
+    Notification.objects.bulk_create(notifications, batch_size=batch_size, ignore_conflicts=True)
+    stored = set(
+        Notification.objects.filter(dedup_key__in=[n.dedup_key for n in notifications])
+        .values_list('dedup_key', 'created_at')
+    )
+    return [n for n in notifications if (n.dedup_key, n.created_at) in stored]
+
+
+def retry_delay(attempts):
+    return timedelta(seconds=RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+
+
+def _record_failure(notification, error, max_attempts):
+    notification.attempts += 1
+    notification.last_error = f'{type(error).__name__}: {error}'
+    if notification.attempts >= max_attempts:
+        notification.status = 'FAILED'
+    else:
+        notification.next_attempt_at = timezone.now() + retry_delay(notification.attempts)
+
+
+def deliver_pending(batch_size=100, max_attempts=MAX_ATTEMPTS):
+    """Send one batch of due notifications and return ``(sent, failed)``.
+
+    Rows stay locked (``SKIP LOCKED``) while they are delivered, so several
+    workers can drain the outbox concurrently without double sending.
+    """
+    sent = failed = 0
+    with transaction.atomic():
+        batch = list(
+            Notification.objects.select_for_update(skip_locked=True)
+            .filter(status='PENDING', next_attempt_at__lte=timezone.now())
+            .order_by('next_attempt_at')[:batch_size]
+        )
+        by_channel = {}
+        for notification in batch:
+            by_channel.setdefault(notification.channel, []).append(notification)
+
+        for channel, notifications in by_channel.items():
+            backend = get_backend(channel)
+            try:
+                backend.open()
+            except Exception as e:
+                for notification in notifications:
+                    _record_failure(notification, e, max_attempts)
+                failed += len(notifications)
+                continue
+            try:
+                for notification in notifications:
+                    try:
+                        backend.send(notification)
+                    except Exception as e:
+                        _record_failure(notification, e, max_attempts)
+                        failed += 1
+                    else:
+                        notification.attempts += 1
+                        notification.status = 'SENT'
+                        notification.sent_at = timezone.now()
+                        notification.last_error = ''
+                        sent += 1
+            finally:
+                backend.close()
+
+        Notification.objects.bulk_update(
+            batch, ['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at']
+        )
+    return sent, failed
@@ -0,0 +1,18 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .events import get_broadcaster
+from .models import Alteration
+
+
+@receiver(post_save, sender=Alteration)
+def publish_alteration_saved(sender, instance, **kwargs):
+    # Only the id: the payload is loaded after commit, and only if a board is open
+    event = {'type': 'saved', 'id': instance.pk}
+    transaction.on_commit(lambda: get_broadcaster().publish(event))
+
+
+@receiver(post_delete, sender=Alteration)
+def publish_alteration_deleted(sender, instance, **kwargs):
+    event = {'type': 'delete', 'id': instance.pk}
+    transaction.on_commit(lambda: get_broadcaster().publish(event))
@@ -0,0 +1,227 @@
+"""PDF job tags and tailor run sheets for alterations.
+
+Page geometry and fonts are worked out once per process; each document then
+only draws the per-job text and QR code into the precomputed slots.
+"""
+import tempfile
+from functools import lru_cache
+from itertools import groupby
+
+from django.conf import settings
+from django.utils import timezone
+from reportlab.graphics import renderPDF
+from reportlab.graphics.barcode.qr import QrCodeWidget
+from reportlab.graphics.shapes import Drawing
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.units import inch
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen import canvas
+
+from .models import Alteration
+
+# 4" x 2" tags, ten to a letter sheet (Avery 5163 and compatible stock)
+DEFAULT_TAG_LAYOUT = {
+    'page_width': letter[0],
+    'page_height': letter[1],
+    'columns': 2,
+    'rows': 5,
+    'tag_width': 4 * inch,
+    'tag_height': 2 * inch,
+    'margin_left': 0.16 * inch,
+    'margin_top': 0.5 * inch,
+    'gutter_x': 0.19 * inch,
+    'gutter_y': 0,
+}
+
+FRAME_FORM = 'alteration_tag_frame'
+SPOOL_MAX_SIZE = 1024 * 1024
+
+
+@lru_cache(maxsize=None)
+def get_fonts():
+    """Regular and bold font names, registering ``ALTERATION_TAG_FONTS`` TTFs on first use."""
+    configured = getattr(settings, 'ALTERATION_TAG_FONTS', None)
+    if not configured:
+        return 'Helvetica', 'Helvetica-Bold'
+    names = []
+    for style in ('regular', 'bold'):
+        name = f'AlterationTag-{style}'
+        pdfmetrics.registerFont(TTFont(name, configured[style]))
+        names.append(name)
+    return tuple(names)
+
+
+@lru_cache(maxsize=None)
+def get_layout():
+    """Tag size and the lower-left corner of every slot on a page, top row first."""
+    layout = {**DEFAULT_TAG_LAYOUT, **getattr(settings, 'ALTERATION_TAG_LAYOUT', {})}
+    slots = []
+    for row in range(layout['rows']):
+        top = layout['page_height'] - layout['margin_top'] - row * (layout['tag_height'] + layout['gutter_y'])
+        for column in range(layout['columns']):
+            x = layout['margin_left'] + column * (layout['tag_width'] + layout['gutter_x'])
+            slots.append((x, top - layout['tag_height']))
+    return {
+        'pagesize': (layout['page_width'], layout['page_height']),
+        'tag_width': layout['tag_width'],
+        'tag_height': layout['tag_height'],
+        'slots': tuple(slots),
+    }
+
+
+def _fit(text, font, size, width):
+    """Truncate ``text`` with an ellipsis so it fits within ``width`` points."""
+    text = ' '.join(str(text or '').split())
+    if pdfmetrics.stringWidth(text, font, size) <= width:
+        return text
+    while text and pdfmetrics.stringWidth(text + '…', font, size) > width:
+        text = text[:-1]
+    return text + '…'
+
+
+def _draw_frame_form(c, layout):
+    """Static part of every tag, stored once per document as a form XObject."""
+    regular, bold = get_fonts()
+    width, height = layout['tag_width'], layout['tag_height']
+    c.beginForm(FRAME_FORM)
+    c.setLineWidth(0.5)
+    c.setDash(2, 2)
+    c.rect(0, 0, width, height)
+    c.setDash()
+    c.setFont(bold, 8)
+    c.drawString(8, height - 14, 'LAAJAVAB BOUTIQUE · ALTERATION')
+    c.endForm()
+
+
+def _draw_qr(c, url, x, y, size):
+    widget = QrCodeWidget(url)
+    x1, y1, x2, y2 = widget.getBounds()
+    drawing = Drawing(size, size, transform=[size / (x2 - x1), 0, 0, size / (y2 - y1), 0, 0])
+    drawing.add(widget)
+    renderPDF.draw(drawing, c, x, y)
+
+
+def _draw_tag(c, alteration, status_url, layout):
+    regular, bold = get_fonts()
+    width, height = layout['tag_width'], layout['tag_height']
+    qr_size = height - 28
+    text_width = width - qr_size - 24
+
+    c.doForm(FRAME_FORM)
+    c.setFont(bold, 14)
+    c.drawString(8, height - 32, f'#{alteration.id}')
+    c.setFont(regular, 9)
+    lines = [
+        f'Customer: {alteration.customer.name}',
+        f'Phone: {alteration.customer.phone_number}',
+        f'Outfit: {alteration.outfit_type} x{alteration.number_of_outfits}',
+        f'Issue: {alteration.issue_description}',
+        f'Tailor: {alteration.tailor.name if alteration.tailor else "-"}',
+        f'Pickup: {alteration.predicted_pickup_date or "-"}',
+        f'Status: {alteration.get_status_display()}',
+    ]
+    if alteration.sku:
+        lines.append(f'SKU: {alteration.sku.sku_code}')
+    lines.append(f'Notes: {alteration.notes or "-"}')
+    y = height - 46
+    for line in lines:
+        c.drawString(8, y, _fit(line, regular, 9, text_width))
+        y -= 10
+    _draw_qr(c, status_url(alteration), width - qr_size - 8, 8, qr_size)
+
+
+def render_tags(alterations, status_url):
+    """Render job tags, N per page, into a spooled file positioned at the start.
+
+    ``alterations`` should come with ``customer``, ``tailor`` and ``sku``
+    already joined; ``status_url`` maps an alteration to the URL encoded in
+    its QR code.
+    """
+    layout = get_layout()
+    slots = layout['slots']
+    output = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    c = canvas.Canvas(output, pagesize=layout['pagesize'])
+    _draw_frame_form(c, layout)
+
+    for i, alteration in enumerate(alterations):
+        if i and i % len(slots) == 0:
+            c.showPage()
+        x, y = slots[i % len(slots)]
+        c.saveState()
+        c.translate(x, y)
+        _draw_tag(c, alteration, status_url, layout)
+        c.restoreState()
+
+    c.save()
+    output.seek(0)
+    return output
+
+
+RUN_SHEET_COLUMNS = [
+    ('Job', 0, 40),
+    ('Customer', 40, 130),
+    ('Outfit', 170, 90),
+    ('Qty', 260, 30),
+    ('Issue', 290, 170),
+    ('Pickup', 460, 80),
+]
+
+
+def render_run_sheet(tailor, alterations):
+    """A tailor's assigned jobs, grouped by status, as a spooled PDF file."""
+    regular, bold = get_fonts()
+    page_width, page_height = letter
+    left, top, bottom, line_height = 0.6 * inch, page_height - 0.6 * inch, 0.6 * inch, 14
+    status_labels = dict(Alteration.STATUS_CHOICES)
+    status_order = {code: i for i, code in enumerate(status_labels)}
+    alterations = sorted(alterations, key=lambda a: (
+        status_order.get(a.status, len(status_order)),
+        a.predicted_pickup_date is None,
+        a.predicted_pickup_date or timezone.localdate(),
+        a.id,
+    ))
+
+    output = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    c = canvas.Canvas(output, pagesize=letter)
+
+    def start_page():
+        c.setFont(bold, 14)
+        c.drawString(left, top, f'Run sheet: {tailor.name}')
+        c.setFont(regular, 9)
+        c.drawRightString(page_width - left, top, timezone.localtime().strftime('%Y-%m-%d %H:%M'))
+        return top - 2 * line_height
+
+    def header_row(y):
+        c.setFont(bold, 9)
+        for title, offset, _ in RUN_SHEET_COLUMNS:
+            c.drawString(left + offset, y, title)
+        c.line(left, y - 3, page_width - left, y - 3)
+        return y - line_height
+
+    y = start_page()
+    for status, jobs in groupby(alterations, key=lambda a: a.status):
+        if y - 3 * line_height < bottom:
+            c.showPage()
+            y = start_page()
+        c.setFont(bold, 11)
+        c.drawString(left, y, status_labels.get(status, status))
+        y = header_row(y - line_height)
+        c.setFont(regular, 9)
+        for job in jobs:
+            if y < bottom:
+                c.showPage()
+                y = header_row(start_page())
+                c.setFont(regular, 9)
+            values = [
+                f'#{job.id}', job.customer.name, job.outfit_type, job.number_of_outfits,
+                job.issue_description, job.predicted_pickup_date or '-',
+            ]
+            for (_, offset, width), value in zip(RUN_SHEET_COLUMNS, values):
+                c.drawString(left + offset, y, _fit(value, regular, 9, width - 6))
+            y -= line_height
+        y -= line_height
+
+    c.save()
+    output.seek(0)
+    return output
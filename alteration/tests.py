@@ -1,3 +1,285 @@
-from django.test import TestCase
+import os
+import tempfile
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from reportlab.pdfgen.canvas import Canvas
+
+from .models import Alteration, Customer, Notification, Tailor
+from .ai_service import AlterationPredictor, get_predictor, refresh_pickup_predictions
+from .notifications import build_ready_notifications, deliver_pending, enqueue
+from .utils import normalize_phone, phone_search_prefixes
+
+
+class AlterationBoardTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = Customer.objects.create(name='Asha', phone_number='9876543210')
+        cls.tailor = Tailor.objects.create(name='Ravi', specialties='Bridal')
+        cls.alteration = Alteration.objects.create(
+            customer=cls.customer, tailor=cls.tailor, outfit_type='Saree', issue_description='Hem',
+        )
+
+    def test_events_fall_back_to_polling_under_wsgi(self):
+        response = self.client.get('/alterations/events/')
+        body = response.content.decode()
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertTrue(body.startswith('retry: '))
+        self.assertIn('event: polling', body)
+        self.assertIn('event: snapshot', body)
+        self.assertIn('"customer_name": "Asha"', body)
+
+    def test_save_loads_no_related_rows_without_subscribers(self):
+        alteration = Alteration.objects.get(pk=self.alteration.pk)
+        with CaptureQueriesContext(connection) as queries, self.captureOnCommitCallbacks(execute=True):
+            alteration.status = 'IN_PROGRESS'
+            alteration.save()
+        tables = ' '.join(query['sql'] for query in queries.captured_queries)
+        self.assertNotIn('"alteration_customer"', tables)
+        self.assertNotIn('"alteration_tailor"', tables)
+
+
+class TagTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        customer = Customer.objects.create(name='Asha', phone_number='9876543210')
+        cls.alteration = Alteration.objects.create(
+            customer=customer, outfit_type='Saree', issue_description='Hem', notes='Keep the fall',
+        )
+
+    def test_tag_shows_status_and_notes(self):
+        with mock.patch.object(Canvas, 'drawString', autospec=True) as draw:
+            response = self.client.get(f'/api/alterations/{self.alteration.pk}/tag/')
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        lines = [call.args[3] for call in draw.call_args_list]
+        self.assertIn('Status: Pending', lines)
+        self.assertIn('Notes: Keep the fall', lines)
+
+    def test_rejects_invalid_dates(self):
+        for day in ('2024-13-45', 'soon'):
+            with self.subTest(day=day):
+                self.assertEqual(self.client.get('/api/alterations/tags/', {'date': day}).status_code, 400)
+
+
+class NotificationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = Customer.objects.create(name='Asha', phone_number='9876543210', email='asha@example.com')
+        cls.alteration = Alteration.objects.create(
+            customer=cls.customer, outfit_type='Saree', issue_description='Hem', status='READY',
+        )
+
+    def test_enqueue_returns_only_inserted_rows(self):
+        self.assertEqual(len(enqueue(build_ready_notifications([self.alteration]))), 2)
+        self.assertEqual(enqueue(build_ready_notifications([self.alteration])), [])
+        self.assertEqual(Notification.objects.count(), 2)
+
+    def test_ready_again_is_a_new_event(self):
+        enqueue(build_ready_notifications([self.alteration]))
+        self.alteration.status = 'IN_PROGRESS'
+        self.alteration.save()
+        self.alteration.status = 'READY'
+        self.alteration.save()
+        self.assertEqual(len(enqueue(build_ready_notifications([self.alteration]))), 2)
+
+    def test_other_saves_do_not_notify_again(self):
+        enqueue(build_ready_notifications([self.alteration]))
+        self.alteration.notes = 'Pressed'
+        self.alteration.save()
+        self.alteration.refresh_from_db()
+        self.assertEqual(enqueue(build_ready_notifications([self.alteration])), [])
+        self.assertEqual(self.client.post('/api/alterations/notify-ready/').json(), {'queued': 0})
+
+    def test_ready_at_follows_the_status(self):
+        self.assertIsNotNone(self.alteration.ready_at)
+        self.alteration.status = 'COMPLETED'
+        self.alteration.save(update_fields=['status'])
+        self.alteration.refresh_from_db()
+        self.assertIsNone(self.alteration.ready_at)
+
+    def test_notify_reports_deduplicated_requests(self):
+        first = self.client.post(f'/api/alterations/{self.alteration.pk}/notify/').json()
+        self.assertEqual(sorted(first['channels']), ['EMAIL', 'SMS'])
+        second = self.client.post(f'/api/alterations/{self.alteration.pk}/notify/').json()
+        self.assertEqual(second['channels'], [])
+        self.assertEqual(second['message'], 'Customer was already notified')
+        self.assertEqual(self.client.post('/api/alterations/notify-ready/').json(), {'queued': 0})
+
+    def test_delivery_retries_failures(self):
+        enqueue(build_ready_notifications([self.alteration]))
+        backend = mock.Mock()
+        backend.send.side_effect = [None, ConnectionError('gateway down')]
+        with mock.patch('alteration.notifications.get_backend', return_value=backend):
+            self.assertEqual(deliver_pending(), (1, 1))
+        self.assertEqual(backend.open.call_count, 2)
+        self.assertEqual(backend.close.call_count, 2)
+
+        failed = Notification.objects.get(status='PENDING')
+        self.assertEqual(failed.attempts, 1)
+        self.assertIn('gateway down', failed.last_error)
+        self.assertGreater(failed.next_attempt_at, timezone.now())
+        # Not due yet
+        with mock.patch('alteration.notifications.get_backend', return_value=backend):
+            self.assertEqual(deliver_pending(), (0, 0))
+
+    def test_delivery_gives_up_after_max_attempts(self):
+        enqueue(build_ready_notifications([self.alteration]))
+        backend = mock.Mock()
+        backend.send.side_effect = ConnectionError('gateway down')
+        with mock.patch('alteration.notifications.get_backend', return_value=backend):
+            self.assertEqual(deliver_pending(max_attempts=1), (0, 2))
+        self.assertEqual(Notification.objects.filter(status='FAILED').count(), 2)
+
+
+class PickupPredictionTests(TestCase):
+    def test_predict(self):
+        response = self.client.post('/api/alterations/predict/', {'outfit_type': 'Saree', 'number_of_outfits': '2'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('predicted_pickup_date', response.json())
+
+    def test_predict_rejects_bad_number_of_outfits(self):
+        for value in ('two', '-1', '1.5'):
+            with self.subTest(value=value):
+                response = self.client.post('/api/alterations/predict/', {'outfit_type': 'Saree', 'number_of_outfits': value})
+                self.assertEqual(response.status_code, 400)
+
+    def test_refresh_uses_queue_depth_at_intake(self):
+        customer = Customer.objects.create(name='Asha', phone_number='9876543210')
+        first = Alteration.objects.create(customer=customer, outfit_type='Saree', issue_description='Hem')
+        second = Alteration.objects.create(customer=customer, outfit_type='Saree', issue_description='Hem')
+        Alteration.objects.create(customer=customer, outfit_type='Saree', issue_description='Hem')
+
+        with mock.patch('alteration.ai_service.AlterationPredictor.predict_days', autospec=True,
+                        return_value=([1.0, 1.0], [0.5, 0.5])) as predict:
+            refresh_pickup_predictions(Alteration.objects.filter(pk__in=[first.pk, second.pk]).order_by('id'))
+        self.assertEqual(list(predict.call_args.args[4]), [0, 1])
+
+    def test_predict_batch_invalidates_the_list_etag(self):
+        customer = Customer.objects.create(name='Asha', phone_number='9876543210')
+        Alteration.objects.create(customer=customer, outfit_type='Saree', issue_description='Hem')
+        etag = self.client.get('/api/alterations/')['ETag']
+
+        self.client.post('/api/alterations/predict-batch/', {}, content_type='application/json')
+        response = self.client.get('/api/alterations/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNotNone(response.json()[0]['predicted_pickup_date'])
+
+    def test_predict_batch_rejects_bad_ids(self):
+        for payload in ({'ids': ['x']}, {'ids': '1,2'}, {'tailor_id': 'x'}):
+            with self.subTest(payload=payload):
+                response = self.client.post('/api/alterations/predict-batch/', payload, content_type='application/json')
+                self.assertEqual(response.status_code, 400)
+
+
+class AlterationPredictorTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Turnarounds that are exactly log-linear in the features, so a barely penalised fit recovers them
+        cls.outfits = ['Bridal', 'Suit', 'bridal ', 'Suit', 'Bridal', 'Suit', 'Bridal', 'Suit']
+        cls.tailors = [1, 1, 2, 2, 1, 2, None, None]
+        cls.counts = [1, 2, 1, 3, 2, 1, 4, 2]
+        cls.depths = [0, 3, 5, 1, 8, 2, 4, 6]
+        log_days = (
+            0.5
+            + 0.3 * np.log1p(cls.counts)
+            + 0.2 * np.log1p(cls.depths)
+            + np.where([o.strip().lower() == 'bridal' for o in cls.outfits], 1.0, 0.0)
+            + np.select([np.equal(cls.tailors, 1), np.equal(cls.tailors, 2)], [0.1, -0.1], 0.0)
+        )
+        cls.durations = np.expm1(log_days)
+        cls.predictor = AlterationPredictor.fit(
+            cls.outfits, cls.tailors, cls.counts, cls.depths, cls.durations, alpha=1e-9,
+        )
+
+    def test_fit_recovers_the_turnarounds(self):
+        params = self.predictor.params
+        self.assertEqual(params['outfit_types'], ['bridal', 'suit'])
+        self.assertEqual(params['tailors'], ['1', '2'])
+        self.assertEqual(params['n_samples'], 8)
+        self.assertEqual(params['confidence'], 1.0)
+        # Outfit one-hots sum to the intercept column, so only their difference is identified
+        coef = np.asarray(params['coef'])
+        np.testing.assert_allclose(coef[1:3], [0.3, 0.2], atol=1e-6)
+        self.assertAlmostEqual(coef[3] - coef[4], 1.0, places=6)
+
+        days, confidence = self.predictor.predict_days(self.outfits, self.tailors, self.counts, self.depths)
+        np.testing.assert_allclose(days, self.durations, rtol=1e-6)
+        np.testing.assert_array_equal(confidence, 1.0)
+
+    def test_unknown_outfit_lowers_the_confidence(self):
+        _, confidence = self.predictor.predict_days(['Gown'], [1], [1], [0])
+        self.assertAlmostEqual(confidence[0], 0.8)
+
+    def test_untrained_falls_back_to_outfit_times(self):
+        days, confidence = AlterationPredictor().predict_days(['Bridal', 'Gown'], [None, None], [1, 1], [0, 0])
+        np.testing.assert_array_equal(days, [7, AlterationPredictor.DEFAULT_DAYS])
+        np.testing.assert_array_equal(confidence, AlterationPredictor.FALLBACK_CONFIDENCE)
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = str(Path(directory) / 'model.json')
+            self.predictor.save(path)
+            self.assertEqual(os.listdir(directory), ['model.json'])
+            loaded = AlterationPredictor.load(path)
+        self.assertEqual(loaded.params, self.predictor.params)
+        args = (self.outfits, self.tailors, self.counts, self.depths)
+        np.testing.assert_array_equal(loaded.predict_days(*args)[0], self.predictor.predict_days(*args)[0])
+
+    def test_get_predictor_reloads_a_saved_model(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = str(Path(directory) / 'model.json')
+            with override_settings(ALTERATION_PICKUP_MODEL_PATH=path):
+                self.assertFalse(get_predictor().is_trained)
+
+                self.predictor.save(path)
+                first = get_predictor()
+                self.assertEqual(first.params, self.predictor.params)
+                self.assertIs(get_predictor(), first)
+
+                retrained = AlterationPredictor.fit(
+                    self.outfits, self.tailors, self.counts, self.depths, self.durations, alpha=10.0,
+                )
+                retrained.save(path)
+                # Move the mtime on even if both saves land in the same clock tick
+                stat = os.stat(path)
+                os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+                self.assertEqual(get_predictor().params, retrained.params)
+
+                os.remove(path)
+                self.assertFalse(get_predictor().is_trained)
+
+
+class PhoneTests(TestCase):
+    def test_normalize_phone(self):
+        for raw in ('098765 43210', '+91 98765-43210', '9876543210', '919876543210', '0091 98765 43210'):
+            with self.subTest(raw=raw):
+                self.assertEqual(normalize_phone(raw), '+919876543210')
+        self.assertEqual(normalize_phone('+44 20 7946 0958'), '+442079460958')
+        self.assertEqual(normalize_phone('9198765432'), '+919198765432')
+        self.assertEqual(normalize_phone('n/a'), '')
+
+    def test_search_prefixes(self):
+        self.assertEqual(phone_search_prefixes('98765'), ['+9198765'])
+        self.assertEqual(phone_search_prefixes('9198765'), ['+919198765', '+9198765'])
+        self.assertEqual(phone_search_prefixes('+9198765'), ['+9198765'])
+
+    def test_search_with_or_without_country_code(self):
+        asha = Customer.objects.create(name='Asha', phone_number='98765 43210')
+        ravi = Customer.objects.create(name='Ravi', phone_number='91987 65432')
+        results = lambda q: [c['id'] for c in self.client.get('/api/customers/search/', {'q': q}).json()['results']]
+        self.assertEqual(results('98765'), [asha.pk])
+        self.assertEqual(results('9198765'), [ravi.pk, asha.pk])
+        self.assertEqual(results('+91 98765'), [asha.pk])
+        self.assertEqual(results('Ra'), [ravi.pk])
+
+    def test_search_rejects_bad_limit(self):
+        for limit in ('-1', '0', 'ten', '2.5'):
+            with self.subTest(limit=limit):
+                response = self.client.get('/api/customers/search/', {'q': 'Asha', 'limit': limit})
+                self.assertEqual(response.status_code, 400)
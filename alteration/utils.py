@@ -0,0 +1,41 @@
+import re
+from django.conf import settings
+
+def normalize_phone(raw, country_code=None):
+    """E.164 form of a phone number as typed at the counter.
+
+    '098765 43210', '+91 98765-43210' and '9876543210' all become
+    '+919876543210'. Numbers without an international prefix get
+    ``PHONE_DEFAULT_COUNTRY_CODE``. Partial input normalises the same way, so
+    the result can be used as a prefix for searching. Returns '' when there
+    are no digits.
+    """
+    country_code = country_code or getattr(settings, 'PHONE_DEFAULT_COUNTRY_CODE', '91')
+    raw = (raw or '').strip()
+    digits = re.sub(r'\D', '', raw)
+    if not digits:
+        return ''
+    if raw.startswith('+'):
+        return f'+{digits}'
+    if digits.startswith('00'):
+        return f'+{digits[2:]}'
+    digits = digits.lstrip('0')
+    if len(digits) > 10 and digits.startswith(country_code):
+        return f'+{digits}'
+    return f'+{country_code}{digits}'
+
+
+def phone_search_prefixes(raw, country_code=None):
+    """``phone_e164`` prefixes that partial counter input may stand for.
+
+    Short input starting with the country code, such as '9198765', may
+    already include it or be a national number that begins with those
+    digits, so both '+919198765' and '+9198765' are returned.
+    """
+    country_code = country_code or getattr(settings, 'PHONE_DEFAULT_COUNTRY_CODE', '91')
+    prefixes = [normalize_phone(raw, country_code)]
+    raw = (raw or '').strip()
+    digits = re.sub(r'\D', '', raw).lstrip('0')
+    if not raw.startswith('+') and digits.startswith(country_code) and f'+{digits}' not in prefixes:
+        prefixes.append(f'+{digits}')
+    return prefixes
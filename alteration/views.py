@@ -1,21 +1,80 @@
+import asyncio
 from typing import Type
+from asgiref.sync import sync_to_async
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.http import FileResponse
+from django.db import transaction
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Count, Q
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, render, redirect
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
-from io import BytesIO
+from django.urls import reverse
+from django.utils.dateparse import parse_date
 from .models import Alteration, Tailor, Customer
 from .serializers import AlterationSerializer, TailorSerializer, CustomerSerializer, AlterationCreateSerializer
-from .ai_service import AlterationPredictor
+from .ai_service import get_predictor, current_queue_depth, refresh_pickup_predictions
+from .tags import render_tags, render_run_sheet
+from .notifications import build_ready_notifications, enqueue
+from .utils import phone_search_prefixes
+from .events import alteration_event, format_sse, get_broadcaster
+from core import reference
+from core.conditional import ConditionalGetMixin
 from core.models import OutfitType
 
 def alteration_list(request):
     alterations = Alteration.objects.select_related('customer', 'tailor').all()
     return render(request, 'alteration/alteration_list.html', {'alterations': alterations})
 
+def alteration_board(request):
+    columns = [choice for choice in Alteration.STATUS_CHOICES if choice[0] != 'COMPLETED']
+    return render(request, 'alteration/alteration_board.html', {'columns': columns})
+
+def _board_snapshot():
+    alterations = Alteration.objects.select_related('customer', 'tailor').exclude(status='COMPLETED').order_by('id')
+    return [alteration_event(alteration) for alteration in alterations]
+
+SSE_KEEPALIVE_SECONDS = 15
+
+async def alteration_events(request):
+    """Server-sent events for the status board: one snapshot, then deltas only.
+
+    The subscription is taken before the snapshot query so no change can fall
+    between the two. Under WSGI a streaming response is buffered until it
+    ends, so there the board polls instead: each request gets one snapshot
+    and a ``retry`` telling EventSource when to reconnect for the next.
+    """
+    if not isinstance(request, ASGIRequest):
+        poll_ms = settings.ALTERATION_BOARD_POLL_SECONDS * 1000
+        body = f'retry: {poll_ms}\n' + format_sse('polling', poll_ms) + format_sse('snapshot', await sync_to_async(_board_snapshot)())
+        response = HttpResponse(body, content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        return response
+
+    broadcaster = get_broadcaster()
+    queue = broadcaster.subscribe()
+
+    async def stream():
+        try:
+            yield format_sse('snapshot', await sync_to_async(_board_snapshot)())
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ': keepalive\n\n'
+                    continue
+                yield format_sse(event['type'], event)
+                if event['type'] == 'resync':
+                    break
+        finally:
+            broadcaster.unsubscribe(queue)
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
 def alteration_create(request):
     if request.method == 'POST':
         customer_id = request.POST.get('customer_id')
@@ -27,7 +86,7 @@ def alteration_create(request):
             context = {
                 'error': 'All fields are required',
                 'customers': Customer.objects.all(),
-                'outfit_types': OutfitType.objects.all()
+                'outfit_types': reference.get('outfit_types')
             }
             return render(request, 'alteration/alteration_create.html', context)
         
@@ -45,7 +104,7 @@ def alteration_create(request):
     
     context = {
         'customers': Customer.objects.all(),
-        'outfit_types': OutfitType.objects.all()
+        'outfit_types': reference.get('outfit_types')
     }
     return render(request, 'alteration/alteration_create.html', context)
 
@@ -117,7 +176,7 @@ def tailor_delete(request, pk):
     return redirect('/tailors/')
 
 def customer_list(request):
-    customers = Customer.objects.prefetch_related('alterations').all()
+    customers = Customer.objects.annotate(alteration_count=Count('alterations'))
     return render(request, 'alteration/customer_list.html', {'customers': customers})
 
 def customer_create(request):
@@ -173,16 +232,58 @@ def customer_delete(request, pk):
     customer.delete()
     return redirect('/customers/')
 
+def _status_url(request):
+    return lambda alteration: request.build_absolute_uri(reverse('alteration-detail', args=[alteration.pk]))
+
 class TailorViewSet(viewsets.ModelViewSet):
     queryset = Tailor.objects.all()
     serializer_class = TailorSerializer
 
+    @action(detail=True, methods=['get'], url_path='run-sheet')
+    def run_sheet(self, request, pk=None):
+        tailor = self.get_object()
+        alterations = Alteration.objects.select_related('customer').filter(tailor=tailor).exclude(status='COMPLETED')
+        output = render_run_sheet(tailor, alterations)
+        return FileResponse(output, content_type='application/pdf', filename=f'run_sheet_{tailor.id}.pdf')
+
 class CustomerViewSet(viewsets.ModelViewSet):
-    queryset = Customer.objects.all()
+    queryset = Customer.objects.prefetch_related('alterations')
     serializer_class = CustomerSerializer
 
-class AlterationViewSet(viewsets.ModelViewSet):
-    queryset = Alteration.objects.all()
+    SEARCH_LIMIT = 20
+
+    @action(detail=False, methods=['get'], url_path='search')
+    def search(self, request):
+        """Counter lookup by phone or name prefix: ``?q=98765`` or ``?q=pri``.
+
+        Both paths are index-backed ``LIKE 'prefix%'`` scans, so lookups stay
+        fast however many customers there are.
+        """
+        q = request.query_params.get('q', '').strip()
+        if len(q) < 2:
+            return Response({'error': 'q must be at least 2 characters'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = int(request.query_params.get('limit', self.SEARCH_LIMIT))
+            if limit < 1:
+                raise ValueError
+        except ValueError:
+            return Response({'error': 'limit must be a positive integer'}, status=status.HTTP_400_BAD_REQUEST)
+        limit = min(limit, 100)
+
+        digits = sum(ch.isdigit() for ch in q)
+        if digits >= 3 and digits == sum(ch.isalnum() for ch in q):
+            matches = Q()
+            for prefix in phone_search_prefixes(q):
+                matches |= Q(phone_e164__startswith=prefix)
+            queryset = Customer.objects.filter(matches).order_by('phone_e164')
+        else:
+            queryset = Customer.objects.filter(name__istartswith=q).order_by('name')
+
+        results = list(queryset.values('id', 'name', 'phone_number', 'email')[:limit])
+        return Response({'count': len(results), 'results': results})
+
+class AlterationViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
+    queryset = Alteration.objects.select_related('customer', 'tailor', 'sku')
     serializer_class = AlterationSerializer
 
     def get_serializer_class(self) -> Type:
@@ -223,47 +324,128 @@ class AlterationViewSet(viewsets.ModelViewSet):
         
         if not outfit_type:
             return Response({'error': 'outfit_type required'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            number_of_outfits = int(request.data.get('number_of_outfits') or 1)
+            if number_of_outfits < 1:
+                raise ValueError
+        except (TypeError, ValueError):
+            return Response({'error': 'number_of_outfits must be a positive integer'}, status=status.HTTP_400_BAD_REQUEST)
         
-        predictor = AlterationPredictor()
-        pickup_date, confidence = predictor.predict_pickup_date(outfit_type, tailor_id)
+        predictor = get_predictor()
+        pickup_date, confidence = predictor.predict_pickup_date(
+            outfit_type, tailor_id, number_of_outfits, current_queue_depth()
+        )
         
         return Response({
             'predicted_pickup_date': pickup_date,
             'confidence_score': confidence,
-            'outfit_type': outfit_type
+            'outfit_type': outfit_type,
+            'model_version': predictor.version
+        })
+    
+    @action(detail=False, methods=['post'], url_path='predict-batch')
+    def predict_pickup_batch(self, request):
+        """Refresh and store pickup predictions for many alterations at once.
+
+        Accepts ``ids`` or the filters ``status`` (list) and ``tailor_id``;
+        with neither, every alteration that is not COMPLETED is refreshed.
+        """
+        ids = request.data.get('ids')
+        statuses = request.data.get('status')
+        tailor_id = request.data.get('tailor_id')
+
+        queryset = Alteration.objects.all()
+        try:
+            if ids:
+                if not isinstance(ids, list):
+                    raise TypeError
+                ids = [int(i) for i in ids]
+            tailor_id = int(tailor_id) if tailor_id else None
+        except (TypeError, ValueError):
+            return Response({'error': 'ids must be a list of integers and tailor_id an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        if ids:
+            queryset = queryset.filter(id__in=ids)
+        if statuses:
+            queryset = queryset.filter(status__in=statuses if isinstance(statuses, list) else [statuses])
+        if tailor_id:
+            queryset = queryset.filter(tailor_id=tailor_id)
+        if not any([ids, statuses, tailor_id]):
+            queryset = queryset.exclude(status='COMPLETED')
+
+        alterations, confidence = refresh_pickup_predictions(queryset.order_by('id'))
+
+        return Response({
+            'count': len(alterations),
+            'model_version': get_predictor().version,
+            'results': [{
+                'id': alteration.id,
+                'predicted_pickup_date': alteration.predicted_pickup_date,
+                'confidence_score': round(float(score), 2)
+            } for alteration, score in zip(alterations, confidence)]
         })
     
     @action(detail=True, methods=['get'], url_path='tag')
     def generate_tag(self, request, pk=None):
         alteration = self.get_object()
-        
-        buffer = BytesIO()
-        p = canvas.Canvas(buffer, pagesize=letter)
-        
-        p.drawString(100, 750, f"Alteration ID: {alteration.id}")
-        p.drawString(100, 730, f"Item: {alteration.issue_description}")
-        p.drawString(100, 710, f"Customer: {alteration.customer.name}")
-        p.drawString(100, 690, f"Status: {alteration.status}")
-        if alteration.sku:
-            p.drawString(100, 670, f"SKU: {alteration.sku.sku_code}")
-        p.drawString(100, 650, f"Notes: {alteration.notes}")
-        
-        p.save()
-        buffer.seek(0)
-        
-        return FileResponse(buffer, content_type='application/pdf', filename=f'tag_{alteration.id}.pdf')
+        output = render_tags([alteration], _status_url(request))
+        return FileResponse(output, content_type='application/pdf', filename=f'tag_{alteration.id}.pdf')
+    
+    @action(detail=False, methods=['get'], url_path='tags')
+    def generate_tags(self, request):
+        """Tags for many alterations: ``?ids=1,2,3`` or ``?date=YYYY-MM-DD`` (intake date)."""
+        ids = request.query_params.get('ids')
+        date = request.query_params.get('date')
+        queryset = self.get_queryset().order_by('id')
+
+        if ids:
+            try:
+                queryset = queryset.filter(id__in=[int(i) for i in ids.split(',') if i.strip()])
+            except ValueError:
+                return Response({'error': 'ids must be comma-separated integers'}, status=status.HTTP_400_BAD_REQUEST)
+        elif date:
+            try:
+                day = parse_date(date)
+            except ValueError:
+                day = None
+            if not day:
+                return Response({'error': 'date must be YYYY-MM-DD'}, status=status.HTTP_400_BAD_REQUEST)
+            queryset = queryset.filter(created_at__date=day)
+        else:
+            return Response({'error': 'ids or date required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        alterations = list(queryset)
+        if not alterations:
+            return Response({'error': 'No alterations found'}, status=status.HTTP_404_NOT_FOUND)
+
+        output = render_tags(alterations, _status_url(request))
+        filename = f'tags_{date}.pdf' if date and not ids else 'tags.pdf'
+        return FileResponse(output, content_type='application/pdf', filename=filename)
     
     @action(detail=True, methods=['post'], url_path='notify')
     def notify_customer(self, request, pk=None):
         alteration = self.get_object()
         
-        message = f"Hello {alteration.customer.name}, your {alteration.outfit_type} alteration is ready for pickup!"
-        
-        alteration.status = 'READY'
-        alteration.save()
+        with transaction.atomic():
+            if alteration.status != 'READY':
+                alteration.status = 'READY'
+                alteration.save()
+            queued = enqueue(build_ready_notifications([alteration]))
         
         return Response({
-            'message': 'Customer notified successfully',
-            'notification_sent': message,
-            'customer_phone': alteration.customer.phone_number
+            'message': 'Customer notification queued' if queued else 'Customer was already notified',
+            'notification_sent': queued[0].message if queued else '',
+            'customer_phone': alteration.customer.phone_number,
+            'channels': [n.channel for n in queued]
         })
+    
+    @action(detail=False, methods=['post'], url_path='notify-ready')
+    def notify_ready(self, request):
+        """Queue 'ready for pickup' messages for every READY alteration.
+
+        Alterations that were already notified are skipped via the outbox dedup
+        key, and ``queued`` counts only the messages actually added.
+        """
+        alterations = Alteration.objects.select_related('customer').filter(status='READY')
+        queued = enqueue(build_ready_notifications(alterations))
+        
+        return Response({'queued': len(queued)}, status=status.HTTP_202_ACCEPTED)
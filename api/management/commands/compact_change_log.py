@@ -0,0 +1,17 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from api.sync import remove_older_than, remove_superseded
+
+class Command(BaseCommand):
+    help = 'Remove superseded and expired entries from the /api/sync/ change log'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.SYNC_RETENTION_DAYS, help='Remove entries older than this many days; 0 keeps them')
+        parser.add_argument('--keep-superseded', action='store_true', help='Do not remove entries followed by a later one for the same record')
+
+    def handle(self, *args, **options):
+        superseded = 0 if options['keep_superseded'] else remove_superseded()
+        expired = remove_older_than(timezone.now() - timedelta(days=options['days'])) if options['days'] > 0 else 0
+        self.stdout.write(self.style.SUCCESS(f'Removed {superseded} superseded and {expired} expired change log entries'))
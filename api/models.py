@@ -1,3 +1,34 @@
 from django.db import models
 
-# Create your models here.
+class ChangeLogEntry(models.Model):
+    """One created, updated or deleted record, in commit order; ``id`` is the sync cursor."""
+    ACTION_CHOICES = [
+        ('CREATED', 'Created'),
+        ('UPDATED', 'Updated'),
+        ('DELETED', 'Deleted'),
+    ]
+
+    collection = models.CharField(max_length=30)
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ['id']
+        verbose_name_plural = "change log entries"
+        indexes = [models.Index(fields=['collection', 'object_id'])]
+
+    def __str__(self):
+        return f"#{self.id} {self.collection} {self.object_id} {self.get_action_display().lower()}"
+
+class ChangeLogCompaction(models.Model):
+    """A compaction run; cursors below the highest ``removed_through`` can no longer be served."""
+    removed_through = models.BigIntegerField(help_text="Highest change log id removed by age")
+    removed_entries = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-id']
+
+    def __str__(self):
+        return f"Compaction through #{self.removed_through}"
@@ -0,0 +1,24 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from alteration.models import Alteration, Customer
+from .sync import COLLECTION_BY_MODEL, log_changes
+
+
+def _log_customer(sender, instance):
+    # A customer's sync payload nests its alterations
+    if sender is Alteration and instance.customer_id is not None:
+        log_changes(Customer, [instance.customer_id])
+
+
+@receiver(post_save)
+def record_saved(sender, instance, created, raw=False, **kwargs):
+    if sender in COLLECTION_BY_MODEL and not raw:
+        log_changes(sender, [instance.pk], 'CREATED' if created else 'UPDATED')
+        _log_customer(sender, instance)
+
+
+@receiver(post_delete)
+def record_deleted(sender, instance, **kwargs):
+    if sender in COLLECTION_BY_MODEL:
+        log_changes(sender, [instance.pk], 'DELETED')
+        _log_customer(sender, instance)
@@ -0,0 +1,164 @@
+"""Change feed behind ``/api/sync/``.
+
+Every save and delete of a synced model appends a ``ChangeLogEntry`` (see
+``api.signals``) in the transaction that makes the change, so the entry
+commits or rolls back with it. Appends take a transaction level advisory
+lock before their ids are drawn and hold it until that transaction ends, so
+ids become visible strictly in increasing order and a reader that has seen
+id N can never later find a committed entry below N: the id is the cursor.
+The price is that transactions writing synced models are serialized from
+their first logged change to their commit, so keep them short; two that
+each wait for a row the other has locked after logging deadlock, and
+PostgreSQL aborts one of them.
+Saving an alteration also logs its customer, whose payload nests the
+customer's alterations. A client bootstraps by reading the
+current cursor, fetching the collections it needs from the list endpoints and
+then pulling pages of changes since that cursor; each page costs a query for
+the log plus one per changed collection, however large the tables are.
+
+Deletes are kept as tombstones. Bulk operations that bypass signals must call
+``log_changes`` themselves, or ``require_resync`` when there are too many
+rows to log. ``compact_change_log`` drops entries superseded by
+a later one for the same record and, optionally, entries older than a cutoff;
+cursors from before an age cutoff are refused so those clients resync.
+"""
+from django.db import connection, transaction
+from django.db.models import Max
+
+from alteration.models import Alteration, Customer
+from alteration.serializers import AlterationSerializer, CustomerSerializer
+from core.models import Category, OutfitType
+from core.serializers import CategorySerializer, OutfitTypeSerializer
+from inventory.models import InventoryItem
+from inventory.serializers import InventoryItemSerializer
+from sku.models import ProductSKU
+from sku.serializers import ProductSKUSerializer
+from .models import ChangeLogCompaction, ChangeLogEntry
+
+# Collection name -> (model, queryset for serializing, serializer)
+COLLECTIONS = {
+    'skus': (ProductSKU, lambda: ProductSKU.objects.select_related('category'), ProductSKUSerializer),
+    'inventory': (InventoryItem, lambda: InventoryItem.objects.select_related('sku'), InventoryItemSerializer),
+    'categories': (Category, lambda: Category.objects.all(), CategorySerializer),
+    'outfit_types': (OutfitType, lambda: OutfitType.objects.all(), OutfitTypeSerializer),
+    'customers': (Customer, lambda: Customer.objects.prefetch_related('alterations'), CustomerSerializer),
+    'alterations': (Alteration, lambda: Alteration.objects.select_related('customer', 'tailor'), AlterationSerializer),
+}
+COLLECTION_BY_MODEL = {model: name for name, (model, _, _) in COLLECTIONS.items()}
+# pg_advisory_xact_lock key serializing appends ("sync" in ASCII)
+APPEND_LOCK = 0x73796e63
+
+
+class CursorExpired(Exception):
+    pass
+
+
+def append(collection, ids, action):
+    """Insert entries in the current transaction, in commit order with every other append."""
+    with transaction.atomic(savepoint=False):
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_advisory_xact_lock(%s)', [APPEND_LOCK])
+        ChangeLogEntry.objects.bulk_create(
+            ChangeLogEntry(collection=collection, object_id=object_id, action=action) for object_id in ids
+        )
+
+
+def log_changes(model, ids, action='UPDATED'):
+    """Append entries for ``ids`` of ``model`` in the current transaction."""
+    ids = list(ids)
+    if ids:
+        append(COLLECTION_BY_MODEL[model], ids, action)
+
+
+def require_resync():
+    """Expire every cursor handed out so far, for writes that bypassed the log.
+
+    Appends a marker entry and raises the floor to it, so older cursors get
+    410 and their clients fetch a fresh cursor and reload.
+    """
+    with transaction.atomic():
+        append('resync', [0], 'UPDATED')
+        marker = ChangeLogEntry.objects.filter(collection='resync').aggregate(last=Max('id'))['last']
+        ChangeLogCompaction.objects.create(removed_through=marker, removed_entries=0)
+
+
+def head():
+    """The cursor of the newest entry, or the floor when compaction emptied the log."""
+    return ChangeLogEntry.objects.aggregate(head=Max('id'))['head'] or floor()
+
+
+def floor():
+    """The lowest cursor still served: everything at or below it was removed by age."""
+    return ChangeLogCompaction.objects.aggregate(floor=Max('removed_through'))['floor'] or 0
+
+
+def changes_since(cursor, limit):
+    """``(next_cursor, has_more, changes)`` for up to ``limit`` entries after ``cursor``.
+
+    Entries are collapsed per record: a record deleted by the end of the page
+    is a tombstone, one whose first entry in the page is its creation is
+    created, and anything else is updated. Created and updated records are
+    serialized as they are now; those already deleted again are left out, as
+    their tombstone follows in a later page.
+    """
+    if cursor < floor():
+        raise CursorExpired
+    entries = list(
+        ChangeLogEntry.objects.filter(id__gt=cursor).order_by('id')
+        .values_list('id', 'collection', 'object_id', 'action')[:limit + 1]
+    )
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    first, last = {}, {}
+    for _, collection, object_id, action in entries:
+        first.setdefault((collection, object_id), action)
+        last[(collection, object_id)] = action
+
+    grouped = {}
+    for key, action in last.items():
+        collection, object_id = key
+        if action == 'DELETED':
+            kind = 'deleted'
+        elif first[key] == 'CREATED':
+            kind = 'created'
+        else:
+            kind = 'updated'
+        grouped.setdefault(collection, {}).setdefault(kind, []).append(object_id)
+
+    changes = {}
+    for collection, kinds in grouped.items():
+        _, queryset, serializer_class = COLLECTIONS[collection]
+        live = kinds.get('created', []) + kinds.get('updated', [])
+        rows = {obj.pk: obj for obj in queryset().filter(pk__in=live)} if live else {}
+        changes[collection] = {
+            'created': serializer_class([rows[i] for i in kinds.get('created', []) if i in rows], many=True).data,
+            'updated': serializer_class([rows[i] for i in kinds.get('updated', []) if i in rows], many=True).data,
+            'deleted': kinds.get('deleted', []),
+        }
+    next_cursor = entries[-1][0] if entries else cursor
+    return next_cursor, has_more, changes
+
+
+def remove_superseded():
+    """Delete entries followed by a later entry for the same record; returns the count.
+
+    Safe at any time: a client past the removed entry has already seen it, and
+    one before it will see the later entry. That entry may report a record the
+    client never saw as updated, so clients apply created and updated alike.
+    """
+    latest = ChangeLogEntry.objects.values('collection', 'object_id').annotate(latest=Max('id'))
+    return ChangeLogEntry.objects.exclude(id__in=latest.values('latest')).delete()[0]
+
+
+def remove_older_than(moment):
+    """Delete entries created before ``moment`` and raise the cursor floor past them."""
+    with transaction.atomic():
+        old = ChangeLogEntry.objects.filter(created_at__lt=moment)
+        through = old.aggregate(through=Max('id'))['through']
+        if through is None:
+            return 0
+        removed = ChangeLogEntry.objects.filter(id__lte=through).delete()[0]
+        ChangeLogCompaction.objects.create(removed_through=through, removed_entries=removed)
+    return removed
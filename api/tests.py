@@ -1,3 +1,142 @@
-from django.test import TestCase
+import threading
+from datetime import timedelta
 
-# Create your tests here.
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from alteration.models import Alteration, Customer
+from core.models import Category
+from .models import ChangeLogEntry
+from . import sync
+
+
+class SyncFeedTests(TestCase):
+    def setUp(self):
+        self.cursor = self.client.get('/api/sync/').json()['cursor']
+
+    def pull(self, cursor=None, **params):
+        return self.client.get('/api/sync/', {'cursor': self.cursor if cursor is None else cursor, **params})
+
+    def test_created_updated_and_deleted(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            category = Category.objects.create(name='Bridal', prefix='BR')
+        with self.captureOnCommitCallbacks(execute=True):
+            category.name = 'Bridal Wear'
+            category.save()
+
+        data = self.pull().json()
+        self.assertFalse(data['has_more'])
+        self.assertEqual([c['name'] for c in data['changes']['categories']['created']], ['Bridal Wear'])
+        self.assertEqual(data['changes']['categories']['updated'], [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            category.save()
+        data = self.pull(data['cursor']).json()
+        self.assertEqual([c['id'] for c in data['changes']['categories']['updated']], [category.pk])
+
+        pk = category.pk
+        with self.captureOnCommitCallbacks(execute=True):
+            category.delete()
+        data = self.pull(data['cursor']).json()
+        self.assertEqual(data['changes']['categories'], {'created': [], 'updated': [], 'deleted': [pk]})
+
+    def test_pages_by_sequence(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(3):
+                Category.objects.create(name=f'Category {i}', prefix=f'C{i}')
+
+        first = self.pull(limit=2).json()
+        self.assertTrue(first['has_more'])
+        self.assertEqual(len(first['changes']['categories']['created']), 2)
+        second = self.pull(first['cursor'], limit=2).json()
+        self.assertFalse(second['has_more'])
+        self.assertEqual([c['name'] for c in second['changes']['categories']['created']], ['Category 2'])
+
+    def test_alteration_change_logs_its_customer(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            customer = Customer.objects.create(name='Asha', phone_number='9876543210')
+        cursor = self.pull().json()['cursor']
+        with self.captureOnCommitCallbacks(execute=True):
+            Alteration.objects.create(customer=customer, outfit_type='Saree', issue_description='Hem')
+
+        changes = self.pull(cursor).json()['changes']
+        self.assertEqual(len(changes['alterations']['created']), 1)
+        self.assertEqual(len(changes['customers']['updated'][0]['alterations']), 1)
+
+    def test_compaction(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            category = Category.objects.create(name='Bridal', prefix='BR')
+        for _ in range(2):
+            with self.captureOnCommitCallbacks(execute=True):
+                category.save()
+
+        self.assertEqual(sync.remove_superseded(), 2)
+        self.assertEqual(list(ChangeLogEntry.objects.values_list('action', flat=True)), ['UPDATED'])
+
+        self.assertEqual(sync.remove_older_than(timezone.now() + timedelta(seconds=1)), 1)
+        response = self.pull()
+        self.assertEqual(response.status_code, 410)
+        head = response.json()['cursor']
+        self.assertEqual(self.pull(head).status_code, 200)
+
+    def test_require_resync_expires_earlier_cursors(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.create(name='Bridal', prefix='BR')
+        cursor = self.pull().json()['cursor']
+        sync.require_resync()
+
+        self.assertEqual(self.pull(cursor).status_code, 410)
+        head = self.client.get('/api/sync/').json()['cursor']
+        self.assertEqual(self.pull(head).json()['changes'], {})
+
+    def test_entries_commit_and_roll_back_with_the_change(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            Category.objects.create(name='Bridal', prefix='BR')
+            self.assertEqual(ChangeLogEntry.objects.filter(collection='categories').count(), 1)
+            raise RuntimeError
+        self.assertFalse(ChangeLogEntry.objects.exists())
+
+    def test_rejects_bad_parameters(self):
+        self.assertEqual(self.pull('x').status_code, 400)
+        self.assertEqual(self.pull(-1).status_code, 400)
+        self.assertEqual(self.pull(limit=0).status_code, 400)
+
+
+class AppendOrderTests(TransactionTestCase):
+    def test_appends_become_visible_in_id_order(self):
+        """A later change cannot commit a lower-numbered entry past an open transaction."""
+        first_inserted = threading.Event()
+        release_first = threading.Event()
+        second_done = threading.Event()
+
+        def first():
+            try:
+                with transaction.atomic():
+                    Category.objects.create(name='First', prefix='F1')
+                    first_inserted.set()
+                    release_first.wait(5)
+            finally:
+                connection.close()
+
+        def second():
+            try:
+                first_inserted.wait(5)
+                Category.objects.create(name='Second', prefix='S2')
+                second_done.set()
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=first), threading.Thread(target=second)]
+        for thread in threads:
+            thread.start()
+        first_inserted.wait(5)
+        # The second append waits for the first transaction instead of committing around it
+        self.assertFalse(second_done.wait(0.5))
+        self.assertFalse(ChangeLogEntry.objects.exists())
+        release_first.set()
+        for thread in threads:
+            thread.join(5)
+
+        ids = ChangeLogEntry.objects.order_by('id').values_list('object_id', flat=True)
+        self.assertEqual([Category.objects.get(pk=pk).name for pk in ids], ['First', 'Second'])
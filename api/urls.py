@@ -5,6 +5,7 @@ from sku.views import ProductSKUViewSet
 from supplier.views import SupplierViewSet, OrderViewSet, OrderItemViewSet
 from inventory.views import InventoryViewSet, DiscrepancyViewSet
 from alteration.views import AlterationViewSet, TailorViewSet, CustomerViewSet
+from .views import sync_changes
 
 router = routers.DefaultRouter()
 router.register(r'sku', ProductSKUViewSet, basename='sku')
@@ -26,4 +27,5 @@ router.register(r'customers', CustomerViewSet, basename='customer')
 urlpatterns = [
     path('', include(router.urls)),
     path('forecast/', include('forecasting.urls')),
+    path('sync/', sync_changes, name='sync'),
 ]
@@ -1,3 +1,28 @@
-from django.shortcuts import render
+from rest_framework import status
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from django.conf import settings
+from . import sync
 
-# Create your views here.
+@api_view(['GET'])
+def sync_changes(request):
+    """Records created, updated and deleted since `cursor`; without one, just the current cursor"""
+    cursor = request.query_params.get('cursor')
+    if cursor is None:
+        return Response({'cursor': sync.head(), 'has_more': False, 'changes': {}})
+    try:
+        cursor = int(cursor)
+        limit = min(int(request.query_params.get('limit', settings.SYNC_PAGE_SIZE)), settings.SYNC_MAX_PAGE_SIZE)
+    except ValueError:
+        return Response({'error': 'cursor and limit must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+    if cursor < 0 or limit < 1:
+        return Response({'error': 'cursor must be >= 0 and limit >= 1'}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        next_cursor, has_more, changes = sync.changes_since(cursor, limit)
+    except sync.CursorExpired:
+        return Response(
+            {'error': 'cursor is older than the retained change log; fetch a new cursor and resync', 'cursor': sync.head()},
+            status=status.HTTP_410_GONE,
+        )
+    return Response({'cursor': next_cursor, 'has_more': has_more, 'changes': changes})
@@ -1,6 +1,12 @@
 from django.contrib import admin
 from unfold.admin import ModelAdmin
-from .models import Category, OutfitType
+import json
+from django.http import HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.urls import path, reverse
+from django.utils.html import format_html
+from .models import CapturedQuery, Category, OutfitType, RequestProfile
+from .profiling import to_speedscope
 
 
 # User configuration for Django admin interface
@@ -47,3 +53,65 @@ class CategoryAdmin(ModelAdmin):
 class OutfitTypeAdmin(ModelAdmin):
     list_display = ['name', 'code']
     search_fields = ['name', 'code']
+
+@admin.register(CapturedQuery)
+class CapturedQueryAdmin(ModelAdmin):
+    list_display = ['created_at', 'kind', 'view', 'duration_ms', 'repeats', 'call_site']
+    list_filter = ['kind', 'view']
+    search_fields = ['sql', 'view', 'call_site', 'fingerprint']
+    readonly_fields = ['kind', 'fingerprint', 'view', 'call_site', 'duration_ms', 'repeats', 'created_at', 'sql', 'formatted_plan']
+    exclude = ['plan']
+    list_per_page = 50
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    @admin.display(description='Plan')
+    def formatted_plan(self, obj):
+        if obj.plan is None:
+            return '-'
+        return format_html('<pre>{}</pre>', json.dumps(obj.plan, indent=2))
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(ModelAdmin):
+    list_display = ['created_at', 'view', 'method', 'status_code', 'duration_ms', 'cpu_ms', 'samples', 'trigger', 'downloads']
+    list_filter = ['trigger', 'view']
+    search_fields = ['view', 'path']
+    exclude = ['data']
+    readonly_fields = ['view', 'method', 'path', 'status_code', 'trigger', 'duration_ms', 'cpu_ms', 'interval_ms', 'samples', 'created_at', 'downloads']
+    list_per_page = 50
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_urls(self):
+        return [
+            path('<int:pk>/speedscope/', self.admin_site.admin_view(self.download_speedscope), name='core_requestprofile_speedscope'),
+            path('<int:pk>/collapsed/', self.admin_site.admin_view(self.download_collapsed), name='core_requestprofile_collapsed'),
+        ] + super().get_urls()
+
+    @admin.display(description='Download')
+    def downloads(self, obj):
+        return format_html(
+            '<a href="{}">speedscope</a> · <a href="{}">collapsed</a>',
+            reverse('admin:core_requestprofile_speedscope', args=[obj.pk]),
+            reverse('admin:core_requestprofile_collapsed', args=[obj.pk]),
+        )
+
+    def download_speedscope(self, request, pk):
+        profile = get_object_or_404(RequestProfile, pk=pk)
+        response = JsonResponse(to_speedscope(profile))
+        response['Content-Disposition'] = f'attachment; filename="profile-{pk}.speedscope.json"'
+        return response
+
+    def download_collapsed(self, request, pk):
+        profile = get_object_or_404(RequestProfile, pk=pk)
+        response = HttpResponse(profile.collapsed_stacks(), content_type='text/plain; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="profile-{pk}.collapsed.txt"'
+        return response
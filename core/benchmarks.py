@@ -0,0 +1,261 @@
+"""Hot-path benchmarks run against a seeded database.
+
+Each benchmark drives one view through the Django test client (or calls it
+directly) inside a transaction that is rolled back, so runs never change the
+data they measure. Wall time is sampled over many iterations; SQL queries
+are counted with ``connection.execute_wrapper`` and peak memory is taken
+from one extra ``tracemalloc`` iteration so tracing does not skew timings.
+
+List throughput benchmarks compare rows per second of a list endpoint's
+serializer plus ``JSONRenderer`` against ``core.fastlist`` plus
+``ORJSONRenderer`` on the whole table, and fail unless both produce the
+same bytes.
+"""
+import json
+import tempfile
+import time
+import tracemalloc
+import uuid
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+from django.db import connection, transaction
+from django.test import Client, RequestFactory, override_settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from alteration.models import Alteration
+from core.models import Category, OutfitType
+from forecasting.jobs import execute_run
+from forecasting.models import ForecastRun
+from inventory.models import InventoryItem
+from inventory.serializers import InventoryListSerializer
+from inventory.views import InventoryViewSet
+from sku.models import ProductSKU
+from sku.serializers import ProductSKUSerializer
+from sku.views import ProductSKUViewSet
+from supplier.models import Order, PurchaseOrder, SecureOrderLink, Supplier
+from .fastlist import fast_rows
+from .renderers import ORJSONRenderer
+from .views import dashboard_callback as admin_dashboard_callback
+
+# Fixed end of the generated dataset, so runs on different days and commits compare
+BENCHMARK_END_DATE = '2025-12-31'
+METRICS = {'p50_ms', 'p95_ms', 'p99_ms', 'mean_ms', 'queries', 'peak_memory_mb'}
+
+
+class BenchmarkError(Exception):
+    pass
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def _first(queryset):
+    obj = queryset.order_by('pk').first()
+    if obj is None:
+        raise BenchmarkError(f'No {queryset.model._meta.verbose_name} rows; run generate_synthetic_data first')
+    return obj
+
+
+def _consume(response):
+    if response.streaming:
+        b''.join(response.streaming_content)
+    else:
+        response.content
+
+
+def generate_sku(client):
+    order = _first(Order.objects.filter(category__isnull=False))
+    payload = {
+        'category_id': order.category_id,
+        'outfit_type_id': _first(OutfitType.objects).pk,
+        'supplier_id': order.supplier_id,
+        'order_id': order.pk,
+        'price': '4999.00',
+    }
+    return lambda: client.post('/api/sku/generate/', payload, content_type='application/json')
+
+
+def sku_list(client):
+    _first(ProductSKU.objects)
+    return lambda: client.get('/sku/')
+
+
+def inventory_list(client):
+    _first(InventoryItem.objects)
+    return lambda: client.get('/inventory/')
+
+
+def inventory_total(client):
+    _first(InventoryItem.objects)
+    return lambda: client.get('/api/inventory/total/')
+
+
+def secure_order_form(client):
+    supplier = _first(Supplier.objects)
+    category = _first(Category.objects)
+
+    def call():
+        link = SecureOrderLink.objects.create(supplier=supplier)
+        return client.post(f'/suppliers/secure/{link.token}/', {
+            'outfit_type': 'Lehenga', 'category': category.pk, 'size': 'M', 'quantity': '3', 'price': '2500.00',
+        })
+    return call
+
+
+def po_qr_view(client):
+    po = _first(PurchaseOrder.objects)
+    ref = uuid.uuid4().hex
+    return lambda: client.get(f'/suppliers/po/{po.pk}/qr/', {'ref': ref})
+
+
+def generate_tag(client):
+    alteration = _first(Alteration.objects)
+    return lambda: client.get(f'/api/alterations/{alteration.pk}/tag/')
+
+
+def dashboard_callback(client):
+    request = RequestFactory().get('/admin/')
+    return lambda: admin_dashboard_callback(request, {})
+
+
+def generate_forecast(client):
+    """Queue a run and execute it in-line, as the worker would, so the forecasting is timed too."""
+    def call():
+        response = client.post('/api/forecast/generate/', {'months': 3}, content_type='application/json')
+        if response.status_code >= 400:
+            return response
+        run = execute_run(ForecastRun.objects.get(pk=response.json()['run_id']))
+        if run.status != 'SUCCEEDED':
+            raise BenchmarkError(f'generate_forecast run failed: {run.error}')
+        if not run.forecasts_written:
+            raise BenchmarkError('generate_forecast wrote no forecasts; run train_models on this dataset first')
+        return response
+    return call
+
+
+BENCHMARKS = {
+    'sku.generate_sku': generate_sku,
+    'sku.sku_list': sku_list,
+    'inventory.inventory_list': inventory_list,
+    'inventory.total': inventory_total,
+    'supplier.secure_order_form': secure_order_form,
+    'supplier.po_qr_view': po_qr_view,
+    'alteration.generate_tag': generate_tag,
+    'core.dashboard_callback': dashboard_callback,
+    'forecasting.generate_forecast': generate_forecast,
+}
+
+# List endpoint -> (queryset, serializer) as its list action uses them
+LIST_THROUGHPUT = {
+    'inventory.api_list': (lambda: InventoryViewSet.queryset, InventoryListSerializer),
+    'sku.api_list': (lambda: ProductSKUViewSet.queryset, ProductSKUSerializer),
+}
+
+
+def run_benchmark(name, iterations=20, warmup=2):
+    """Time ``iterations`` calls of benchmark ``name``; return its metrics."""
+    client = Client()
+    counter = QueryCounter()
+    durations = []
+    queries = set()
+    with tempfile.TemporaryDirectory() as media_root, \
+            override_settings(MEDIA_ROOT=media_root, ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']), \
+            transaction.atomic():
+        call = BENCHMARKS[name](client)
+
+        def measured():
+            with connection.execute_wrapper(counter):
+                counter.count = 0
+                response = call()
+                if hasattr(response, 'status_code'):
+                    if response.status_code >= 400:
+                        raise BenchmarkError(f'{name} returned HTTP {response.status_code}')
+                    _consume(response)
+            return counter.count
+
+        for _ in range(warmup):
+            measured()
+        for _ in range(iterations):
+            started = time.perf_counter()
+            queries.add(measured())
+            durations.append((time.perf_counter() - started) * 1000)
+
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        try:
+            measured()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            if not tracing:
+                tracemalloc.stop()
+        transaction.set_rollback(True)
+
+    samples = np.array(durations)
+    return {
+        'iterations': iterations,
+        'p50_ms': round(float(np.percentile(samples, 50)), 3),
+        'p95_ms': round(float(np.percentile(samples, 95)), 3),
+        'p99_ms': round(float(np.percentile(samples, 99)), 3),
+        'mean_ms': round(float(samples.mean()), 3),
+        'min_ms': round(float(samples.min()), 3),
+        'max_ms': round(float(samples.max()), 3),
+        # The highest count seen; it only varies when a view caches between calls
+        'queries': max(queries),
+        'peak_memory_mb': round(peak / 2 ** 20, 2),
+    }
+
+
+def load_budgets(path):
+    return json.loads(Path(path).read_text())
+
+
+def check_budgets(results, budgets):
+    """Every metric over its budget, as ``(benchmark, metric, value, budget)``."""
+    breaches = []
+    for name, result in results.items():
+        for metric, budget in budgets.get(name, {}).items():
+            if metric in METRICS and result[metric] > budget:
+                breaches.append((name, metric, result[metric], budget))
+    return breaches
+
+
+def run_throughput(name, iterations=3):
+    """Best rows per second of the serializer and the fast list path for ``name``."""
+    get_queryset, serializer_class = LIST_THROUGHPUT[name]
+    queryset = get_queryset().order_by('pk')
+    _first(queryset)
+    context = {'request': Request(RequestFactory().get('/api/'))}
+    paths = {
+        'serializer': lambda: JSONRenderer().render(serializer_class(queryset.all(), many=True, context=context).data),
+        'fast': lambda: ORJSONRenderer().render(fast_rows(queryset.all(), serializer_class(context=context))),
+    }
+    best = {}
+    output = {}
+    for path, render in paths.items():
+        for _ in range(iterations):
+            started = time.perf_counter()
+            output[path] = render()
+            elapsed = time.perf_counter() - started
+            best[path] = min(best.get(path, elapsed), elapsed)
+    if output['serializer'] != output['fast']:
+        raise BenchmarkError(f'{name}: the fast list path does not match the serializer output')
+
+    rows = queryset.count()
+    return {
+        'rows': rows,
+        'bytes': len(output['fast']),
+        'serializer_rows_per_sec': round(rows / best['serializer']),
+        'fast_rows_per_sec': round(rows / best['fast']),
+        'speedup': round(best['serializer'] / best['fast'], 2),
+    }
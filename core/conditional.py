@@ -0,0 +1,63 @@
+"""Conditional GET for list and detail endpoints.
+
+``ConditionalGetMixin`` validates a GET before serializing anything: one
+aggregate query over the same filtered queryset the view would serialize
+gives ``COUNT(*)`` and ``MAX()`` of each of ``conditional_timestamps``. Any
+insert or update moves a maximum and any delete changes the count, so the
+pair changes whenever the payload can. Reference-cache versions of embedded
+lookups (a category name shown on every row) can be mixed in through
+``conditional_reference_kinds``.
+
+The ETag also covers the full path and the negotiated media type, so pages,
+filters and renderers each get their own tag. ``If-None-Match`` and
+``If-Modified-Since`` are evaluated by Django's ``get_conditional_response``.
+"""
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from . import reference
+
+
+class ConditionalGetMixin:
+    conditional_timestamps = ['updated_at']
+    conditional_reference_kinds = []
+
+    def validators(self, queryset):
+        aggregates = {f'max_{i}': Max(field) for i, field in enumerate(self.conditional_timestamps)}
+        state = queryset.order_by().aggregate(count=Count('pk'), **aggregates)
+        stamps = [state[f'max_{i}'] for i in range(len(self.conditional_timestamps))]
+        last_modified = max((stamp for stamp in stamps if stamp is not None), default=None)
+        parts = [
+            self.request.get_full_path(),
+            self.request.accepted_media_type,
+            state['count'],
+            *(stamp.isoformat() if stamp else '' for stamp in stamps),
+            *(reference.version(kind) for kind in self.conditional_reference_kinds),
+        ]
+        etag = '"{}"'.format(hashlib.sha1('|'.join(map(str, parts)).encode()).hexdigest())
+        return etag, last_modified
+
+    def conditional(self, queryset, render):
+        etag, last_modified = self.validators(queryset)
+        # Whole seconds, as in the HTTP date clients send back in If-Modified-Since
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        not_modified = get_conditional_response(self.request, etag=etag, last_modified=timestamp)
+        response = not_modified if not_modified is not None else render()
+        response['ETag'] = etag
+        if timestamp is not None:
+            response['Last-Modified'] = http_date(timestamp)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return self.conditional(queryset, lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset()).filter(
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        )
+        return self.conditional(queryset, lambda: super(ConditionalGetMixin, self).retrieve(request, *args, **kwargs))
@@ -0,0 +1,129 @@
+"""Cached figures for the admin dashboard.
+
+KPI counts live in the cache until a save or delete of the model they count
+drops them (see ``core.signals``); ``DASHBOARD_CACHE_TIMEOUT`` bounds how
+stale they get after bulk operations, which send no signals.
+
+The monthly chart counts SKUs created, orders completed and alterations
+completed. Missing months are computed with one query (a ``date_trunc``
+GROUP BY per series, combined with UNION ALL) and cached per month: the
+current month for ``DASHBOARD_CACHE_TIMEOUT``, closed months, which change
+only when an old row is edited or bulk-loaded, for the longer
+``DASHBOARD_MONTH_CACHE_TIMEOUT``. Completion
+months use ``updated_at`` of rows whose status is COMPLETED, as neither model
+records a separate completion time.
+"""
+from datetime import date, datetime, time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Value
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from alteration.models import Alteration
+from forecasting.forecasts import month_range
+from sku.models import ProductSKU
+from supplier.models import Order, Supplier
+
+KPI_PREFIX = 'dashboard:kpi'
+MONTH_PREFIX = 'dashboard:month'
+SERIES = {
+    'skus': 'SKUs created',
+    'orders': 'Orders completed',
+    'alterations': 'Alterations completed',
+}
+KPIS = {
+    'products': lambda: ProductSKU.objects.count(),
+    'active_orders': lambda: Order.objects.exclude(status='COMPLETED').count(),
+    'pending_alterations': lambda: Alteration.objects.filter(status='PENDING').count(),
+    'suppliers': lambda: Supplier.objects.count(),
+}
+
+
+def kpi_key(name):
+    return f'{KPI_PREFIX}:{name}'
+
+
+def month_key(month):
+    return f'{MONTH_PREFIX}:{month:%Y-%m}'
+
+
+def kpis():
+    """Current KPI counts, counting only those not in the cache."""
+    values = cache.get_many([kpi_key(name) for name in KPIS])
+    result = {}
+    missing = {}
+    for name, count in KPIS.items():
+        key = kpi_key(name)
+        if key in values:
+            result[name] = values[key]
+        else:
+            result[name] = missing[key] = count()
+    if missing:
+        cache.set_many(missing, settings.DASHBOARD_CACHE_TIMEOUT)
+    return result
+
+
+def _month_counts(start):
+    """``{month: {series: count}}`` for every month from ``start`` on, in one query."""
+    since = timezone.make_aware(datetime.combine(start, time.min))
+    skus = (
+        ProductSKU.objects.filter(created_at__gte=since)
+        .annotate(series=Value('skus'), month=TruncMonth('created_at'))
+        .values('series', 'month').annotate(total=Count('id')).order_by()
+    )
+    orders = (
+        Order.objects.filter(status='COMPLETED', updated_at__gte=since)
+        .annotate(series=Value('orders'), month=TruncMonth('updated_at'))
+        .values('series', 'month').annotate(total=Count('id')).order_by()
+    )
+    alterations = (
+        Alteration.objects.filter(status='COMPLETED', updated_at__gte=since)
+        .annotate(series=Value('alterations'), month=TruncMonth('updated_at'))
+        .values('series', 'month').annotate(total=Count('id')).order_by()
+    )
+    counts = {}
+    for row in skus.union(orders, alterations, all=True):
+        month = timezone.localtime(row['month']).date() if isinstance(row['month'], datetime) else row['month']
+        counts.setdefault(month, {})[row['series']] = row['total']
+    return counts
+
+
+def monthly_series(months=6):
+    """``(months, {series: [count per month]})`` for the last ``months`` months."""
+    current = timezone.localdate().replace(day=1)
+    index = current.year * 12 + current.month - months
+    window = month_range(date(index // 12, index % 12 + 1, 1), months)
+
+    cached = cache.get_many([month_key(m) for m in window])
+    missing = [m for m in window if month_key(m) not in cached]
+    if missing:
+        counts = _month_counts(missing[0])
+        closed = {}
+        for month in missing:
+            entry = {name: counts.get(month, {}).get(name, 0) for name in SERIES}
+            cached[month_key(month)] = entry
+            if month < current:
+                closed[month_key(month)] = entry
+        cache.set_many(closed, settings.DASHBOARD_MONTH_CACHE_TIMEOUT)
+        if current in missing:
+            cache.set(month_key(current), cached[month_key(current)], settings.DASHBOARD_CACHE_TIMEOUT)
+
+    return window, {name: [cached[month_key(m)][name] for m in window] for name in SERIES}
+
+
+def invalidate_kpis(*names):
+    cache.delete_many([kpi_key(name) for name in names])
+
+
+def invalidate_month(moment):
+    """Drop the cached chart month containing ``moment`` (a datetime)."""
+    if moment is not None:
+        cache.delete(month_key(timezone.localtime(moment).date().replace(day=1)))
+
+
+def invalidate_months(start, end):
+    """Drop every cached chart month from ``start`` to ``end`` (dates), for bulk loads."""
+    months = (end.year - start.year) * 12 + end.month - start.month + 1
+    cache.delete_many([month_key(month) for month in month_range(start, months)])
@@ -0,0 +1,194 @@
+"""Fast read path for list endpoints.
+
+``FastListMixin`` serves a viewset's ``list`` without building a model
+instance or a serializer per row. The list serializer is compiled once per
+request into a reader per field: each dotted source becomes an ORM path
+(``sku.category.name`` becomes ``sku__category__name``) fetched in one
+``values_list`` query, and the value is converted by the field's own
+``to_representation``. The columns stay declared only on the serializer and
+the response is the same, key order, skipped keys and nested serializers
+included.
+
+Sources ``values_list`` cannot express (methods, properties, reverse and
+many-to-many relations, ``many=True`` serializers) make the compiler give up,
+and the view falls back to the serializer, as it does when it paginates.
+"""
+import logging
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from rest_framework import serializers
+from rest_framework.fields import empty
+from rest_framework.relations import ManyRelatedField, PrimaryKeyRelatedField, RelatedField
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .renderers import LIST_RENDERER_CLASSES
+
+logger = logging.getLogger(__name__)
+
+SKIP = object()
+# Serializer fields whose to_representation returns values of these model fields unchanged
+PASSTHROUGH = {
+    serializers.CharField: (models.CharField, models.TextField),
+    serializers.IntegerField: (models.IntegerField,),
+    serializers.BooleanField: (models.BooleanField,),
+}
+_warned = set()
+
+
+class Unsupported(Exception):
+    pass
+
+
+def _resolve(model, prefix, attrs):
+    """``(path, nullable_hops, model_field)`` for the source ``attrs`` on ``model``.
+
+    ``nullable_hops`` are the paths of nullable relations crossed on the way,
+    where the serializer would hit ``None`` before reaching the last attribute.
+    """
+    path = prefix
+    hops = []
+    field = None
+    for attr in attrs:
+        if field is not None:
+            if not field.is_relation:
+                raise Unsupported(f'{path} is not a relation')
+            if field.null:
+                hops.append(path)
+            model = field.related_model
+        try:
+            field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            raise Unsupported(f'{model.__name__}.{attr} is not a model field')
+        if not field.concrete or field.many_to_many or field.one_to_many:
+            raise Unsupported(f'{model.__name__}.{attr} is not a forward field')
+        path = f'{path}__{attr}' if path else attr
+    return path, hops, field
+
+
+class Compiler:
+    def __init__(self, context):
+        self.context = context
+        self.columns = {}
+
+    def column(self, path):
+        return self.columns.setdefault(path, len(self.columns))
+
+    def serializer(self, serializer, model, prefix=''):
+        if type(serializer).to_representation is not serializers.Serializer.to_representation:
+            raise Unsupported(f'{type(serializer).__name__} overrides to_representation')
+        readers = [
+            (field.field_name, self.field(field, model, prefix))
+            for field in serializer._readable_fields
+        ]
+
+        def read(row):
+            item = {}
+            for name, reader in readers:
+                value = reader(row)
+                if value is not SKIP:
+                    item[name] = value
+            return item
+        return read
+
+    def missing(self, field):
+        """What the serializer does when a nullable relation on the source path is ``None``."""
+        if field.default is not empty:
+            return field.get_default
+        if field.allow_null:
+            return lambda: None
+        if not field.required:
+            return lambda: SKIP
+        raise Unsupported(f'{field.field_name} would raise on a missing relation')
+
+    def field(self, field, model, prefix):
+        if isinstance(field, (serializers.ListSerializer, ManyRelatedField, serializers.SerializerMethodField)):
+            raise Unsupported(f'{field.field_name} is not a single value')
+        if field.source == '*':
+            raise Unsupported(f'{field.field_name} reads the whole object')
+        path, hops, model_field = _resolve(model, prefix, field.source_attrs)
+        missing = self.missing(field) if hops else None
+        hop_columns = [self.column(hop) for hop in hops]
+        column = self.column(path)
+
+        if isinstance(field, serializers.BaseSerializer):
+            if not model_field.is_relation:
+                raise Unsupported(f'{field.field_name} does not follow a relation')
+            nested = self.serializer(field, model_field.related_model, path)
+            convert = None
+        else:
+            nested = None
+            convert = self.converter(field, model_field)
+
+        def read(row):
+            for hop in hop_columns:
+                if row[hop] is None:
+                    value = missing()
+                    if value is SKIP or value is None:
+                        return value
+                    return convert(value) if convert else value
+            value = row[column]
+            if value is None:
+                return None
+            if nested is not None:
+                return nested(row)
+            return convert(value) if convert else value
+        return read
+
+    def converter(self, field, model_field):
+        if isinstance(field, RelatedField):
+            if not isinstance(field, PrimaryKeyRelatedField) or field.pk_field is not None or not model_field.is_relation:
+                raise Unsupported(f'{field.field_name} is not a plain primary key relation')
+            return None
+        if model_field.is_relation:
+            raise Unsupported(f'{field.field_name} renders a related object')
+        if isinstance(field, serializers.FileField):
+            return self.file_converter(field, model_field)
+        if isinstance(model_field, PASSTHROUGH.get(type(field), ())):
+            return None
+        return field.to_representation
+
+    def file_converter(self, field, model_field):
+        use_url = getattr(field, 'use_url', api_settings.UPLOADED_FILES_USE_URL)
+        storage = model_field.storage
+        request = self.context.get('request')
+
+        def convert(name):
+            if not name:
+                return None
+            if not use_url:
+                return name
+            url = storage.url(name)
+            return request.build_absolute_uri(url) if request is not None else url
+        return convert
+
+
+def compile_serializer(serializer, model):
+    """``(paths, read)``: the ``values_list`` paths and the row-to-dict reader for ``serializer``."""
+    compiler = Compiler(serializer.context)
+    read = compiler.serializer(serializer, model)
+    return list(compiler.columns), read
+
+
+def fast_rows(queryset, serializer):
+    """What ``serializer`` with ``many=True`` would return for ``queryset``, without instances."""
+    paths, read = compile_serializer(serializer, queryset.model)
+    return [read(row) for row in queryset.values_list(*paths)]
+
+
+class FastListMixin:
+    """Serve ``list`` through ``fast_rows`` and offer the orjson and MessagePack renderers."""
+
+    renderer_classes = LIST_RENDERER_CLASSES
+
+    def list(self, request, *args, **kwargs):
+        if self.paginator is None:
+            serializer = self.get_serializer()
+            try:
+                return Response(fast_rows(self.filter_queryset(self.get_queryset()), serializer))
+            except Unsupported as exc:
+                if type(serializer) not in _warned:
+                    _warned.add(type(serializer))
+                    logger.warning('%s cannot use the fast list path: %s', type(serializer).__name__, exc)
+        return super().list(request, *args, **kwargs)
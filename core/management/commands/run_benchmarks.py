@@ -0,0 +1,91 @@
+import json
+import platform
+import subprocess
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+from core.benchmarks import BENCHMARK_END_DATE, BENCHMARKS, LIST_THROUGHPUT, BenchmarkError, check_budgets, load_budgets, run_benchmark, run_throughput
+from core.synthetic import PRESETS
+from sku.models import ProductSKU
+from supplier.models import Order
+
+class Command(BaseCommand):
+    help = 'Benchmark the hot-path views against the seeded database and fail when a budget is exceeded'
+
+    def add_arguments(self, parser):
+        parser.add_argument('benchmarks', nargs='*', help=f'Benchmarks to run (default all): {", ".join(BENCHMARKS)}')
+        parser.add_argument('--preset', choices=list(PRESETS), default='small', help='Dataset size the budgets are for')
+        parser.add_argument('--generate', action='store_true', help=f'Load the preset with generate_synthetic_data first, ending {BENCHMARK_END_DATE}; use an empty database')
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument('--budgets', default=settings.BENCHMARK_BUDGETS, help='Budgets JSON file')
+        parser.add_argument('--no-budgets', action='store_true', help='Only report, never fail')
+        parser.add_argument('--throughput', action='store_true', help=f'Also compare list serialization rows/sec: {", ".join(LIST_THROUGHPUT)}')
+        parser.add_argument('--output', help='Write the results as JSON to this file ("-" for stdout)')
+
+    def handle(self, *args, **options):
+        unknown = set(options['benchmarks']) - set(BENCHMARKS)
+        if unknown:
+            raise CommandError(f'Unknown benchmarks: {", ".join(sorted(unknown))}')
+        if options['generate']:
+            call_command('generate_synthetic_data', preset=options['preset'], end_date=BENCHMARK_END_DATE, stdout=self.stderr)
+
+        results = {}
+        for name in options['benchmarks'] or BENCHMARKS:
+            try:
+                results[name] = result = run_benchmark(name, options['iterations'], options['warmup'])
+            except BenchmarkError as exc:
+                raise CommandError(str(exc))
+            self.stderr.write(
+                f'{name:<30} p50 {result["p50_ms"]:>9.2f}ms  p95 {result["p95_ms"]:>9.2f}ms  '
+                f'{result["queries"]:>5} queries  {result["peak_memory_mb"]:>7.2f}MB'
+            )
+
+        throughput = {}
+        if options['throughput']:
+            for name in LIST_THROUGHPUT:
+                try:
+                    throughput[name] = result = run_throughput(name)
+                except BenchmarkError as exc:
+                    raise CommandError(str(exc))
+                self.stderr.write(
+                    f'{name:<30} {result["rows"]:>8} rows  serializer {result["serializer_rows_per_sec"]:>9}/s  '
+                    f'fast {result["fast_rows_per_sec"]:>9}/s  x{result["speedup"]}'
+                )
+
+        breaches = []
+        if not options['no_budgets']:
+            breaches = check_budgets(results, load_budgets(options['budgets']).get(options['preset'], {}))
+
+        report = {
+            'timestamp': timezone.now().isoformat(),
+            'commit': self.commit(),
+            'python': platform.python_version(),
+            'database': connection.vendor,
+            'preset': options['preset'],
+            'dataset': {'skus': ProductSKU.objects.count(), 'orders': Order.objects.count()},
+            'results': results,
+            'throughput': throughput,
+            'breaches': [dict(zip(['benchmark', 'metric', 'value', 'budget'], breach)) for breach in breaches],
+        }
+        if options['output'] == '-':
+            self.stdout.write(json.dumps(report, indent=2))
+        elif options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2)
+
+        if breaches:
+            for name, metric, value, budget in breaches:
+                self.stderr.write(f'{name}: {metric} {value} exceeds budget {budget}')
+            raise CommandError(f'{len(breaches)} benchmark budgets exceeded')
+        self.stderr.write(self.style.SUCCESS(f'{len(results)} benchmarks within budget'))
+
+    def commit(self):
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', 'HEAD'], cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
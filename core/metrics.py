@@ -0,0 +1,196 @@
+"""In-process request metrics exposed in the Prometheus text format.
+
+``MetricsMiddleware`` records, per view name, method and status class:
+request latency and response size histograms, and totals of SQL queries and
+SQL time counted through ``connection.execute_wrapper``. Updates are plain
+integer/float additions under one lock, so the per-request cost is a few
+microseconds.
+
+With several worker processes each keeps its own counters. Setting
+``METRICS_MULTIPROCESS_DIR`` makes every process write a snapshot of its
+counters to ``<dir>/<pid>.json`` (at most every ``METRICS_FLUSH_SECONDS``)
+and ``/metrics`` sums all snapshots, including those of exited workers, so
+totals never go backwards. Clear the directory when the server restarts.
+"""
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+LABELS = ('view', 'method', 'status')
+
+
+class SQLTracker:
+    """``execute_wrapper`` hook counting queries and time spent in the database."""
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.queries += 1
+
+
+def _bucket(buckets, value):
+    for i, bound in enumerate(buckets):
+        if value <= bound:
+            return i
+    return len(buckets)
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.series = {}
+        self.flushed_at = 0.0
+
+    def observe(self, view, method, status, seconds, size, queries, sql_seconds):
+        key = (view, method, f'{status // 100}xx')
+        latency = _bucket(LATENCY_BUCKETS, seconds)
+        size_bucket = _bucket(SIZE_BUCKETS, size)
+        with self.lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = {
+                    'count': 0, 'seconds': 0.0, 'bytes': 0, 'queries': 0, 'sql_seconds': 0.0,
+                    'latency_buckets': [0] * (len(LATENCY_BUCKETS) + 1),
+                    'size_buckets': [0] * (len(SIZE_BUCKETS) + 1),
+                }
+            series['count'] += 1
+            series['seconds'] += seconds
+            series['bytes'] += size
+            series['queries'] += queries
+            series['sql_seconds'] += sql_seconds
+            series['latency_buckets'][latency] += 1
+            series['size_buckets'][size_bucket] += 1
+
+    def snapshot(self):
+        with self.lock:
+            return [
+                {'labels': list(key), **{k: list(v) if isinstance(v, list) else v for k, v in series.items()}}
+                for key, series in self.series.items()
+            ]
+
+    def flush(self, directory, force=False):
+        """Write this process's snapshot for other processes to aggregate."""
+        now = time.monotonic()
+        if not force and now - self.flushed_at < getattr(settings, 'METRICS_FLUSH_SECONDS', 5):
+            return
+        self.flushed_at = now
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f'{os.getpid()}.json'
+        temporary = directory / f'{os.getpid()}.{threading.get_ident()}.tmp'
+        temporary.write_text(json.dumps(self.snapshot()))
+        os.replace(temporary, path)
+
+
+registry = Registry()
+
+
+def collect():
+    """Series from this process, or summed over every process in multiprocess mode."""
+    directory = getattr(settings, 'METRICS_MULTIPROCESS_DIR', None)
+    if not directory:
+        return registry.snapshot()
+    registry.flush(directory, force=True)
+    merged = {}
+    for path in Path(directory).glob('*.json'):
+        try:
+            snapshot = json.loads(path.read_text())
+        except (OSError, ValueError):
+            continue
+        for series in snapshot:
+            key = tuple(series['labels'])
+            total = merged.get(key)
+            if total is None:
+                merged[key] = series
+                continue
+            for name, value in series.items():
+                if name == 'labels':
+                    continue
+                if isinstance(value, list):
+                    total[name] = [a + b for a, b in zip(total[name], value)]
+                else:
+                    total[name] += value
+    return list(merged.values())
+
+
+def _labels(series, **extra):
+    pairs = [*zip(LABELS, series['labels']), *extra.items()]
+    return ','.join('{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"')) for name, value in pairs)
+
+
+def _histogram(lines, name, help_text, buckets, field, total_field, all_series):
+    lines.append(f'# HELP {name} {help_text}')
+    lines.append(f'# TYPE {name} histogram')
+    for series in all_series:
+        cumulative = 0
+        for bound, count in zip([*buckets, '+Inf'], series[field]):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{_labels(series, le=bound)}}} {cumulative}')
+        lines.append(f'{name}_sum{{{_labels(series)}}} {series[total_field]}')
+        lines.append(f'{name}_count{{{_labels(series)}}} {series["count"]}')
+
+
+def _counter(lines, name, help_text, field, all_series):
+    lines.append(f'# HELP {name} {help_text}')
+    lines.append(f'# TYPE {name} counter')
+    for series in all_series:
+        lines.append(f'{name}{{{_labels(series)}}} {series[field]}')
+
+
+def render(all_series):
+    all_series = sorted(all_series, key=lambda series: series['labels'])
+    lines = []
+    _histogram(lines, 'django_request_duration_seconds', 'Request latency by view.',
+               LATENCY_BUCKETS, 'latency_buckets', 'seconds', all_series)
+    _histogram(lines, 'django_response_size_bytes', 'Response body size by view.',
+               SIZE_BUCKETS, 'size_buckets', 'bytes', all_series)
+    _counter(lines, 'django_db_queries_total', 'SQL queries executed by view.', 'queries', all_series)
+    _counter(lines, 'django_db_query_duration_seconds_total', 'Time spent in SQL by view.', 'sql_seconds', all_series)
+    return '\n'.join(lines) + '\n'
+
+
+class MetricsMiddleware:
+    """Record latency, response size and SQL work for every request."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.server_timing = getattr(settings, 'METRICS_SERVER_TIMING', False)
+        self.multiprocess_dir = getattr(settings, 'METRICS_MULTIPROCESS_DIR', None)
+
+    def __call__(self, request):
+        tracker = SQLTracker()
+        started = time.perf_counter()
+        with connection.execute_wrapper(tracker):
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+
+        if response.streaming:
+            size = int(response.get('Content-Length') or 0)
+        else:
+            size = len(response.content)
+        match = request.resolver_match
+        view = match.view_name if match else '<unresolved>'
+        registry.observe(view, request.method, response.status_code, elapsed, size, tracker.queries, tracker.seconds)
+
+        if self.server_timing:
+            response['Server-Timing'] = (
+                f'db;dur={tracker.seconds * 1000:.1f};desc="{tracker.queries} queries", '
+                f'app;dur={elapsed * 1000:.1f}'
+            )
+        if self.multiprocess_dir:
+            registry.flush(self.multiprocess_dir)
+        return response
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_outfittype'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CapturedQuery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('SLOW', 'Slow'), ('REPEATED', 'Repeated')], max_length=10)),
+                ('fingerprint', models.CharField(db_index=True, help_text='SHA-1 of the normalised SQL', max_length=40)),
+                ('sql', models.TextField(help_text='SQL with literals replaced by ?')),
+                ('view', models.CharField(max_length=255)),
+                ('call_site', models.CharField(blank=True, max_length=500)),
+                ('duration_ms', models.FloatField(help_text='Slowest execution, or total time of all repeats')),
+                ('repeats', models.PositiveIntegerField(default=1)),
+                ('plan', models.JSONField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name_plural': 'captured queries',
+                'ordering': ['-id'],
+            },
+        ),
+    ]
@@ -1,3 +1,4 @@
+import zlib
 from django.db import models
 
 class Category(models.Model):
@@ -13,3 +14,54 @@ class OutfitType(models.Model):
 
     def __str__(self):
         return f"{self.name} ({self.code})"
+
+class CapturedQuery(models.Model):
+    KIND_CHOICES = [
+        ('SLOW', 'Slow'),
+        ('REPEATED', 'Repeated'),
+    ]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    fingerprint = models.CharField(max_length=40, db_index=True, help_text="SHA-1 of the normalised SQL")
+    sql = models.TextField(help_text="SQL with literals replaced by ?")
+    view = models.CharField(max_length=255)
+    call_site = models.CharField(max_length=500, blank=True)
+    duration_ms = models.FloatField(help_text="Slowest execution, or total time of all repeats")
+    repeats = models.PositiveIntegerField(default=1)
+    plan = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-id']
+        verbose_name_plural = "captured queries"
+
+    def __str__(self):
+        return f"{self.get_kind_display()} query in {self.view}"
+
+class RequestProfile(models.Model):
+    TRIGGER_CHOICES = [
+        ('HEADER', 'Requested by staff'),
+        ('RATE', 'Random sample'),
+        ('SLOW', 'Slow request'),
+    ]
+
+    view = models.CharField(max_length=255)
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=500)
+    status_code = models.PositiveSmallIntegerField()
+    trigger = models.CharField(max_length=10, choices=TRIGGER_CHOICES)
+    duration_ms = models.FloatField()
+    cpu_ms = models.FloatField(help_text="CPU time of the request thread")
+    interval_ms = models.FloatField()
+    samples = models.PositiveIntegerField()
+    data = models.BinaryField(help_text="zlib-compressed collapsed stacks")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-id']
+
+    def __str__(self):
+        return f"{self.method} {self.path} ({self.duration_ms:.0f} ms)"
+
+    def collapsed_stacks(self):
+        return zlib.decompress(self.data).decode()
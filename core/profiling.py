@@ -0,0 +1,217 @@
+"""Opt-in statistical profiling of production requests.
+
+``ProfilingMiddleware`` (enabled by ``PROFILING_ENABLED``) picks a request
+for profiling when a staff user sends ``X-Profile-Request: 1``, at random
+with probability ``PROFILING_SAMPLE_RATE``, or, when ``PROFILING_SLOW_MS``
+is set, for every request but keeping only the profiles of requests slower
+than that. Picked requests register their thread with one shared sampler
+thread, which reads the thread's stack through ``sys._current_frames()``
+every ``PROFILING_INTERVAL_MS``. This works for any worker thread, costs
+the request itself nothing while it runs, and the sampler sleeps when no
+request is registered.
+
+Profiles are stored zlib-compressed in the collapsed-stack format
+(``root;child;leaf count`` per line) and can be downloaded from the admin as
+that or as a speedscope JSON file.
+"""
+import os
+import random
+import sys
+import threading
+import time
+import zlib
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .models import RequestProfile
+
+PROFILE_HEADER = 'X-Profile-Request'
+_PROJECT_DIR = str(Path(settings.BASE_DIR).resolve())
+
+
+def _frame_name(code):
+    filename = code.co_filename
+    if '-packages/' in filename:
+        filename = filename.split('-packages/', 1)[1]
+    elif filename.startswith(_PROJECT_DIR):
+        filename = str(Path(filename).relative_to(_PROJECT_DIR))
+    return f'{code.co_name} ({filename}:{code.co_firstlineno})'
+
+
+class Sampler(threading.Thread):
+    """Daemon thread sampling the stacks of registered threads."""
+
+    def __init__(self, interval):
+        super().__init__(name='request-profiler', daemon=True)
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.targets = {}
+        self.wakeup = threading.Event()
+        self.names = {}
+
+    def add(self, thread_id, stop_code):
+        stacks = Counter()
+        with self.lock:
+            self.targets[thread_id] = (stacks, stop_code)
+        self.wakeup.set()
+        return stacks
+
+    def remove(self, thread_id):
+        with self.lock:
+            self.targets.pop(thread_id, None)
+
+    def run(self):
+        while True:
+            if not self.targets:
+                self.wakeup.wait()
+                self.wakeup.clear()
+                continue
+            time.sleep(self.interval)
+            frames = sys._current_frames()
+            with self.lock:
+                for thread_id, (stacks, stop_code) in self.targets.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        stacks[self.stack(frame, stop_code)] += 1
+
+    def stack(self, frame, stop_code):
+        """Frame names from the profiled middleware call down to ``frame``."""
+        names = []
+        while frame is not None and frame.f_code is not stop_code:
+            code = frame.f_code
+            name = self.names.get(code)
+            if name is None:
+                name = self.names[code] = _frame_name(code)
+            names.append(name)
+            frame = frame.f_back
+        return tuple(reversed(names))
+
+
+_sampler = None
+_sampler_pid = None
+_sampler_lock = threading.Lock()
+
+
+def get_sampler():
+    """The process's sampler thread, started on first use (and again after a fork)."""
+    global _sampler, _sampler_pid
+    if _sampler_pid != os.getpid():
+        with _sampler_lock:
+            if _sampler_pid != os.getpid():
+                _sampler = Sampler(settings.PROFILING_INTERVAL_MS / 1000)
+                _sampler.start()
+                _sampler_pid = os.getpid()
+    return _sampler
+
+
+def collapse(stacks):
+    return ''.join(f'{";".join(stack)} {count}\n' for stack, count in stacks.most_common())
+
+
+def parse_collapsed(text):
+    stacks = []
+    for line in text.splitlines():
+        stack, _, count = line.rpartition(' ')
+        stacks.append((stack.split(';') if stack else [], int(count)))
+    return stacks
+
+
+def to_speedscope(profile):
+    """A speedscope file (sampled profile, weights in milliseconds) for ``profile``.
+
+    Samples are weighted by the request's wall time over the sample count
+    rather than by the nominal interval, since the sampler thread waits for
+    the GIL and fires less often than asked under CPU-bound work.
+    """
+    sample_ms = profile.duration_ms / max(profile.samples, 1)
+    frames = []
+    index = {}
+    samples = []
+    weights = []
+    for stack, count in parse_collapsed(profile.collapsed_stacks()):
+        sample = []
+        for name in stack:
+            if name not in index:
+                index[name] = len(frames)
+                frames.append({'name': name})
+            sample.append(index[name])
+        samples.append(sample)
+        weights.append(round(count * sample_ms, 3))
+    return {
+        '$schema': 'https://www.speedscope.app/file-format-schema.json',
+        'shared': {'frames': frames},
+        'profiles': [{
+            'type': 'sampled',
+            'name': f'{profile.method} {profile.path}',
+            'unit': 'milliseconds',
+            'startValue': 0,
+            'endValue': sum(weights),
+            'samples': samples,
+            'weights': weights,
+        }],
+        'name': f'{profile.view} #{profile.pk}',
+        'exporter': 'laajavab-profiler',
+    }
+
+
+def store(request, response, trigger, stacks, elapsed, cpu_seconds):
+    match = request.resolver_match
+    profile = RequestProfile.objects.create(
+        view=match.view_name if match else '<unresolved>',
+        method=request.method,
+        path=request.get_full_path()[:500],
+        status_code=response.status_code,
+        trigger=trigger,
+        duration_ms=round(elapsed * 1000, 3),
+        cpu_ms=round(cpu_seconds * 1000, 3),
+        interval_ms=settings.PROFILING_INTERVAL_MS,
+        samples=sum(stacks.values()),
+        data=zlib.compress(collapse(stacks).encode()),
+    )
+    newest = profile.pk - settings.PROFILING_MAX_PROFILES
+    if newest > 0:
+        RequestProfile.objects.filter(pk__lte=newest).delete()
+    return profile
+
+
+class ProfilingMiddleware:
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = settings.PROFILING_SAMPLE_RATE
+        self.slow_seconds = settings.PROFILING_SLOW_MS / 1000 if settings.PROFILING_SLOW_MS else None
+
+    def trigger(self, request):
+        if request.headers.get(PROFILE_HEADER) == '1' and request.user.is_staff:
+            return 'HEADER'
+        if self.sample_rate and random.random() < self.sample_rate:
+            return 'RATE'
+        if self.slow_seconds is not None:
+            return 'SLOW'
+        return None
+
+    def __call__(self, request):
+        trigger = self.trigger(request)
+        if trigger is None:
+            return self.get_response(request)
+
+        sampler = get_sampler()
+        thread_id = threading.get_ident()
+        stacks = sampler.add(thread_id, ProfilingMiddleware.__call__.__code__)
+        started = time.perf_counter()
+        cpu_started = time.thread_time()
+        try:
+            response = self.get_response(request)
+        finally:
+            sampler.remove(thread_id)
+        elapsed = time.perf_counter() - started
+
+        if stacks and (trigger != 'SLOW' or elapsed >= self.slow_seconds):
+            profile = store(request, response, trigger, stacks, elapsed, time.thread_time() - cpu_started)
+            if trigger == 'HEADER':
+                response['X-Profile-Id'] = str(profile.pk)
+        return response
@@ -0,0 +1,178 @@
+"""Opt-in capture of slow and repeated SQL queries.
+
+``QueryCaptureMiddleware`` watches every query a request runs. Queries
+slower than ``QUERY_CAPTURE_SLOW_MS`` are stored as ``CapturedQuery`` rows
+with their normalised SQL fingerprint, the view and the innermost project
+stack frame that issued them; on PostgreSQL the first capture of each
+fingerprint also stores its ``EXPLAIN (FORMAT JSON)`` plan. A fingerprint
+that runs more than ``QUERY_CAPTURE_REPEAT_THRESHOLD`` times in one request
+(typically an N+1 loop) is stored once as a REPEATED capture. The table is
+trimmed to the newest ``QUERY_CAPTURE_MAX_ROWS`` rows.
+
+With ``QUERY_CAPTURE_ENABLED`` off the middleware removes itself at startup.
+"""
+import hashlib
+import logging
+import re
+import sys
+import time
+from pathlib import Path
+
+import django.db
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DatabaseError, connection, transaction
+
+from . import metrics
+from .models import CapturedQuery
+
+logger = logging.getLogger(__name__)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'(?<![\w"])-?\d+(?:\.\d+)?\b')
+_PARAM = re.compile(r'%s|\$\d+')
+_IN_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_VALUES = re.compile(r'(VALUES\s*\(\.\.\.\))(?:\s*,\s*\(\.\.\.\))+', re.IGNORECASE)
+_SPACE = re.compile(r'\s+')
+
+_PROJECT_DIR = str(Path(settings.BASE_DIR).resolve())
+# Entry points and middleware sit under every view, so they never identify a call site
+_SKIPPED_FILES = {
+    __file__, metrics.__file__,
+    str(Path(_PROJECT_DIR) / 'manage.py'), str(Path(_PROJECT_DIR) / 'digital_boutique' / 'wsgi.py'),
+}
+_ORM_DIR = str(Path(django.db.__file__).parent)
+# Fingerprints explained by this process; the table is checked for the rest
+_explained = set()
+
+
+def normalize_sql(sql):
+    """SQL with literals and placeholders as ``?`` and lists of them folded to ``(...)``."""
+    sql = _STRING.sub('?', sql)
+    sql = _PARAM.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _IN_LIST.sub('(...)', sql)
+    sql = _VALUES.sub(r'\1', sql)
+    return _SPACE.sub(' ', sql).strip()
+
+
+def fingerprint(normalized):
+    return hashlib.sha1(normalized.encode()).hexdigest()
+
+
+def _describe(frame):
+    filename = frame.f_code.co_filename
+    if '-packages/' in filename:
+        filename = filename.split('-packages/', 1)[1]
+    elif filename.startswith(_PROJECT_DIR):
+        filename = str(Path(filename).relative_to(_PROJECT_DIR))
+    return f'{filename}:{frame.f_lineno} in {frame.f_code.co_name}'
+
+
+def call_site():
+    """The innermost frame in project code, else the innermost one outside the ORM.
+
+    Queries issued by library code (a DRF serializer walking a relation, say)
+    have no project frame; the library frame that touched the ORM is the
+    next best pointer.
+    """
+    frame = sys._getframe(2)
+    fallback = None
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename not in _SKIPPED_FILES:
+            if filename.startswith(_PROJECT_DIR) and '-packages' not in filename:
+                return _describe(frame)
+            if fallback is None and not filename.startswith(_ORM_DIR):
+                fallback = frame
+        frame = frame.f_back
+    return _describe(fallback) if fallback else ''
+
+
+class QueryCapture:
+    """``execute_wrapper`` hook collecting slow and repeated queries of one request."""
+
+    def __init__(self, slow_ms, repeat_threshold):
+        self.slow_seconds = slow_ms / 1000
+        self.repeat_threshold = repeat_threshold
+        self.seen = {}
+        self.slow = []
+        self.repeated = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            normalized = normalize_sql(sql)
+            count, total = self.seen.get(normalized, (0, 0.0))
+            self.seen[normalized] = (count + 1, total + elapsed)
+            if elapsed >= self.slow_seconds:
+                self.slow.append((normalized, sql, None if many else params, elapsed, call_site()))
+            if count == self.repeat_threshold:
+                self.repeated[normalized] = call_site()
+
+    def captures(self, view):
+        rows = []
+        for normalized, sql, params, elapsed, site in self.slow:
+            rows.append(CapturedQuery(
+                kind='SLOW', fingerprint=fingerprint(normalized), sql=normalized, view=view,
+                call_site=site, duration_ms=round(elapsed * 1000, 3),
+                plan=explain(normalized, sql, params),
+            ))
+        for normalized, site in self.repeated.items():
+            count, total = self.seen[normalized]
+            rows.append(CapturedQuery(
+                kind='REPEATED', fingerprint=fingerprint(normalized), sql=normalized, view=view,
+                call_site=site, duration_ms=round(total * 1000, 3), repeats=count,
+            ))
+        return rows
+
+
+def explain(normalized, sql, params):
+    """JSON plan for the first capture of a SELECT's fingerprint on PostgreSQL."""
+    if connection.vendor != 'postgresql' or not normalized.upper().startswith('SELECT'):
+        return None
+    key = fingerprint(normalized)
+    if key in _explained:
+        return None
+    _explained.add(key)
+    if CapturedQuery.objects.filter(fingerprint=key, plan__isnull=False).exists():
+        return None
+    try:
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+    except DatabaseError:
+        logger.warning('Could not EXPLAIN captured query %s', key, exc_info=True)
+        return None
+    return plan
+
+
+def store(rows):
+    if not rows:
+        return
+    CapturedQuery.objects.bulk_create(rows)
+    newest = CapturedQuery.objects.order_by('-id').values_list('id', flat=True).first()
+    CapturedQuery.objects.filter(id__lte=newest - settings.QUERY_CAPTURE_MAX_ROWS).delete()
+
+
+class QueryCaptureMiddleware:
+    def __init__(self, get_response):
+        if not settings.QUERY_CAPTURE_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        capture = QueryCapture(settings.QUERY_CAPTURE_SLOW_MS, settings.QUERY_CAPTURE_REPEAT_THRESHOLD)
+        with connection.execute_wrapper(capture):
+            response = self.get_response(request)
+        if capture.slow or capture.repeated:
+            match = request.resolver_match
+            view = match.view_name if match else request.path
+            try:
+                store(capture.captures(view))
+            except DatabaseError:
+                logger.exception('Could not store captured queries for %s', view)
+        return response
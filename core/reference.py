@@ -0,0 +1,87 @@
+"""Versioned cache of the reference lists used by forms and list endpoints.
+
+Each kind (categories, outfit types, suppliers) has a version number in the
+cache; cached lists and serialized payloads are keyed by it, so a save or
+delete only has to bump the version (see ``core.signals``) for every process
+sharing the cache to stop reading the old entries. That needs a shared
+backend (``file`` or ``redis``); with ``locmem`` each worker keeps its own
+versions and only the one that handled the save sees it. The version also
+serves as the ``ETag`` of the matching API list. Orders are not cached: the
+table is large and changes all the time.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_cache_control
+from rest_framework import status
+from rest_framework.response import Response
+
+from supplier.models import Supplier
+from .models import Category, OutfitType
+
+PREFIX = 'reference'
+QUERYSETS = {
+    'categories': lambda: Category.objects.all(),
+    'outfit_types': lambda: OutfitType.objects.all(),
+    'suppliers': lambda: Supplier.objects.all(),
+}
+
+
+def _version_key(kind):
+    return f'{PREFIX}:{kind}:version'
+
+
+def version(kind):
+    key = _version_key(kind)
+    current = cache.get(key)
+    if current is None:
+        # Start from the clock so a version lost to eviction is never reused
+        cache.add(key, time.time_ns(), None)
+        current = cache.get(key)
+    return current
+
+
+def bump(kind):
+    try:
+        cache.incr(_version_key(kind))
+    except ValueError:
+        cache.set(_version_key(kind), time.time_ns(), None)
+
+
+def _cached(key, build):
+    value = cache.get(key)
+    if value is None:
+        value = build()
+        cache.set(key, value, settings.REFERENCE_CACHE_TIMEOUT)
+    return value
+
+
+def get(kind):
+    """Every row of ``kind`` as a list of model instances."""
+    return _cached(f'{PREFIX}:{kind}:{version(kind)}', lambda: list(QUERYSETS[kind]()))
+
+
+def serialized(kind, serializer_class):
+    key = f'{PREFIX}:{kind}:{version(kind)}:{serializer_class.__name__}'
+    return _cached(key, lambda: serializer_class(get(kind), many=True).data)
+
+
+def etag(kind):
+    return f'"{kind}-{version(kind)}"'
+
+
+class ReferenceListMixin:
+    """Serve a viewset's list from the reference cache with ETag revalidation."""
+
+    reference_kind = None
+
+    def list(self, request, *args, **kwargs):
+        tag = etag(self.reference_kind)
+        if tag in [t.strip().removeprefix('W/') for t in request.headers.get('If-None-Match', '').split(',')]:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(serialized(self.reference_kind, self.get_serializer_class()))
+        response['ETag'] = tag
+        patch_cache_control(response, max_age=settings.REFERENCE_CACHE_MAX_AGE, must_revalidate=True)
+        return response
@@ -0,0 +1,55 @@
+"""Faster renderers for large API responses.
+
+``ORJSONRenderer`` produces the same bytes as DRF's compact ``JSONRenderer``
+for everything but floats below 1e-4 or from 1e16 up, which orjson writes
+without the ``+`` and zero padding in the exponent; the views using it
+return no floats. Requests asking for an ``indent`` and values orjson cannot
+encode (integers over 64 bits) go through the stock renderer.
+``MessagePackRenderer`` is offered when ``msgpack`` is installed and is
+picked with ``Accept: application/msgpack`` or ``?format=msgpack``.
+"""
+import orjson
+from rest_framework.renderers import BaseRenderer, BrowsableAPIRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+_encoder = JSONEncoder()
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+
+
+class ORJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if not self.compact or self.ensure_ascii or not self.strict \
+                or self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=_encoder.default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Same escaping of the JavaScript line terminators as JSONRenderer
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class MessagePackRenderer(BaseRenderer):
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        # Types without a MessagePack equivalent are converted as for JSON
+        return msgpack.packb(data, default=_encoder.default, use_bin_type=True, datetime=False)
+
+
+LIST_RENDERER_CLASSES = [ORJSONRenderer, BrowsableAPIRenderer]
+if msgpack is not None:
+    LIST_RENDERER_CLASSES.append(MessagePackRenderer)
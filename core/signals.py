@@ -0,0 +1,68 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from alteration.models import Alteration
+from sku.models import ProductSKU
+from supplier.models import Order, Supplier
+from . import reference
+from .dashboard import invalidate_kpis, invalidate_month
+from .models import Category, OutfitType
+
+# Invalidate after commit so a dashboard load racing the transaction cannot re-cache stale counts
+
+
+def _invalidate_on_commit(kpis, *moments):
+    def invalidate():
+        invalidate_kpis(*kpis)
+        for moment in moments:
+            invalidate_month(moment)
+    transaction.on_commit(invalidate)
+
+
+@receiver(post_save, sender=ProductSKU)
+@receiver(post_delete, sender=ProductSKU)
+def sku_changed(sender, instance, **kwargs):
+    _invalidate_on_commit(['products'], instance.created_at)
+
+
+@receiver(post_save, sender=Supplier)
+@receiver(post_delete, sender=Supplier)
+def supplier_changed(sender, instance, **kwargs):
+    _invalidate_on_commit(['suppliers'])
+
+
+@receiver(pre_save, sender=Order)
+@receiver(pre_save, sender=Alteration)
+def remember_updated_at(sender, instance, **kwargs):
+    # auto_now has not run yet, so this is the month the row was counted in
+    instance._dashboard_updated_at = instance.updated_at
+
+
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Order)
+def order_changed(sender, instance, **kwargs):
+    _invalidate_on_commit(['active_orders'], getattr(instance, '_dashboard_updated_at', None), instance.updated_at)
+
+
+@receiver(post_save, sender=Alteration)
+@receiver(post_delete, sender=Alteration)
+def alteration_changed(sender, instance, **kwargs):
+    _invalidate_on_commit(['pending_alterations'], getattr(instance, '_dashboard_updated_at', None), instance.updated_at)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def category_changed(sender, instance, **kwargs):
+    transaction.on_commit(lambda: reference.bump('categories'))
+
+
+@receiver(post_save, sender=OutfitType)
+@receiver(post_delete, sender=OutfitType)
+def outfit_type_changed(sender, instance, **kwargs):
+    transaction.on_commit(lambda: reference.bump('outfit_types'))
+
+
+@receiver(post_save, sender=Supplier)
+@receiver(post_delete, sender=Supplier)
+def supplier_reference_changed(sender, instance, **kwargs):
+    transaction.on_commit(lambda: reference.bump('suppliers'))
@@ -0,0 +1,417 @@
+"""Deterministic synthetic dataset for load tests and forecasting benchmarks.
+
+Every table is generated column-wise with NumPy from one seeded generator,
+and every date and timestamp is derived from ``end_date``, so the same seed,
+sizes and end date loaded into an empty database always produce the same
+data. Primary keys are assigned up front (continuing after the current
+maximum, so loading into a non-empty database shifts ids and the codes built
+from them), which lets child rows reference parents without reading anything
+back, and rows are written either with ``bulk_create`` or, on PostgreSQL,
+with ``COPY``. Neither sends signals, so nothing is logged for ``/api/sync/``;
+the command expires every sync cursor instead (``api.sync.require_resync``).
+
+Demand is seasonal: order volume peaks in the wedding season
+(November-February) with a weekend lift, and each category gets its own
+seasonal amplitude and phase, so per-category forecasting has signal to find.
+"""
+import io
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import numpy as np
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from alteration.models import Alteration, Customer, Tailor
+from alteration.utils import normalize_phone
+from inventory.models import InventoryItem
+from sku.models import ProductSKU
+from supplier.models import Order, OrderItem, PurchaseOrder, PurchaseOrderItem, Supplier
+from .models import Category, OutfitType
+
+PRESETS = {
+    'small': {
+        'categories': 12, 'outfit_types': 8, 'suppliers': 10, 'tailors': 5, 'days': 730,
+        'orders': 3000, 'skus': 10000, 'purchase_orders': 300, 'customers': 2000, 'alterations': 3000,
+    },
+    'medium': {
+        'categories': 30, 'outfit_types': 12, 'suppliers': 50, 'tailors': 15, 'days': 1095,
+        'orders': 30000, 'skus': 100000, 'purchase_orders': 3000, 'customers': 50000, 'alterations': 50000,
+    },
+    'large': {
+        'categories': 60, 'outfit_types': 20, 'suppliers': 200, 'tailors': 40, 'days': 1460,
+        'orders': 200000, 'skus': 1000000, 'purchase_orders': 20000, 'customers': 500000, 'alterations': 500000,
+    },
+}
+
+SIZES = ['XS', 'S', 'M', 'L', 'XL', 'XXL']
+SIZE_WEIGHTS = [0.08, 0.2, 0.3, 0.24, 0.13, 0.05]
+OUTFITS = [
+    ('Lehenga', 'LHG'), ('Saree', 'SRE'), ('Gown', 'GWN'), ('Sherwani', 'SHW'), ('Anarkali', 'ANK'),
+    ('Kurta Set', 'KRT'), ('Suit', 'SUT'), ('Blouse', 'BLS'), ('Dress', 'DRS'), ('Indo-Western', 'IWN'),
+    ('Sharara', 'SHR'), ('Bandhgala', 'BND'), ('Dupatta', 'DPT'), ('Choli', 'CHL'), ('Jacket', 'JKT'),
+    ('Palazzo Set', 'PLZ'), ('Kaftan', 'KFT'), ('Nehru Jacket', 'NHR'), ('Bridal Lehenga', 'BRL'), ('Achkan', 'ACH'),
+]
+ALTERATION_OUTFITS = ['bridal', 'lehenga', 'suit', 'dress', 'blouse', 'saree', 'sherwani']
+ALTERATION_ISSUES = [
+    'Take in waist', 'Shorten hem', 'Let out bust', 'Adjust sleeve length', 'Replace zip',
+    'Fix embroidery', 'Resize blouse', 'Add lining', 'Taper trousers', 'Adjust fall and pico',
+]
+FIRST_NAMES = [
+    'Aarav', 'Aditi', 'Ananya', 'Arjun', 'Diya', 'Ishaan', 'Kavya', 'Meera', 'Neha', 'Nikhil',
+    'Priya', 'Rahul', 'Riya', 'Rohan', 'Sanya', 'Siddharth', 'Tanvi', 'Vihaan', 'Zara', 'Kabir',
+]
+LAST_NAMES = [
+    'Sharma', 'Verma', 'Patel', 'Iyer', 'Reddy', 'Nair', 'Gupta', 'Khan', 'Singh', 'Mehta',
+    'Joshi', 'Kapoor', 'Bose', 'Das', 'Malhotra', 'Chopra', 'Menon', 'Rao', 'Kulkarni', 'Shah',
+]
+REGIONS = ['North', 'South', 'East', 'West', 'Central']
+
+
+@contextmanager
+def explicit_timestamps(*models):
+    """Let ``bulk_create`` keep the generated ``auto_now``/``auto_now_add`` values."""
+    fields = [f for model in models for f in model._meta.concrete_fields if getattr(f, 'auto_now', False) or getattr(f, 'auto_now_add', False)]
+    saved = [(f, f.auto_now, f.auto_now_add) for f in fields]
+    for f in fields:
+        f.auto_now = f.auto_now_add = False
+    try:
+        yield
+    finally:
+        for f, auto_now, auto_now_add in saved:
+            f.auto_now, f.auto_now_add = auto_now, auto_now_add
+
+
+class Writer:
+    """Writes column dictionaries with ``bulk_create`` or PostgreSQL ``COPY``."""
+
+    def __init__(self, method='auto', batch_size=10000, stdout=None):
+        if method == 'auto':
+            method = 'copy' if connection.vendor == 'postgresql' else 'bulk'
+        if method == 'copy' and connection.vendor != 'postgresql':
+            raise ValueError('COPY is only available on PostgreSQL')
+        self.method = method
+        self.batch_size = batch_size
+        self.stdout = stdout
+        self.counts = {}
+
+    def write(self, model, columns):
+        """``columns`` maps field attnames to equal-length sequences of Python values."""
+        names = list(columns)
+        rows = list(zip(*(columns[name] for name in names)))
+        for start in range(0, len(rows), self.batch_size):
+            batch = rows[start:start + self.batch_size]
+            if self.method == 'copy':
+                self._copy(model, names, batch)
+            else:
+                model.objects.bulk_create([model(**dict(zip(names, row))) for row in batch], batch_size=self.batch_size)
+        label = model._meta.label
+        self.counts[label] = self.counts.get(label, 0) + len(rows)
+
+    def _copy(self, model, names, rows):
+        fields = {f.attname: f.column for f in model._meta.concrete_fields}
+        buffer = io.StringIO(''.join('\t'.join(map(_copy_value, row)) + '\n' for row in rows))
+        columns = ', '.join(connection.ops.quote_name(fields[name]) for name in names)
+        with connection.cursor() as cursor:
+            cursor.copy_expert(
+                f'COPY {connection.ops.quote_name(model._meta.db_table)} ({columns}) FROM STDIN',
+                buffer,
+            )
+
+
+def _copy_value(value):
+    """One field in COPY's text format, where NULL is ``\\N``."""
+    if value is None:
+        return '\\N'
+    return str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+
+def next_id(model):
+    return (model.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+
+
+def _ids(model, count):
+    start = next_id(model)
+    return np.arange(start, start + count)
+
+
+def _datetimes(days, seconds):
+    """Aware UTC datetimes from day offsets since the Unix epoch plus seconds into the day."""
+    epoch = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+    return [epoch + timedelta(days=int(d), seconds=int(s)) for d, s in zip(days, seconds)]
+
+
+def _choice(rng, values, size, p=None):
+    return np.asarray(values, dtype=object)[rng.choice(len(values), size=size, p=p)].tolist()
+
+
+class SyntheticDataGenerator:
+    def __init__(self, writer, sizes, seed=42, end_date=None):
+        self.writer = writer
+        self.sizes = sizes
+        self.rng = np.random.default_rng(seed)
+        self.end_date = end_date or timezone.localdate()
+        self.end_day = (self.end_date - datetime(1970, 1, 1).date()).days
+        self.start_day = self.end_day - sizes['days']
+
+    def generate(self):
+        with transaction.atomic(), explicit_timestamps(Supplier, Order, ProductSKU, InventoryItem, PurchaseOrder, Alteration):
+            self.categories()
+            self.outfit_types()
+            self.suppliers()
+            self.orders()
+            self.skus()
+            self.purchase_orders()
+            self.tailors()
+            self.customers()
+            self.alterations()
+            self._reset_sequences()
+        return self.writer.counts
+
+    def _reset_sequences(self):
+        models = [Category, OutfitType, Supplier, Order, OrderItem, ProductSKU, InventoryItem,
+                  PurchaseOrder, PurchaseOrderItem, Tailor, Customer, Alteration]
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), models):
+                cursor.execute(sql)
+
+    def categories(self):
+        count = self.sizes['categories']
+        self.category_ids = _ids(Category, count)
+        names = ['Bridal', 'Festive', 'Casual', 'Party', 'Formal', 'Ethnic', 'Fusion', 'Occasion']
+        self.writer.write(Category, {
+            'id': self.category_ids.tolist(),
+            'name': [f'{names[i % len(names)]} {i // len(names) + 1}' for i in range(count)],
+            'prefix': [f'Y{pk}' for pk in self.category_ids],
+        })
+        # Popularity follows a Zipf-like curve; each category gets its own seasonal swing and phase
+        weights = 1 / np.arange(1, count + 1) ** 0.8
+        self.category_weights = weights / weights.sum()
+        self.category_amplitude = self.rng.uniform(0.2, 0.9, count)
+        self.category_phase = self.rng.uniform(-45, 45, count)
+
+    def outfit_types(self):
+        count = min(self.sizes['outfit_types'], len(OUTFITS))
+        self.outfit_type_ids = _ids(OutfitType, count)
+        self.outfit_names = [name for name, _ in OUTFITS[:count]]
+        self.outfit_codes = [code for _, code in OUTFITS[:count]]
+        self.writer.write(OutfitType, {
+            'id': self.outfit_type_ids.tolist(),
+            'name': self.outfit_names,
+            'code': [f'{code}{pk}' for code, pk in zip(self.outfit_codes, self.outfit_type_ids)],
+        })
+
+    def suppliers(self):
+        count = self.sizes['suppliers']
+        self.supplier_ids = _ids(Supplier, count)
+        self.writer.write(Supplier, {
+            'id': self.supplier_ids.tolist(),
+            'name': [f'Synthetic Supplier {pk}' for pk in self.supplier_ids],
+            'email': [f'supplier{pk}@example.com' for pk in self.supplier_ids],
+            'region': _choice(self.rng, REGIONS, count),
+            'updated_at': _datetimes([self.end_day] * count, [0] * count),
+        })
+
+    def _seasonal_days(self, count):
+        """Order days weighted towards the wedding season and weekends."""
+        days = np.arange(self.start_day, self.end_day + 1)
+        day_of_year = (days - 10957) % 365.25  # 10957 = 2000-01-01
+        # Peak around mid-December, trough in mid-June
+        season = 1 + 0.6 * np.cos(2 * np.pi * (day_of_year - 350) / 365.25)
+        weekend = np.where((days + 3) % 7 >= 5, 1.4, 1.0)  # epoch day 0 was a Thursday
+        trend = np.linspace(0.8, 1.2, len(days))
+        weights = season * weekend * trend
+        return self.rng.choice(days, size=count, p=weights / weights.sum())
+
+    def _seasonal_categories(self, days):
+        """Pick a category per order day, thinning each category by its own seasonal curve."""
+        chosen = np.full(len(days), -1)
+        pending = np.arange(len(days))
+        while len(pending):
+            candidates = self.rng.choice(len(self.category_ids), size=len(pending), p=self.category_weights)
+            day_of_year = (days[pending] - 10957) % 365.25
+            amplitude = self.category_amplitude[candidates]
+            phase = self.category_phase[candidates]
+            accept = (1 + amplitude * np.cos(2 * np.pi * (day_of_year - 350 - phase) / 365.25)) / (1 + amplitude)
+            kept = self.rng.random(len(pending)) < accept
+            chosen[pending[kept]] = candidates[kept]
+            pending = pending[~kept]
+        return chosen
+
+    def orders(self):
+        count = self.sizes['orders']
+        rng = self.rng
+        self.order_ids = _ids(Order, count)
+        days = np.sort(self._seasonal_days(count))
+        self.order_categories = self.category_ids[self._seasonal_categories(days)]
+        self.order_suppliers = rng.choice(self.supplier_ids, size=count)
+        created = _datetimes(days, rng.integers(9 * 3600, 20 * 3600, count) - 19800)  # shop hours, IST
+        age = self.end_day - days
+        status = np.where(
+            age > 30,
+            rng.choice(['COMPLETED', 'CANCELLED'], size=count, p=[0.92, 0.08]),
+            rng.choice(['PENDING', 'RECEIVED', 'COMPLETED'], size=count, p=[0.4, 0.3, 0.3]),
+        )
+        completion_days = np.minimum(days + rng.integers(2, 21, count), self.end_day)
+        updated = _datetimes(np.where(status == 'PENDING', days, completion_days), rng.integers(9 * 3600, 20 * 3600, count) - 19800)
+        updated = [max(c, u) for c, u in zip(created, updated)]
+        self.order_created = created
+        self.writer.write(Order, {
+            'id': self.order_ids.tolist(),
+            'category_id': self.order_categories.tolist(),
+            'outfit_type': _choice(rng, self.outfit_codes, count),
+            'supplier_id': self.order_suppliers.tolist(),
+            'status': status.tolist(),
+            'created_at': created,
+            'updated_at': updated,
+        })
+
+        lines = 1 + rng.poisson(1.2, count)
+        item_orders = np.repeat(self.order_ids, lines)
+        item_count = len(item_orders)
+        self.writer.write(OrderItem, {
+            'id': _ids(OrderItem, item_count).tolist(),
+            'order_id': item_orders.tolist(),
+            'description': _choice(rng, [f'{name} {colour}' for name in self.outfit_names for colour in ('Red', 'Blue', 'Gold', 'Green')], item_count),
+            'color': _choice(rng, ['Red', 'Blue', 'Gold', 'Green', 'Ivory', 'Maroon', 'Pink'], item_count),
+            'size': _choice(rng, SIZES, item_count, p=SIZE_WEIGHTS),
+            'quantity': (1 + rng.poisson(2.5, item_count)).tolist(),
+        })
+
+    def skus(self):
+        count = self.sizes['skus']
+        rng = self.rng
+        chunk = max(self.writer.batch_size * 10, 100000)
+        first = next_id(ProductSKU)
+        for start in range(0, count, chunk):
+            size = min(chunk, count - start)
+            ids = np.arange(first + start, first + start + size)
+            order_index = rng.integers(0, len(self.order_ids), size)
+            price = np.round(rng.lognormal(np.log(6000), 0.6, size), 2)
+            created = [self.order_created[i] for i in order_index]
+            self.writer.write(ProductSKU, {
+                'id': ids.tolist(),
+                'sku_code': [f'SYN{pk:09d}' for pk in ids],
+                'category_id': self.order_categories[order_index].tolist(),
+                'outfit_type_id': rng.choice(self.outfit_type_ids, size=size).tolist(),
+                'supplier_id': self.order_suppliers[order_index].tolist(),
+                'order_id': self.order_ids[order_index].tolist(),
+                'price': [f'{p:.2f}' for p in price],
+                'square_id': [None] * size,
+                'variation_id': [None] * size,
+                'barcode_image': [None] * size,
+                'created_at': created,
+                'updated_at': created,
+            })
+            self.writer.write(InventoryItem, {
+                'id': _ids(InventoryItem, size).tolist(),
+                'sku_id': ids.tolist(),
+                'quantity': rng.poisson(4, size).tolist(),
+                'updated_at': created,
+            })
+        self.sku_range = (first, first + count)
+
+    def purchase_orders(self):
+        count = self.sizes['purchase_orders']
+        rng = self.rng
+        ids = _ids(PurchaseOrder, count)
+        days = self._seasonal_days(count)
+        self.writer.write(PurchaseOrder, {
+            'id': ids.tolist(),
+            'supplier_id': rng.choice(self.supplier_ids, size=count).tolist(),
+            'created_at': _datetimes(days, rng.integers(0, 86400, count)),
+            'status': _choice(rng, ['NEW', 'CONFIRMED', 'RECEIVED'], count, p=[0.15, 0.25, 0.6]),
+            'secure_link_id': [None] * count,
+            'qr_code': [None] * count,
+            'is_discrepancy': (rng.random(count) < 0.05).tolist(),
+        })
+        lines = 1 + rng.poisson(1.5, count)
+        item_orders = np.repeat(ids, lines)
+        item_count = len(item_orders)
+        self.writer.write(PurchaseOrderItem, {
+            'id': _ids(PurchaseOrderItem, item_count).tolist(),
+            'purchase_order_id': item_orders.tolist(),
+            'outfit_type': _choice(rng, self.outfit_names, item_count),
+            'category_id': rng.choice(self.category_ids, size=item_count).tolist(),
+            'size': _choice(rng, SIZES, item_count, p=SIZE_WEIGHTS),
+            'quantity': (1 + rng.poisson(5, item_count)).tolist(),
+            'price': [f'{p:.2f}' for p in np.round(rng.lognormal(np.log(3500), 0.5, item_count), 2)],
+            'image': [None] * item_count,
+            'sku': [None] * item_count,
+        })
+
+    def tailors(self):
+        count = self.sizes['tailors']
+        self.tailor_ids = _ids(Tailor, count)
+        self.writer.write(Tailor, {
+            'id': self.tailor_ids.tolist(),
+            'name': [f'Tailor {pk}' for pk in self.tailor_ids],
+            'specialties': _choice(self.rng, ['Bridal', 'Suits', 'Blouses', 'Lehengas', 'Alterations'], count),
+            'is_available': (self.rng.random(count) < 0.85).tolist(),
+            'phone': [f'+91 98{pk % 10 ** 8:08d}' for pk in self.tailor_ids],
+        })
+
+    def customers(self):
+        count = self.sizes['customers']
+        rng = self.rng
+        self.customer_ids = _ids(Customer, count)
+        names = [f'{first} {last}' for first, last in zip(_choice(rng, FIRST_NAMES, count), _choice(rng, LAST_NAMES, count))]
+        numbers = rng.integers(6 * 10 ** 9, 10 ** 10, count)
+        formats = rng.integers(0, 3, count)
+        phones = [
+            f'+91 {n // 10 ** 5}-{n % 10 ** 5:05d}' if f == 0 else f'0{n}' if f == 1 else str(n)
+            for n, f in zip(numbers, formats)
+        ]
+        measured = rng.random(count) < 0.6
+
+        def measurement(mean):
+            values = np.round(rng.normal(mean, 3, count), 2)
+            return [f'{v:.2f}' if m else None for v, m in zip(values, measured)]
+
+        self.writer.write(Customer, {
+            'id': self.customer_ids.tolist(),
+            'name': names,
+            'phone_number': phones,
+            'phone_e164': [normalize_phone(phone) for phone in phones],
+            'email': [f'customer{pk}@example.com' if e else '' for pk, e in zip(self.customer_ids, rng.random(count) < 0.5)],
+            'chest': measurement(36),
+            'waist': measurement(30),
+            'length': measurement(40),
+        })
+
+    def alterations(self):
+        count = self.sizes['alterations']
+        rng = self.rng
+        days = np.sort(self._seasonal_days(count))
+        outfits = np.asarray(_choice(rng, ALTERATION_OUTFITS, count), dtype=object)
+        base = np.array([{'bridal': 7, 'lehenga': 5, 'suit': 3, 'dress': 2, 'blouse': 1}.get(o, 3) for o in outfits])
+        duration = np.maximum(1, np.round(base * rng.lognormal(0, 0.35, count))).astype(int)
+        done = days + duration
+        age = self.end_day - days
+        status = np.where(
+            done <= self.end_day - 1, 'COMPLETED',
+            np.where(age < 1, 'PENDING', rng.choice(['RECEIVED', 'IN_PROGRESS', 'READY'], size=count))
+        )
+        created = _datetimes(days, rng.integers(10 * 3600, 19 * 3600, count) - 19800)
+        updated = _datetimes(np.where(status == 'COMPLETED', done, days), rng.integers(10 * 3600, 19 * 3600, count) - 19800)
+        updated = [max(c, u) for c, u in zip(created, updated)]
+        epoch = datetime(1970, 1, 1).date()
+        with_sku = rng.random(count) < 0.3
+        sku_ids = rng.integers(*self.sku_range, count) if self.sku_range[1] > self.sku_range[0] else np.zeros(count, dtype=int)
+        self.writer.write(Alteration, {
+            'id': _ids(Alteration, count).tolist(),
+            'customer_id': rng.choice(self.customer_ids, size=count).tolist(),
+            'tailor_id': [int(t) if a else None for t, a in zip(rng.choice(self.tailor_ids, size=count), rng.random(count) < 0.9)],
+            'sku_id': [int(s) if w and s else None for s, w in zip(sku_ids, with_sku)],
+            'outfit_type': outfits.tolist(),
+            'number_of_outfits': (1 + rng.poisson(0.4, count)).tolist(),
+            'issue_description': _choice(rng, ALTERATION_ISSUES, count),
+            'status': status.tolist(),
+            'notes': [''] * count,
+            'predicted_pickup_date': [epoch + timedelta(days=int(d)) for d in days + base],
+            'ready_at': [moment if state == 'READY' else None for state, moment in zip(status, updated)],
+            'created_at': created,
+            'updated_at': updated,
+        })
@@ -1,3 +1,166 @@
-from django.test import TestCase
+from datetime import date
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from alteration.models import Alteration
+from supplier.models import Order, Supplier
+from . import dashboard, querylog, reference
+from .models import Category
+from .synthetic import SyntheticDataGenerator, Writer
+
+LOCMEM = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'core-tests'}}
+
+
+@override_settings(CACHES=LOCMEM)
+class ReferenceCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        Category.objects.create(name='Bridal', prefix='BR')
+
+    def test_list_is_cached_until_a_save_bumps_the_version(self):
+        self.assertEqual([c.name for c in reference.get('categories')], ['Bridal'])
+        with self.assertNumQueries(0):
+            reference.get('categories')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.create(name='Casual', prefix='CW')
+        self.assertEqual(sorted(c.name for c in reference.get('categories')), ['Bridal', 'Casual'])
+
+    def test_api_list_revalidates_with_etag(self):
+        response = self.client.get('/api/categories/')
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/categories/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.create(name='Casual', prefix='CW')
+        response = self.client.get('/api/categories/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+
+@override_settings(CACHES=LOCMEM)
+class DashboardCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_months_are_cached_with_a_finite_timeout(self):
+        with mock.patch.object(dashboard.cache, 'set_many', wraps=dashboard.cache.set_many) as set_many:
+            months, series = dashboard.monthly_series(3)
+        self.assertEqual(len(months), 3)
+        self.assertEqual(set(series), set(dashboard.SERIES))
+        for call in set_many.call_args_list:
+            self.assertIsNotNone(call.args[1])
+
+        with self.assertNumQueries(0):
+            dashboard.monthly_series(3)
+
+    def test_kpis_are_cached_until_invalidated(self):
+        self.assertEqual(dashboard.kpis()['products'], 0)
+        with self.assertNumQueries(0):
+            dashboard.kpis()
+        dashboard.invalidate_kpis('products')
+        with self.assertNumQueries(1):
+            dashboard.kpis()
+
+
+class SyntheticDataTests(TestCase):
+    SIZES = {
+        'categories': 3, 'outfit_types': 2, 'suppliers': 2, 'tailors': 2, 'days': 60,
+        'orders': 20, 'skus': 30, 'purchase_orders': 3, 'customers': 5, 'alterations': 10,
+    }
+
+    def generate(self):
+        with transaction.atomic():
+            generator = SyntheticDataGenerator(Writer('bulk'), self.SIZES, seed=7, end_date=date(2025, 12, 31))
+            generator.generate()
+            snapshot = (
+                list(Order.objects.order_by('id').values_list('id', 'category_id', 'status', 'created_at', 'updated_at')),
+                list(Supplier.objects.order_by('id').values_list('id', 'region', 'updated_at')),
+                list(Alteration.objects.order_by('id').values_list('id', 'status', 'created_at', 'predicted_pickup_date')),
+            )
+            transaction.set_rollback(True)
+        return snapshot
+
+    def test_same_seed_and_end_date_give_the_same_data(self):
+        first = self.generate()
+        self.assertEqual(len(first[0]), 20)
+        self.assertEqual(first, self.generate())
+        self.assertTrue(all(created.date() <= date(2025, 12, 31) for _, _, _, created, _ in first[0]))
+
+
+    @override_settings(CACHES=LOCMEM)
+    def test_command_invalidates_cached_lists_and_counts(self):
+        cache.clear()
+        etag = self.client.get('/api/categories/')['ETag']
+        self.assertEqual(dashboard.kpis()['suppliers'], 0)
+        dashboard.monthly_series()
+
+        options = {table: count for table, count in self.SIZES.items()}
+        call_command('generate_synthetic_data', method='bulk', skip_daily_sales=True, stdout=StringIO(),
+                     end_date=timezone.localdate().isoformat(), **options)
+        self.assertEqual(self.client.get('/api/categories/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        self.assertEqual(dashboard.kpis()['suppliers'], 2)
+        self.assertEqual(sum(dashboard.monthly_series()[1]['orders']), Order.objects.filter(status='COMPLETED').count())
+
+class MetricsEndpointTests(TestCase):
+    def test_requires_staff_without_a_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 401)
+        staff = User.objects.create_user('admin', password='x', is_staff=True)
+        self.client.force_login(staff)
+        self.assertEqual(self.client.get('/metrics').status_code, 200)
+
+    @override_settings(METRICS_AUTH_TOKEN='secret')
+    def test_accepts_the_scrape_token(self):
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code, 401)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret').status_code, 200)
+
+
+class QueryCaptureTests(TestCase):
+    def test_normalize_sql(self):
+        cases = {
+            'SELECT "t1"."col2" FROM "t1" WHERE "t1"."id" = 42 AND x > -3.5':
+                'SELECT "t1"."col2" FROM "t1" WHERE "t1"."id" = ? AND x > ?',
+            "SELECT * FROM c WHERE name = 'O''Brien' AND id IN (1, 2, 3)": 'SELECT * FROM c WHERE name = ? AND id IN (...)',
+            'SELECT * FROM c WHERE id IN (%s, %s) LIMIT 21': 'SELECT * FROM c WHERE id IN (...) LIMIT ?',
+            'INSERT INTO t (a, b) VALUES (%s, %s), (%s, %s), (%s, %s)': 'INSERT INTO t (a, b) VALUES (...)',
+            'SELECT  *\n  FROM c WHERE id = $1': 'SELECT * FROM c WHERE id = ?',
+        }
+        for sql, normalized in cases.items():
+            with self.subTest(sql=sql):
+                self.assertEqual(querylog.normalize_sql(sql), normalized)
+        # Lists of any length share one fingerprint
+        self.assertEqual(querylog.normalize_sql('id IN (%s)'), querylog.normalize_sql('id IN (%s, %s, %s)'))
+
+    def test_repeated_queries_are_captured_once(self):
+        capture = querylog.QueryCapture(slow_ms=10 ** 6, repeat_threshold=3)
+        with connection.execute_wrapper(capture):
+            for i in range(5):
+                list(Category.objects.filter(pk=i))
+        rows = capture.captures('category-list')
+        self.assertEqual([(row.kind, row.repeats) for row in rows], [('REPEATED', 5)])
+        self.assertIn('core/tests.py', rows[0].call_site)
+        self.assertIn('WHERE "core_category"."id" = ?', rows[0].sql)
+
+    def test_slow_queries_are_explained_once(self):
+        if connection.vendor != 'postgresql':
+            self.skipTest('plans are captured on PostgreSQL only')
+        querylog._explained.clear()
+        capture = querylog.QueryCapture(slow_ms=0, repeat_threshold=10)
+        with connection.execute_wrapper(capture):
+            list(Category.objects.filter(pk=1))
+            list(Category.objects.filter(pk=2))
+        rows = capture.captures('category-list')
+        self.assertEqual([row.kind for row in rows], ['SLOW', 'SLOW'])
+        self.assertEqual(rows[0].plan[0]['Plan']['Relation Name'], 'core_category')
+        self.assertIsNone(rows[1].plan)
@@ -1,12 +1,28 @@
+import hmac
 from rest_framework import viewsets, status
 from rest_framework.response import Response
+from django.conf import settings
+from django.http import HttpResponse
 from django.shortcuts import render, redirect, get_object_or_404
+from . import metrics as request_metrics
 from .models import Category, OutfitType
+from .reference import ReferenceListMixin
 from .serializers import CategorySerializer, OutfitTypeSerializer
 
 def home(request):
     return render(request, 'core/home.html')
 
+def metrics(request):
+    """Request metrics in the Prometheus text exposition format, for the scrape token or staff"""
+    token = settings.METRICS_AUTH_TOKEN
+    authorization = request.headers.get('Authorization', '')
+    if not (token and hmac.compare_digest(authorization, f'Bearer {token}')) and not request.user.is_staff:
+        return HttpResponse(status=401)
+    return HttpResponse(
+        request_metrics.render(request_metrics.collect()),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
+
 def category_list(request):
     categories = Category.objects.all()
     return render(request, 'core/category_list.html', {'categories': categories})
@@ -93,9 +109,10 @@ def outfit_type_delete(request, pk):
     outfit_type.delete()
     return redirect('/outfit-types/')
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(ReferenceListMixin, viewsets.ModelViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    reference_kind = 'categories'
 
     def create(self, request, *args, **kwargs):
         name = request.data.get('name', '').strip()
@@ -122,9 +139,10 @@ class CategoryViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(category)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
-class OutfitTypeViewSet(viewsets.ModelViewSet):
+class OutfitTypeViewSet(ReferenceListMixin, viewsets.ModelViewSet):
     queryset = OutfitType.objects.all()
     serializer_class = OutfitTypeSerializer
+    reference_kind = 'outfit_types'
 
     def create(self, request, *args, **kwargs):
         name = request.data.get('name', '').strip()
@@ -152,52 +170,50 @@ class OutfitTypeViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 import json
-from django.utils import timezone
-from django.db.models import Count
-from supplier.models import Supplier, Order
-from alteration.models import Alteration
-from sku.models import ProductSKU
+from .dashboard import SERIES, kpis, monthly_series
 
 
 def dashboard_callback(request, context):
 
     # =======================
-    # KPI STATS
+    # KPI STATS (cached, dropped by core.signals)
     # =======================
+    counts = kpis()
     context["stats"] = [
         {
             "label": "Total Products",
-            "value": ProductSKU.objects.count(),
+            "value": counts["products"],
             "icon": "inventory_2",
         },
         {
             "label": "Active Orders",
-            "value": Order.objects.exclude(status="COMPLETED").count(),
+            "value": counts["active_orders"],
             "icon": "shopping_cart",
 
         },
         {
             "label": "Pending Alterations",
-            "value": Alteration.objects.filter(status="PENDING").count(),
+            "value": counts["pending_alterations"],
             "icon": "content_cut",
 
         },
         {
             "label": "Suppliers",
-            "value": Supplier.objects.count(),
+            "value": counts["suppliers"],
             "icon": "local_shipping",
 
         },
     ]
 
     # =======================
-    # CHART DATA (STATIC)
+    # CHART DATA (last six months, cached per month)
     # =======================
 
-    labels = ["Jan", "Feb", "Mar", "Apr", "May", "Jun"]
-    values = [12, 19, 8, 15, 22, 18]
+    months, series = monthly_series(6)
+    labels = [month.strftime("%b") for month in months]
 
     context["chart_labels"] = json.dumps(labels)
-    context["chart_values"] = json.dumps(values)
+    context["chart_values"] = json.dumps(series["orders"])
+    context["chart_series"] = json.dumps({SERIES[name]: values for name, values in series.items()})
 
     return context
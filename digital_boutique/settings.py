@@ -49,6 +49,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     "django_filters",
     "core",
@@ -61,11 +62,14 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.metrics.MetricsMiddleware',
+    'core.querylog.QueryCaptureMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.profiling.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -143,6 +147,111 @@ STATIC_URL = 'static/'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Alteration pickup-time model written by `manage.py train_pickup_model`
+ALTERATION_PICKUP_MODEL_PATH = BASE_DIR / 'alteration_pickup_model.json'
+
+# Versioned demand-forecasting models written by `manage.py train_models`
+FORECASTING_MODEL_DIR = BASE_DIR / 'forecasting_models'
+
+# Parquet sales dataset written by `manage.py export_sales_data`
+FORECASTING_SALES_DATASET = BASE_DIR / 'sales_data'
+
+# Per-preset latency, query and memory budgets checked by `manage.py run_benchmarks`.
+# Small preset budgets are the worst of three measured runs plus 50% for latency and 25% for memory
+BENCHMARK_BUDGETS = BASE_DIR / 'benchmark_budgets.json'
+
+# Request metrics served at /metrics. Set METRICS_MULTIPROCESS_DIR when running
+# several worker processes so the endpoint aggregates all of them. Only staff
+# sessions and scrapers sending "Authorization: Bearer <METRICS_AUTH_TOKEN>" may read it
+METRICS_MULTIPROCESS_DIR = os.environ.get('METRICS_MULTIPROCESS_DIR')
+METRICS_FLUSH_SECONDS = 5
+METRICS_AUTH_TOKEN = os.environ.get('METRICS_AUTH_TOKEN')
+# Add a Server-Timing header (SQL and total time) to every response
+METRICS_SERVER_TIMING = DEBUG
+
+# Slow and repeated (N+1) query capture, browsable under Performance in the admin.
+# Off unless QUERY_CAPTURE_ENABLED=1; plans are captured on PostgreSQL only
+QUERY_CAPTURE_ENABLED = os.environ.get('QUERY_CAPTURE_ENABLED') == '1'
+QUERY_CAPTURE_SLOW_MS = 100
+QUERY_CAPTURE_REPEAT_THRESHOLD = 10
+QUERY_CAPTURE_MAX_ROWS = 5000
+
+# Sampling profiler for requests: staff can send "X-Profile-Request: 1", a random
+# PROFILING_SAMPLE_RATE of requests is profiled, and with PROFILING_SLOW_MS set
+# every request is sampled but only slower ones are kept
+PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED') == '1'
+PROFILING_SAMPLE_RATE = float(os.environ.get('PROFILING_SAMPLE_RATE', '0'))
+PROFILING_SLOW_MS = int(os.environ.get('PROFILING_SLOW_MS', '0'))
+PROFILING_INTERVAL_MS = 5
+PROFILING_MAX_PROFILES = 500
+
+# Cache backend: 'file' (shared by the workers of one host, under CACHE_LOCATION;
+# the default), 'redis' (shared everywhere; the default when REDIS_URL is set)
+# or 'locmem' (per process, so invalidation only reaches the worker that saved:
+# single-process development only). The file backend culls a third of its
+# entries at random once it holds MAX_ENTRIES (Django's default is 300), so
+# the cap leaves room for the reference lists, dashboard figures and the
+# per-month forecast entries of a few model versions
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'redis' if os.environ.get('REDIS_URL') else 'file')
+CACHES = {
+    'default': {
+        'locmem': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'laajavab',
+        },
+        'file': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get('CACHE_LOCATION', str(BASE_DIR / 'cache')),
+            'OPTIONS': {'MAX_ENTRIES': 5000},
+        },
+        'redis': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ.get('REDIS_URL', 'redis://127.0.0.1:6379/1'),
+        },
+    }[CACHE_BACKEND],
+}
+
+# Reference lists (categories, outfit types, suppliers) for forms and
+# list endpoints: seconds an entry is kept, and the Cache-Control max-age
+# clients may reuse a list for before revalidating with its ETag
+REFERENCE_CACHE_TIMEOUT = 24 * 60 * 60
+REFERENCE_CACHE_MAX_AGE = 0
+
+# Longest time (seconds) a cached dashboard KPI or current-month chart figure is
+# served after a bulk change that sent no signals
+DASHBOARD_CACHE_TIMEOUT = 300
+# Same for the chart figures of closed months, which rarely change
+DASHBOARD_MONTH_CACHE_TIMEOUT = 60 * 60
+
+# /api/sync/ change feed: default and largest number of change log entries per
+# page, and days of entries `compact_change_log` keeps (0 keeps them all)
+SYNC_PAGE_SIZE = 500
+SYNC_MAX_PAGE_SIZE = 5000
+SYNC_RETENTION_DAYS = 30
+
+# Status board push channel: 'local' fans out within one process,
+# 'postgres' uses LISTEN/NOTIFY so changes reach screens on every worker
+ALTERATION_EVENTS_BACKEND = os.environ.get('ALTERATION_EVENTS_BACKEND', 'local')
+
+# Seconds between board refreshes when served over WSGI, which cannot stream
+# events (run under an ASGI server such as uvicorn for live updates)
+ALTERATION_BOARD_POLL_SECONDS = 10
+
+# Country code assumed for customer phone numbers entered without one
+PHONE_DEFAULT_COUNTRY_CODE = '91'
+
+# Customer notification outbox, drained by `manage.py send_notifications`.
+# Backends per channel: ConsoleBackend, FileBackend, SMTPBackend, SMSGatewayBackend
+NOTIFICATION_BACKENDS = {
+    'SMS': 'alteration.notifications.ConsoleBackend',
+    'EMAIL': 'alteration.notifications.ConsoleBackend',
+}
+NOTIFICATION_SMS_GATEWAY = {
+    'url': os.environ.get('SMS_GATEWAY_URL', ''),
+    'token': os.environ.get('SMS_GATEWAY_TOKEN', ''),
+    'sender': os.environ.get('SMS_GATEWAY_SENDER', 'LAAJAVAB'),
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -292,6 +401,11 @@ UNFOLD = {
                         "icon": "content_cut",
                         "link": reverse_lazy("admin:alteration_alteration_changelist"),
                     },
+                    {
+                        "title": _("Notifications"),
+                        "icon": "notifications",
+                        "link": reverse_lazy("admin:alteration_notification_changelist"),
+                    },
                 ],
             },
             {
@@ -311,6 +425,23 @@ UNFOLD = {
                     },
                 ],
             },
+            {
+                "title": _("Performance"),
+                "separator": True,
+                "collapsible": True,
+                "items": [
+                    {
+                        "title": _("Captured Queries"),
+                        "icon": "query_stats",
+                        "link": reverse_lazy("admin:core_capturedquery_changelist"),
+                    },
+                    {
+                        "title": _("Request Profiles"),
+                        "icon": "local_fire_department",
+                        "link": reverse_lazy("admin:core_requestprofile_changelist"),
+                    },
+                ],
+            },
         ],
     },
 }
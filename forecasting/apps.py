@@ -2,4 +2,7 @@ from django.apps import AppConfig
 
 class ForecastingConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'forecasting'
\ No newline at end of file
+    name = 'forecasting'
+
+    def ready(self):
+        from . import signals  # noqa: F401
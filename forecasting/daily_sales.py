@@ -0,0 +1,100 @@
+"""``DailySales`` maintenance and the training frame built from it.
+
+Rows are always recomputed for whole local days from the order lines, so
+refreshing a day is idempotent: the signals refresh the day of any completed
+order that changes, and the backfill command walks date ranges in chunks.
+A refresh holds a PostgreSQL advisory lock per day while it reads and
+rewrites that day, so concurrent refreshes of a day run one after another
+and the later one sees what the earlier one committed.
+"""
+from datetime import datetime, time, timedelta
+
+import pandas as pd
+from django.db import connection, transaction
+from django.db.models import Avg, DecimalField, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from sku.models import ProductSKU
+from supplier.models import OrderItem
+from .models import DailySales
+
+# First key of the two-key pg_advisory_xact_lock taken per refreshed day
+DAY_LOCK_CLASS = 0x64736c73
+
+
+def local_date(value):
+    return timezone.localtime(value).date()
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def aggregate_order_lines(start, end):
+    """Daily totals for completed orders created on local days ``start`` to ``end`` inclusive."""
+    average_price = Subquery(
+        ProductSKU.objects.filter(order=OuterRef('order'))
+        .values('order').annotate(average=Avg('price')).values('average'),
+        output_field=DecimalField(max_digits=10, decimal_places=2),
+    )
+    money = DecimalField(max_digits=12, decimal_places=2)
+    return (
+        OrderItem.objects.filter(
+            order__status='COMPLETED',
+            order__category__isnull=False,
+            order__created_at__gte=_day_start(start),
+            order__created_at__lt=_day_start(end + timedelta(days=1)),
+        )
+        .annotate(day=TruncDate('order__created_at'), price=Coalesce(average_price, Value(0), output_field=money))
+        .values('day', 'order__category_id', 'order__outfit_type', 'size')
+        .annotate(total_quantity=Sum('quantity'), total_revenue=Sum(F('quantity') * F('price'), output_field=money))
+    )
+
+
+def _lock_days(start, end):
+    """Lock local days ``start`` to ``end`` for this transaction, in date order."""
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT pg_advisory_xact_lock(%s, day) FROM generate_series(%s::int, %s::int) AS day ORDER BY day',
+            [DAY_LOCK_CLASS, start.toordinal(), end.toordinal()],
+        )
+
+
+def refresh_daily_sales(start, end=None):
+    """Replace ``DailySales`` for local days ``start`` to ``end`` with fresh totals; return rows written."""
+    end = end or start
+    with transaction.atomic():
+        _lock_days(start, end)
+        rows = [
+            DailySales(
+                date=row['day'],
+                category_id=row['order__category_id'],
+                outfit_type=row['order__outfit_type'],
+                size=row['size'],
+                quantity=row['total_quantity'],
+                revenue=row['total_revenue'],
+            )
+            for row in aggregate_order_lines(start, end)
+        ]
+        DailySales.objects.filter(date__gte=start, date__lte=end).delete()
+        DailySales.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def training_frame(start=None, end=None):
+    """Daily quantity per category name and size, in the shape ``DemandForecaster.prepare_data`` expects."""
+    queryset = DailySales.objects.all()
+    if start:
+        queryset = queryset.filter(date__gte=start)
+    if end:
+        queryset = queryset.filter(date__lte=end)
+    rows = (
+        queryset.values('date', 'category__name', 'size')
+        .annotate(total=Sum('quantity'))
+        .values_list('date', 'category__name', 'size', 'total')
+        .order_by()
+    )
+    return pd.DataFrame.from_records(list(rows), columns=['order_date', 'category', 'size', 'quantity'])
@@ -0,0 +1,322 @@
+"""Time-series engines behind ``DemandForecaster``'s trend.
+
+An engine fits a set of daily demand series, keyed by ``(category, size)``
+with ``None`` for an aggregated level, and predicts ``yhat``/``yhat_upper``
+for any of them at given dates.
+
+- ``prophet``: one Prophet model per series, fitted in a process pool.
+- ``smoothing``: damped Holt-Winters with weekly seasonality, or Croston
+  (SBA) for intermittent series, fitted for every series at once as 2-D
+  NumPy arrays.
+"""
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from prophet import Prophet
+from prophet.serialize import model_to_json, model_from_json
+
+PROPHET_FILE = 'prophet.json'
+SERIES_FILE = 'series.json'
+SMOOTHING_FILE = 'smoothing.json'
+TOTAL_SERIES = (None, None)
+# Versions saved before per-series models scaled XGBoost by yhat / 10
+LEGACY_TREND_SCALE = 10.0
+
+
+class ProphetEngine:
+    name = 'prophet'
+    # Category x size pairs need this many days of sales to get their own model
+    min_series_days = 60
+
+    def __init__(self):
+        self.models = {}
+        self.means = {}
+        self.report = {}
+
+    def __contains__(self, key):
+        return key in self.models
+
+    def fit(self, series, jobs=None):
+        """Fit ``series`` (key -> zero-filled daily ``pd.Series``) in ``jobs`` processes."""
+        jobs = jobs or os.cpu_count() or 1
+        if jobs == 1:
+            results = [_fit_prophet(key, history) for key, history in series.items()]
+        else:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                results = list(pool.map(_fit_prophet, series.keys(), series.values()))
+
+        self.models, self.means, self.report = {}, {}, {}
+        for key, model_json, mean, report in results:
+            self.report[key] = report
+            if model_json is not None:
+                self.models[key] = model_from_json(model_json)
+                self.means[key] = mean
+        return self.report
+
+    def predict(self, key, dates):
+        forecast = self.models[key].predict(pd.DataFrame({'ds': dates}))
+        return forecast['yhat'].to_numpy(), forecast['yhat_upper'].to_numpy()
+
+    def save(self, directory):
+        (directory / PROPHET_FILE).write_text(model_to_json(self.models[TOTAL_SERIES]))
+        series = []
+        for key, report in self.report.items():
+            series.append({
+                'category': key[0],
+                'size': key[1],
+                'mean': self.means.get(key),
+                # The total is already stored in PROPHET_FILE
+                'model': model_to_json(self.models[key]) if key in self.models and key != TOTAL_SERIES else None,
+                **report,
+            })
+        (directory / SERIES_FILE).write_text(json.dumps(series))
+
+    def load(self, directory):
+        total = model_from_json((directory / PROPHET_FILE).read_text())
+        self.models, self.means, self.report = {}, {}, {}
+        if not (directory / SERIES_FILE).exists():
+            # Versions trained before per-series models: the total only, on the old fixed scale
+            self.models[TOTAL_SERIES] = total
+            self.means[TOTAL_SERIES] = LEGACY_TREND_SCALE
+            return
+        for entry in json.loads((directory / SERIES_FILE).read_text()):
+            key = (entry.pop('category'), entry.pop('size'))
+            model_json, mean = entry.pop('model'), entry.pop('mean')
+            self.report[key] = entry
+            if key == TOTAL_SERIES:
+                self.models[key] = total
+            elif model_json is not None:
+                self.models[key] = model_from_json(model_json)
+            else:
+                continue
+            self.means[key] = mean
+
+
+def _fit_prophet(key, history):
+    """Fit Prophet to one daily series; runs in a worker process.
+
+    Returns ``(key, model_json, mean, report)``. Errors are caught and
+    reported so one bad series never aborts the whole training run.
+    """
+    logging.getLogger('cmdstanpy').setLevel(logging.WARNING)
+    started = time.perf_counter()
+    report = {'days': len(history)}
+    model_json = mean = None
+    try:
+        model = Prophet(yearly_seasonality='auto', weekly_seasonality='auto')
+        model.fit(pd.DataFrame({'ds': history.index, 'y': history.to_numpy()}))
+        model_json = model_to_json(model)
+        mean = float(history.mean()) or 1.0
+    except Exception as e:
+        report['error'] = f'{type(e).__name__}: {e}'
+    report['seconds'] = round(time.perf_counter() - started, 3)
+    return key, model_json, mean, report
+
+
+class SmoothingEngine:
+    """Exponential smoothing for every series in one vectorised pass.
+
+    Series are laid out as rows of a ``(series, days)`` matrix and each
+    candidate parameter set as a leading axis, so the recursion is a single
+    loop over days regardless of how many series there are. Each series
+    keeps the parameters with the lowest one-step-ahead squared error.
+    """
+    name = 'smoothing'
+    min_series_days = 14
+
+    SEASON = 7
+    DAMPING = 0.98
+    BURN_IN = 14
+    # Average inter-demand interval above which a series counts as intermittent (Syntetos-Boylan)
+    INTERMITTENT_ADI = 1.32
+    HW_ALPHAS = (0.02, 0.05, 0.1, 0.2, 0.3)
+    HW_BETAS = (0.0, 0.02)
+    HW_GAMMAS = (0.02, 0.1)
+    CROSTON_ALPHAS = (0.05, 0.1, 0.2, 0.3)
+    # One-sided z for an 80% interval, matching Prophet's default interval_width
+    INTERVAL_Z = 1.2816
+
+    def __init__(self):
+        self.params = {}
+        self.means = {}
+        self.report = {}
+        self.origin = None
+        self.end = None
+
+    def __contains__(self, key):
+        return key in self.params
+
+    def fit(self, series, jobs=None):
+        started = time.perf_counter()
+        keys = list(series)
+        self.origin = min(history.index[0] for history in series.values())
+        self.end = max(history.index[-1] for history in series.values())
+        index = pd.date_range(self.origin, self.end, freq='D')
+        values = np.vstack([series[key].reindex(index, fill_value=0).to_numpy(dtype=float) for key in keys])
+        starts = np.array([index.get_loc(series[key].index[0]) for key in keys])
+        active = np.arange(len(index)) >= starts[:, None]
+
+        hw = self._fit_holt_winters(values, active, starts)
+        croston = self._fit_croston(values, active, starts)
+
+        active_days = active.sum(axis=1)
+        demand_days = ((values > 0) & active).sum(axis=1)
+        adi = active_days / np.maximum(demand_days, 1)
+        means = np.where(active, values, 0).sum(axis=1) / np.maximum(active_days, 1)
+        seconds = round(time.perf_counter() - started, 3)
+
+        self.params, self.means, self.report = {}, {}, {}
+        for i, key in enumerate(keys):
+            params = croston[i] if adi[i] > self.INTERMITTENT_ADI else hw[i]
+            report = {'days': int(active_days[i]), 'method': params['method'], 'batch_seconds': seconds}
+            if not np.isfinite(params['sigma']):
+                report['error'] = 'Smoothing diverged'
+            else:
+                self.params[key] = params
+                self.means[key] = float(means[i]) or 1.0
+            self.report[key] = report
+        return self.report
+
+    def _initial_level(self, values, starts, window=28):
+        return np.array([row[start:start + window].mean() for row, start in zip(values, starts)])
+
+    def _select(self, sse, counted, arrays):
+        """Per series, pick the parameter set (leading axis) with the lowest error."""
+        best = sse.argmin(axis=0)
+        columns = np.arange(sse.shape[1])
+        sigma = np.sqrt(sse[best, columns] / np.maximum(counted, 1))
+        return best, columns, sigma, {name: array[best, columns] for name, array in arrays.items()}
+
+    def _fit_holt_winters(self, values, active, starts):
+        grid = np.array([(a, b, g) for a in self.HW_ALPHAS for b in self.HW_BETAS for g in self.HW_GAMMAS])
+        alpha, beta, gamma = (grid[:, i, None] for i in range(3))
+        n_series, n_days = values.shape
+        phi = self.DAMPING
+
+        level = np.tile(self._initial_level(values, starts), (len(grid), 1))
+        trend = np.zeros_like(level)
+        season = np.zeros((len(grid), n_series, self.SEASON))
+        sse = np.zeros_like(level)
+        counted = np.zeros(n_series)
+
+        for t in range(n_days):
+            y, on = values[:, t], active[:, t]
+            k = t % self.SEASON
+            seasonal = season[:, :, k]
+            error = y - (level + phi * trend + seasonal)
+            scored = on & (t >= starts + self.BURN_IN)
+            sse += np.where(scored, error ** 2, 0)
+            counted += scored
+
+            new_level = alpha * (y - seasonal) + (1 - alpha) * (level + phi * trend)
+            new_trend = beta * (new_level - level) + (1 - beta) * phi * trend
+            season[:, :, k] = np.where(on, gamma * (y - new_level) + (1 - gamma) * seasonal, seasonal)
+            trend = np.where(on, new_trend, trend)
+            level = np.where(on, new_level, level)
+
+        best, columns, sigma, picked = self._select(sse, counted, {'level': level, 'trend': trend})
+        season = season[best, columns]
+        return [{
+            'method': 'holt_winters',
+            'alpha': float(grid[best[i], 0]),
+            'beta': float(grid[best[i], 1]),
+            'gamma': float(grid[best[i], 2]),
+            'level': float(picked['level'][i]),
+            'trend': float(picked['trend'][i]),
+            'season': season[i].tolist(),
+            'sigma': float(sigma[i]),
+        } for i in range(n_series)]
+
+    def _fit_croston(self, values, active, starts):
+        alpha = np.array(self.CROSTON_ALPHAS)[:, None]
+        n_series, n_days = values.shape
+        nonzero_mean = np.array([
+            row[start:][row[start:] > 0].mean() if (row[start:] > 0).any() else 0.0
+            for row, start in zip(values, starts)
+        ])
+        active_days = active.sum(axis=1)
+        demand_days = ((values > 0) & active).sum(axis=1)
+
+        size = np.tile(nonzero_mean, (len(alpha), 1))
+        interval = np.tile(active_days / np.maximum(demand_days, 1), (len(alpha), 1))
+        since_last = np.ones_like(size)
+        sse = np.zeros_like(size)
+        counted = np.zeros(n_series)
+
+        for t in range(n_days):
+            y, on = values[:, t], active[:, t]
+            # Syntetos-Boylan bias correction
+            error = y - (1 - alpha / 2) * size / interval
+            scored = on & (t >= starts + self.BURN_IN)
+            sse += np.where(scored, error ** 2, 0)
+            counted += scored
+
+            demand = on & (y > 0)
+            size = np.where(demand, alpha * y + (1 - alpha) * size, size)
+            interval = np.where(demand, alpha * since_last + (1 - alpha) * interval, interval)
+            since_last = np.where(demand, 1, np.where(on, since_last + 1, since_last))
+
+        best, columns, sigma, picked = self._select(sse, counted, {'size': size, 'interval': interval})
+        return [{
+            'method': 'croston',
+            'alpha': float(alpha[best[i], 0]),
+            'level': float((1 - alpha[best[i], 0] / 2) * picked['size'][i] / picked['interval'][i]),
+            'trend': 0.0,
+            'season': [0.0] * self.SEASON,
+            'sigma': float(sigma[i]),
+        } for i in range(n_series)]
+
+    def predict(self, key, dates):
+        params = self.params[key]
+        dates = pd.DatetimeIndex(dates)
+        horizon = np.maximum((dates - self.end).days.to_numpy(), 1)
+        phi = self.DAMPING
+        damped_trend = params['trend'] * phi * (1 - phi ** horizon) / (1 - phi)
+        seasonal = np.array(params['season'])[(dates - self.origin).days.to_numpy() % self.SEASON]
+        yhat = np.maximum(0, params['level'] + damped_trend + seasonal)
+        return yhat, yhat + self.INTERVAL_Z * params['sigma']
+
+    def save(self, directory):
+        series = [{
+            'category': key[0],
+            'size': key[1],
+            'mean': self.means.get(key),
+            'params': self.params.get(key),
+            **report,
+        } for key, report in self.report.items()]
+        (directory / SMOOTHING_FILE).write_text(json.dumps({
+            'origin': self.origin.date().isoformat(),
+            'end': self.end.date().isoformat(),
+            'series': series,
+        }))
+
+    def load(self, directory):
+        state = json.loads((directory / SMOOTHING_FILE).read_text())
+        self.origin = pd.Timestamp(state['origin'])
+        self.end = pd.Timestamp(state['end'])
+        self.params, self.means, self.report = {}, {}, {}
+        for entry in state['series']:
+            key = (entry.pop('category'), entry.pop('size'))
+            mean, params = entry.pop('mean'), entry.pop('params')
+            self.report[key] = entry
+            if params is not None:
+                self.params[key] = params
+                self.means[key] = mean
+
+
+ENGINES = {
+    ProphetEngine.name: ProphetEngine,
+    SmoothingEngine.name: SmoothingEngine,
+}
+
+
+def get_engine(name):
+    try:
+        return ENGINES[name]()
+    except KeyError:
+        raise ValueError(f"Unknown forecasting engine: {name}. Choose from {', '.join(ENGINES)}")
@@ -0,0 +1,138 @@
+"""Out-of-sample evaluation of ``DemandForecaster`` on exported sales data.
+
+Models are trained only on days up to a cutoff and scored on the daily
+demand of every category/size pair over the following horizon. Days without
+sales count as zero demand. ``backtest`` repeats this walk-forward over
+several cutoffs for each engine and feature set.
+"""
+import time
+import tracemalloc
+
+import pandas as pd
+
+from .services import DEFAULT_FEATURES, DemandForecaster
+
+SALES_COLUMNS = ['order_date', 'category', 'size', 'quantity']
+
+
+def evaluate_holdout(df, engine, cutoff, horizon_days, jobs=None, features=DEFAULT_FEATURES):
+    """Train on sales up to ``cutoff`` and score the next ``horizon_days`` days.
+
+    Returns ``(summary, errors)``: timings, peak traced memory and overall
+    error metrics, and a frame with one row per pair and day holding
+    ``predicted`` and ``actual``. Peak memory covers Python and NumPy
+    allocations, not memory held inside XGBoost or Stan.
+    """
+    df = df[SALES_COLUMNS].copy()
+    df['order_date'] = pd.to_datetime(df['order_date'])
+    cutoff = pd.Timestamp(cutoff)
+    end = cutoff + pd.Timedelta(days=horizon_days)
+    train = df[df['order_date'] <= cutoff]
+    test = df[(df['order_date'] > cutoff) & (df['order_date'] <= end)]
+
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    try:
+        forecaster = DemandForecaster(engine=engine, features=features)
+        prepared = forecaster.prepare_data(train.copy())
+        started = time.perf_counter()
+        report = forecaster.train_series(prepared, jobs=jobs)
+        series_seconds = time.perf_counter() - started
+        forecaster.train_xgboost(prepared)
+        fit_seconds = time.perf_counter() - started
+        fit_peak = tracemalloc.get_traced_memory()[1]
+
+        tracemalloc.reset_peak()
+        pairs = list(prepared[['category', 'size']].drop_duplicates().itertuples(index=False, name=None))
+        dates = pd.date_range(cutoff + pd.Timedelta(days=1), end, freq='D')
+        started = time.perf_counter()
+        predictions = pd.DataFrame(forecaster.predict_demand_batch(pairs, dates))
+        predict_seconds = time.perf_counter() - started
+        predict_peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+
+    predictions['forecast_date'] = pd.to_datetime(predictions['forecast_date'])
+    actual = (
+        test.groupby(['order_date', 'category', 'size'])['quantity'].sum()
+        .rename('actual').rename_axis(['forecast_date', 'category', 'size']).reset_index()
+    )
+    errors = predictions.merge(actual, on=['forecast_date', 'category', 'size'], how='left')
+    errors['actual'] = errors['actual'].fillna(0)
+    errors = errors.rename(columns={'predicted_demand': 'predicted'})
+    errors['error'] = errors['predicted'] - errors['actual']
+
+    summary = {
+        'engine': engine,
+        'features': features,
+        'cutoff': cutoff.date().isoformat(),
+        'horizon_days': horizon_days,
+        'train_records': len(train),
+        'series': len(report),
+        'series_failed': sum('error' in r for r in report.values()),
+        'series_seconds': round(series_seconds, 3),
+        'fit_seconds': round(fit_seconds, 3),
+        'predict_seconds': round(predict_seconds, 3),
+        'fit_peak_mb': round(fit_peak / 2 ** 20, 1),
+        'predict_peak_mb': round(predict_peak / 2 ** 20, 1),
+        'predictions': len(errors),
+        **error_metrics(errors),
+    }
+    return summary, errors[['category', 'size', 'forecast_date', 'predicted', 'actual', 'error']]
+
+
+def error_metrics(errors):
+    """MAE, bias, WAPE and MAPE for a frame of ``predicted``/``actual``/``error``.
+
+    MAPE is only defined on days with sales, so it skips zero-demand days;
+    WAPE (total absolute error over total demand) covers every day.
+    """
+    sold = errors[errors['actual'] > 0]
+    total = errors['actual'].sum()
+    return {
+        'mae': round(float(errors['error'].abs().mean()), 4),
+        'bias': round(float(errors['error'].mean()), 4),
+        'wape': round(float(errors['error'].abs().sum() / total), 4) if total else None,
+        'mape': round(float((sold['error'].abs() / sold['actual']).mean()), 4) if len(sold) else None,
+    }
+
+
+def series_metrics(errors):
+    """``error_metrics`` per category and size."""
+    rows = []
+    for (category, size), group in errors.groupby(['category', 'size']):
+        rows.append({'category': category, 'size': size, 'days': len(group), **error_metrics(group)})
+    return pd.DataFrame(rows)
+
+
+def rolling_cutoffs(df, folds, horizon_days, step_days=None):
+    """``folds`` cutoffs stepping back from the last date so each leaves a full horizon to score."""
+    last = pd.to_datetime(df['order_date']).max()
+    step = pd.Timedelta(days=step_days or horizon_days)
+    first = last - pd.Timedelta(days=horizon_days)
+    return [first - step * i for i in reversed(range(folds))]
+
+
+def backtest(df, engines, feature_sets, cutoffs, horizon_days, jobs=None, progress=None):
+    """Walk-forward evaluation of every engine and feature set at every cutoff.
+
+    Returns ``(folds, by_series)``: one summary per (engine, features,
+    cutoff), and per-series metrics for every fold in one frame.
+    """
+    folds = []
+    by_series = []
+    for engine in engines:
+        for features in feature_sets:
+            for cutoff in cutoffs:
+                summary, errors = evaluate_holdout(df, engine, cutoff, horizon_days, jobs=jobs, features=features)
+                folds.append(summary)
+                by_series.append(series_metrics(errors).assign(
+                    engine=engine, features=features, cutoff=summary['cutoff'],
+                ))
+                if progress:
+                    progress(summary)
+    by_series = pd.concat(by_series, ignore_index=True) if by_series else pd.DataFrame()
+    return folds, by_series
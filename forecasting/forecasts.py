@@ -0,0 +1,128 @@
+"""Reading and writing stored forecasts for a multi-month horizon.
+
+A forecast for (category, size, month) is looked up in three places, in
+order: the Django cache, ``DemandForecast`` rows written by the active model
+version, and finally the model itself. The cache holds one entry per model
+version and month, mapping ``(category_id, size)`` to the forecast, so a
+horizon request touches at most ``MAX_HORIZON_MONTHS`` keys and never
+crowds other entries out of a size-capped backend. Keys include the model
+version, so activating a new model makes every older entry unreachable
+without any explicit invalidation.
+"""
+from datetime import date
+
+from django.core.cache import cache
+
+from .models import DemandForecast
+
+CACHE_PREFIX = 'forecast'
+CACHE_TIMEOUT = 24 * 60 * 60
+MAX_HORIZON_MONTHS = 12
+
+
+def month_range(start, months):
+    """First day of ``months`` consecutive months from ``start``."""
+    index = start.year * 12 + start.month - 1
+    return [date((index + i) // 12, (index + i) % 12 + 1, 1) for i in range(months)]
+
+
+def cache_key(model_version, month):
+    return f'{CACHE_PREFIX}:{model_version}:{month:%Y-%m}'
+
+
+def cached_forecasts(model_version, months):
+    """``{(category_id, size, month): entry}`` for everything cached for ``months``."""
+    blobs = cache.get_many([cache_key(model_version, month) for month in months])
+    return {
+        (category_id, size, month): entry
+        for month in months
+        for (category_id, size), entry in blobs.get(cache_key(model_version, month), {}).items()
+    }
+
+
+def cache_forecasts(model_version, entries):
+    """Merge ``{(category_id, size, month): entry}`` into the cached month entries.
+
+    Concurrent merges can drop each other's additions; those forecasts are
+    then read from ``DemandForecast`` and cached again.
+    """
+    by_month = {}
+    for (category_id, size, month), entry in entries.items():
+        by_month.setdefault(month, {})[(category_id, size)] = entry
+    if not by_month:
+        return
+    keys = {cache_key(model_version, month): month for month in by_month}
+    blobs = cache.get_many(keys)
+    cache.set_many({
+        key: {**blobs.get(key, {}), **by_month[month]} for key, month in keys.items()
+    }, CACHE_TIMEOUT)
+
+
+def _entry(row):
+    return {
+        'predicted_demand': row.predicted_demand,
+        'confidence_score': row.confidence_score,
+    }
+
+
+def write_forecasts(model_version, predictions, categories_by_name):
+    """Upsert ``predict_demand_batch`` output for every category sharing each name and cache it."""
+    rows = [
+        DemandForecast(
+            category=category,
+            size=prediction['size'],
+            forecast_month=prediction['forecast_date'],
+            predicted_demand=prediction['predicted_demand'],
+            confidence_score=prediction['confidence'],
+            model_version=model_version,
+        )
+        for prediction in predictions
+        for category in categories_by_name[prediction['category']]
+    ]
+    DemandForecast.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=['category', 'size', 'forecast_month'],
+        update_fields=['predicted_demand', 'confidence_score', 'model_version'],
+    )
+    cache_forecasts(model_version, {(row.category.id, row.size, row.forecast_month): _entry(row) for row in rows})
+    return rows
+
+
+def horizon_forecasts(model_version, forecaster, categories, sizes, months):
+    """Forecasts for every category x size x month, computing only what is missing.
+
+    Anything not cached or stored for ``model_version`` is predicted in a
+    single ``predict_demand_batch`` call and written back. Returns
+    ``{(category_id, size, month): entry}``.
+    """
+    wanted = [(category.id, size, month) for category in categories for size in sizes for month in months]
+    found = cached_forecasts(model_version, months)
+
+    missing = [k for k in wanted if k not in found]
+    if missing:
+        stored = DemandForecast.objects.filter(
+            model_version=model_version,
+            category__in={k[0] for k in missing},
+            size__in={k[1] for k in missing},
+            forecast_month__in={k[2] for k in missing},
+        )
+        backfill = {}
+        for row in stored:
+            k = (row.category_id, row.size, row.forecast_month)
+            if k not in found:
+                found[k] = backfill[k] = _entry(row)
+        cache_forecasts(model_version, backfill)
+        missing = [k for k in missing if k not in found]
+
+    if missing:
+        by_id = {category.id: category for category in categories}
+        categories_by_name = {}
+        for category in categories:
+            categories_by_name.setdefault(category.name, []).append(category)
+        pairs = {(by_id[category_id].name, size) for category_id, size, _ in missing}
+        predictions = forecaster.predict_demand_batch(sorted(pairs), sorted({k[2] for k in missing}))
+        for row in write_forecasts(model_version, predictions, categories_by_name):
+            found[(row.category.id, row.size, row.forecast_month)] = _entry(row)
+
+    return {k: found[k] for k in wanted if k in found}
@@ -0,0 +1,132 @@
+"""Forecast generation as queued jobs.
+
+Requests only insert a ``ForecastRun``; ``run_forecast_worker`` claims
+queued runs and writes the ``DemandForecast`` rows, recording progress and
+timing per category as it goes.
+"""
+import time
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from core.models import Category
+from .forecasts import month_range, write_forecasts
+from .models import ForecastRun
+from .registry import get_active_forecaster
+
+
+def next_month_start(today=None):
+    today = today or timezone.localdate()
+    return (today.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+
+def enqueue_run(forecast_month, months=1):
+    """Queue a run for ``months`` months from ``forecast_month`` and return ``(run, created)``.
+
+    If the same run is already queued or running it is returned instead, so
+    duplicate requests coalesce into one job.
+    """
+    active = ForecastRun.objects.filter(
+        forecast_month=forecast_month, months=months, status__in=ForecastRun.ACTIVE_STATUSES
+    )
+    run = active.first()
+    if run:
+        return run, False
+    try:
+        with transaction.atomic():
+            return ForecastRun.objects.create(forecast_month=forecast_month, months=months), True
+    except IntegrityError:
+        return active.get(), False
+
+
+def claim_next_run():
+    """Mark the oldest queued run as RUNNING and return it, or ``None``."""
+    with transaction.atomic():
+        run = (
+            ForecastRun.objects.select_for_update(skip_locked=True)
+            .filter(status='QUEUED')
+            .order_by('created_at')
+            .first()
+        )
+        if run is None:
+            return None
+        run.status = 'RUNNING'
+        run.started_at = timezone.now()
+        run.save(update_fields=['status', 'started_at'])
+    return run
+
+
+def fail_stale_runs(max_age):
+    """Fail RUNNING runs older than ``max_age`` so a crashed worker cannot block a month forever."""
+    return ForecastRun.objects.filter(
+        status='RUNNING', started_at__lt=timezone.now() - max_age
+    ).update(status='FAILED', error='Worker did not finish the run', finished_at=timezone.now())
+
+
+def execute_run(run):
+    model_version, forecaster = get_active_forecaster()
+    if forecaster is None:
+        run.status = 'FAILED'
+        run.error = 'Models not trained. Run train_models command first.'
+        run.finished_at = timezone.now()
+        run.save(update_fields=['status', 'error', 'finished_at'])
+        return run
+
+    categories = {}
+    for category in Category.objects.all():
+        categories.setdefault(category.name, []).append(category)
+    sizes = forecaster.label_encoders['size'].classes_
+    forecast_dates = month_range(run.forecast_month, run.months)
+
+    run.model_version = model_version
+    run.total_categories = len(categories)
+    run.save(update_fields=['model_version', 'total_categories'])
+
+    for name, category_objects in categories.items():
+        started = time.perf_counter()
+        result = {}
+        try:
+            predictions = forecaster.predict_demand_batch([(name, size) for size in sizes], forecast_dates)
+            rows = write_forecasts(model_version, predictions, {name: category_objects})
+            result['forecasts'] = len(rows)
+            run.forecasts_written += len(rows)
+        except Exception as e:
+            result['error'] = f'{type(e).__name__}: {e}'
+        result['seconds'] = round(time.perf_counter() - started, 4)
+
+        run.category_results[name] = result
+        run.completed_categories += 1
+        run.save(update_fields=['completed_categories', 'forecasts_written', 'category_results'])
+
+    failures = [name for name, result in run.category_results.items() if 'error' in result]
+    run.status = 'FAILED' if failures and len(failures) == len(categories) else 'SUCCEEDED'
+    if failures:
+        run.error = f'{len(failures)} of {len(categories)} categories failed'
+    run.finished_at = timezone.now()
+    run.save(update_fields=['status', 'error', 'finished_at'])
+    return run
+
+
+def run_to_dict(run):
+    elapsed = None
+    if run.started_at:
+        elapsed = round(((run.finished_at or timezone.now()) - run.started_at).total_seconds(), 3)
+    return {
+        'id': run.id,
+        'status': run.status,
+        'forecast_month': run.forecast_month,
+        'months': run.months,
+        'model_version': run.model_version,
+        'progress': {
+            'completed_categories': run.completed_categories,
+            'total_categories': run.total_categories,
+            'forecasts_written': run.forecasts_written,
+        },
+        'category_results': run.category_results,
+        'error': run.error,
+        'created_at': run.created_at,
+        'started_at': run.started_at,
+        'finished_at': run.finished_at,
+        'elapsed_seconds': elapsed,
+    }
@@ -0,0 +1,33 @@
+from datetime import date, timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min
+from forecasting.daily_sales import local_date, refresh_daily_sales
+from supplier.models import Order
+
+class Command(BaseCommand):
+    help = 'Rebuild the DailySales aggregate from completed order lines in date-chunked batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', type=date.fromisoformat, help='First day to rebuild (defaults to the first order)')
+        parser.add_argument('--end', type=date.fromisoformat, help='Last day to rebuild (defaults to the latest order)')
+        parser.add_argument('--chunk-days', type=int, default=31, help='Days rebuilt per transaction')
+
+    def handle(self, *args, **options):
+        bounds = Order.objects.filter(status='COMPLETED').aggregate(first=Min('created_at'), last=Max('created_at'))
+        if bounds['first'] is None and not (options['start'] and options['end']):
+            self.stdout.write('No completed orders to aggregate')
+            return
+        start = options['start'] or local_date(bounds['first'])
+        end = options['end'] or local_date(bounds['last'])
+        if start > end:
+            raise CommandError('--start must not be after --end')
+
+        total = 0
+        chunk = timedelta(days=options['chunk_days'])
+        while start <= end:
+            chunk_end = min(start + chunk - timedelta(days=1), end)
+            written = refresh_daily_sales(start, chunk_end)
+            total += written
+            self.stdout.write(f'{start} to {chunk_end}: {written} rows')
+            start = chunk_end + timedelta(days=1)
+        self.stdout.write(self.style.SUCCESS(f'Wrote {total} DailySales rows'))
@@ -0,0 +1,82 @@
+import json
+from pathlib import Path
+import pandas as pd
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from forecasting.engines import ENGINES
+from forecasting.evaluation import SALES_COLUMNS, backtest, rolling_cutoffs
+from forecasting.sales_data import read_sales
+from forecasting.services import DEFAULT_ENGINE, DEFAULT_FEATURES, FEATURE_SETS
+
+class Command(BaseCommand):
+    help = 'Walk-forward backtest of the demand forecaster over several cutoffs, engines and feature sets'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--input', help='Parquet dataset directory or CSV file (defaults to FORECASTING_SALES_DATASET)')
+        parser.add_argument('--engines', nargs='+', choices=list(ENGINES), default=[DEFAULT_ENGINE])
+        parser.add_argument('--features', nargs='+', choices=list(FEATURE_SETS), default=[DEFAULT_FEATURES])
+        parser.add_argument('--cutoffs', nargs='+', type=pd.Timestamp, help='Explicit training cutoffs (YYYY-MM-DD)')
+        parser.add_argument('--folds', type=int, default=3, help='Number of rolling cutoffs when --cutoffs is not given')
+        parser.add_argument('--step-days', type=int, help='Days between rolling cutoffs (defaults to the horizon)')
+        parser.add_argument('--horizon-days', type=int, default=28, help='Days scored after each cutoff')
+        parser.add_argument('--jobs', type=int, default=None, help='Worker processes for engines that fit in parallel')
+        parser.add_argument('--output-dir', help='Where to write the results (defaults to backtests/<timestamp>)')
+
+    def handle(self, *args, **options):
+        df = self.load(options['input'])
+        cutoffs = options['cutoffs'] or rolling_cutoffs(df, options['folds'], options['horizon_days'], options['step_days'])
+        output_dir = Path(options['output_dir'] or Path('backtests') / timezone.now().strftime('%Y%m%d-%H%M%S'))
+        self.stdout.write(
+            f'{len(df)} records; cutoffs {", ".join(f"{c:%Y-%m-%d}" for c in cutoffs)}; '
+            f'horizon {options["horizon_days"]} days'
+        )
+
+        self.stdout.write(
+            f'{"engine":<11}{"features":<10}{"cutoff":<12}{"fit s":>8}{"pred s":>8}{"peak MB":>9}'
+            f'{"MAE":>8}{"MAPE":>8}{"bias":>8}'
+        )
+        folds, by_series = backtest(
+            df, options['engines'], options['features'], cutoffs, options['horizon_days'],
+            jobs=options['jobs'], progress=self.report_fold,
+        )
+
+        folds_frame = pd.DataFrame(folds)
+        aggregate = (
+            folds_frame.groupby(['engine', 'features'])
+            [['fit_seconds', 'predict_seconds', 'fit_peak_mb', 'mae', 'mape', 'bias', 'wape']]
+            .mean().round(4).reset_index()
+        )
+        self.stdout.write('Mean over cutoffs:')
+        for row in aggregate.itertuples(index=False):
+            self.stdout.write(
+                f'  {row.engine:<11}{row.features:<10} fit {row.fit_seconds:.2f}s  predict {row.predict_seconds:.2f}s  '
+                f'MAE {row.mae:.3f}  MAPE {row.mape:.3f}  bias {row.bias:+.3f}'
+            )
+
+        output_dir.mkdir(parents=True, exist_ok=True)
+        (output_dir / 'summary.json').write_text(json.dumps({
+            'input': str(options['input'] or 'FORECASTING_SALES_DATASET'),
+            'records': len(df),
+            'horizon_days': options['horizon_days'],
+            'cutoffs': [f'{c:%Y-%m-%d}' for c in cutoffs],
+            'folds': folds,
+            'aggregate': aggregate.to_dict(orient='records'),
+        }, indent=2))
+        folds_frame.to_csv(output_dir / 'folds.csv', index=False)
+        by_series.to_csv(output_dir / 'series_metrics.csv', index=False)
+        self.stdout.write(self.style.SUCCESS(f'Results written to {output_dir}'))
+
+    def load(self, path):
+        try:
+            if path and path.endswith('.csv'):
+                return pd.read_csv(path, usecols=SALES_COLUMNS)
+            return read_sales(path, columns=SALES_COLUMNS)
+        except FileNotFoundError:
+            raise CommandError(f'No sales data at {path or "FORECASTING_SALES_DATASET"}; run export_sales_data first')
+
+    def report_fold(self, fold):
+        mape = f'{fold["mape"]:.3f}' if fold['mape'] is not None else '-'
+        self.stdout.write(
+            f'{fold["engine"]:<11}{fold["features"]:<10}{fold["cutoff"]:<12}{fold["fit_seconds"]:>8.2f}'
+            f'{fold["predict_seconds"]:>8.2f}{fold["fit_peak_mb"]:>9.1f}{fold["mae"]:>8.3f}{mape:>8}{fold["bias"]:>8.3f}'
+        )
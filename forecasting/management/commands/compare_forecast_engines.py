@@ -0,0 +1,30 @@
+import pandas as pd
+from django.core.management.base import BaseCommand, CommandError
+from forecasting.engines import ENGINES
+from forecasting.evaluation import SALES_COLUMNS, evaluate_holdout
+from forecasting.sales_data import read_sales
+
+class Command(BaseCommand):
+    help = 'Compare fit time, predict time and holdout MAE of the forecasting engines on the exported sales data'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--engines', nargs='+', choices=list(ENGINES), default=list(ENGINES))
+        parser.add_argument('--holdout-days', type=int, default=56, help='Most recent days held out for scoring')
+        parser.add_argument('--jobs', type=int, default=None, help='Worker processes for engines that fit in parallel')
+
+    def handle(self, *args, **options):
+        try:
+            df = read_sales(columns=SALES_COLUMNS)
+        except FileNotFoundError:
+            raise CommandError('Run export_sales_data first')
+        cutoff = pd.to_datetime(df['order_date']).max() - pd.Timedelta(days=options['holdout_days'])
+        self.stdout.write(f'{len(df)} records, training up to {cutoff:%Y-%m-%d}, scoring {options["holdout_days"]} days')
+
+        header = f'{"engine":<12}{"series":>8}{"series s":>10}{"fit s":>9}{"predict s":>11}{"MAE":>9}{"bias":>9}'
+        self.stdout.write(header)
+        for engine in options['engines']:
+            summary, _ = evaluate_holdout(df, engine, cutoff, options['holdout_days'], jobs=options['jobs'])
+            self.stdout.write(
+                f'{engine:<12}{summary["series"]:>8}{summary["series_seconds"]:>10.2f}{summary["fit_seconds"]:>9.2f}'
+                f'{summary["predict_seconds"]:>11.2f}{summary["mae"]:>9.3f}{summary["bias"]:>9.3f}'
+            )
@@ -1,27 +1,17 @@
-import os
 from django.core.management.base import BaseCommand
-from django.db import connection
-import pandas as pd
+from forecasting.sales_data import DEFAULT_CHUNK_SIZE, dataset_path, export_sales, read_watermark
 
 class Command(BaseCommand):
-    help = 'Export sales data for demand forecasting'
+    help = 'Export completed sales lines to a month-partitioned Parquet dataset for demand forecasting'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--incremental', action='store_true', help='Append only orders completed since the last export')
+        parser.add_argument('--output', help='Dataset directory (defaults to FORECASTING_SALES_DATASET)')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='Rows fetched per round trip')
 
     def handle(self, *args, **options):
-        query = """
-        SELECT 
-            oi.size,
-            c.name as category,
-            oi.quantity,
-            o.created_at::date as order_date,
-            sku.price
-        FROM supplier_orderitem oi
-        JOIN supplier_order o ON oi.order_id = o.id
-        JOIN core_category c ON o.category_id = c.id
-        LEFT JOIN sku_productsku sku ON sku.category_id = c.id
-        WHERE o.status = 'COMPLETED'
-        ORDER BY o.created_at
-        """
-        
-        df = pd.read_sql(query, connection)
-        df.to_csv('sales_data.csv', index=False)
-        self.stdout.write(f'Exported {len(df)} records to sales_data.csv')
\ No newline at end of file
+        path = options['output'] or dataset_path()
+        written = export_sales(path, incremental=options['incremental'], chunk_size=options['chunk_size'])
+        watermark = read_watermark(path)
+        mode = 'Appended' if options['incremental'] else 'Exported'
+        self.stdout.write(f'{mode} {written} records to {path} (watermark: {watermark[0] if watermark else "none"})')
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+from forecasting.registry import ModelRegistry, RegistryError
+
+class Command(BaseCommand):
+    help = 'List, activate, roll back or delete stored forecasting model versions'
+
+    def add_arguments(self, parser):
+        group = parser.add_mutually_exclusive_group()
+        group.add_argument('--activate', metavar='VERSION')
+        group.add_argument('--rollback', action='store_true', help='Re-activate the previously active version')
+        group.add_argument('--delete', metavar='VERSION')
+
+    def handle(self, *args, **options):
+        registry = ModelRegistry()
+        try:
+            if options['activate']:
+                registry.activate(options['activate'])
+                self.stdout.write(f"Activated {options['activate']}")
+            elif options['rollback']:
+                self.stdout.write(f'Rolled back to {registry.rollback()}')
+            elif options['delete']:
+                registry.delete(options['delete'])
+                self.stdout.write(f"Deleted {options['delete']}")
+        except RegistryError as e:
+            raise CommandError(str(e))
+
+        manifest = registry.read_manifest()
+        for version, info in sorted(manifest['versions'].items()):
+            marker = '*' if version == manifest['active'] else ' '
+            metrics = ', '.join(f'{k}={v}' for k, v in info['metrics'].items())
+            self.stdout.write(f'{marker} {version}  {info["created_at"]}  {metrics}')
@@ -0,0 +1,33 @@
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from forecasting.jobs import claim_next_run, execute_run, fail_stale_runs
+
+class Command(BaseCommand):
+    help = 'Execute queued forecast runs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Keep polling for new runs instead of exiting when the queue is empty')
+        parser.add_argument('--interval', type=float, default=5, help='Seconds between polls in --loop mode')
+        parser.add_argument('--stale-after', type=int, default=3600, help='Fail RUNNING runs older than this many seconds')
+
+    def handle(self, *args, **options):
+        while True:
+            stale = fail_stale_runs(timedelta(seconds=options['stale_after']))
+            if stale:
+                self.stdout.write(self.style.WARNING(f'Marked {stale} stale run(s) as failed'))
+
+            run = claim_next_run()
+            while run is not None:
+                self.stdout.write(f'Run {run.id}: forecasting {run.months} month(s) from {run.forecast_month:%Y-%m}')
+                run = execute_run(run)
+                style = self.style.SUCCESS if run.status == 'SUCCEEDED' else self.style.ERROR
+                self.stdout.write(style(
+                    f'Run {run.id}: {run.status}, {run.forecasts_written} forecasts '
+                    f'across {run.completed_categories} categories {run.error}'.rstrip()
+                ))
+                run = claim_next_run()
+
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -1,28 +1,60 @@
-import pandas as pd
+import time
 from django.core.management.base import BaseCommand
-from forecasting.services import DemandForecaster
+from forecasting.daily_sales import training_frame
+from forecasting.sales_data import read_sales
+from forecasting.engines import ENGINES
+from forecasting.services import DEFAULT_ENGINE, DEFAULT_FEATURES, FEATURE_SETS, DemandForecaster
+from forecasting.registry import ModelRegistry
 
 class Command(BaseCommand):
     help = 'Train demand forecasting models'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--source', choices=['daily_sales', 'export'], default='daily_sales', help='Train from the DailySales table or the exported Parquet dataset')
+        parser.add_argument('--engine', choices=list(ENGINES), default=DEFAULT_ENGINE, help='Time-series engine for the per-series trend')
+        parser.add_argument('--features', choices=list(FEATURE_SETS), default=DEFAULT_FEATURES, help='XGBoost feature set')
+        parser.add_argument('--jobs', type=int, default=None, help='Worker processes for per-series Prophet fits (defaults to the CPU count)')
+
     def handle(self, *args, **options):
-        # Load exported data
-        try:
-            df = pd.read_csv('sales_data.csv')
-            self.stdout.write(f'Loaded {len(df)} records')
-        except FileNotFoundError:
-            self.stdout.write('Run export_sales_data first')
-            return
+        # Load daily sales
+        if options['source'] == 'export':
+            try:
+                df = read_sales(columns=['order_date', 'category', 'size', 'quantity'])
+            except FileNotFoundError:
+                self.stdout.write('Run export_sales_data first')
+                return
+        else:
+            df = training_frame()
+            if df.empty:
+                self.stdout.write('DailySales is empty; run backfill_daily_sales first')
+                return
+        self.stdout.write(f'Loaded {len(df)} records')
         
         # Initialize and train forecaster
-        forecaster = DemandForecaster()
+        forecaster = DemandForecaster(engine=options['engine'], features=options['features'])
         prepared_data = forecaster.prepare_data(df)
         
         # Train models
-        forecaster.train_prophet(prepared_data)
+        started = time.perf_counter()
+        report = forecaster.train_series(prepared_data, jobs=options['jobs'])
+        series_seconds = time.perf_counter() - started
+        failed = {key: r['error'] for key, r in report.items() if 'error' in r}
+        for (category, size), error in failed.items():
+            self.stdout.write(self.style.WARNING(f'Series {category or "total"}/{size or "all"} failed: {error}'))
+        self.stdout.write(
+            f'Fitted {len(report) - len(failed)} of {len(report)} series with {options["engine"]} in {series_seconds:.2f}s'
+        )
         mae = forecaster.train_xgboost(prepared_data)
         
-        # Save models
-        forecaster.save_models()
+        # Save models as a new registry version and make it active
+        version = ModelRegistry().save(forecaster, metrics={
+            'xgb_mae': float(mae),
+            'records': len(df),
+            'series': len(report),
+            'series_failed': len(failed),
+            'engine': options['engine'],
+            'features': options['features'],
+            'series_seconds': round(series_seconds, 2),
+        })
         
-        self.stdout.write(f'Models trained successfully. XGBoost MAE: {mae:.2f}')
\ No newline at end of file
+        self.stdout.write(f'Models trained successfully. XGBoost MAE: {mae:.2f}. Active version: {version}')
\ No newline at end of file
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_outfittype'),
+        ('forecasting', '0002_forecastrun'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='forecastrun',
+            name='forecastrun_one_active_per_month',
+        ),
+        migrations.AddField(
+            model_name='demandforecast',
+            name='model_version',
+            field=models.CharField(blank=True, max_length=50),
+        ),
+        migrations.AddField(
+            model_name='forecastrun',
+            name='months',
+            field=models.PositiveSmallIntegerField(default=1),
+        ),
+        migrations.AddIndex(
+            model_name='demandforecast',
+            index=models.Index(fields=['forecast_month', 'size'], name='demandforecast_month_size_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='forecastrun',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['QUEUED', 'RUNNING'])), fields=('forecast_month', 'months'), name='forecastrun_one_active_per_horizon'),
+        ),
+    ]
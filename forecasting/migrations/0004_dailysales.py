@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_outfittype'),
+        ('forecasting', '0003_forecast_horizon'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailySales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('outfit_type', models.CharField(blank=True, max_length=50)),
+                ('size', models.CharField(max_length=20)),
+                ('quantity', models.PositiveIntegerField()),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.category')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('date', 'category', 'outfit_type', 'size'), name='dailysales_unique_key')],
+            },
+        ),
+    ]
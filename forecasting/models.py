@@ -7,10 +7,79 @@ class DemandForecast(models.Model):
     predicted_demand = models.IntegerField()
     forecast_month = models.DateField()
     confidence_score = models.FloatField()
+    # Registry version that produced the row; rows from other versions are recomputed on read
+    model_version = models.CharField(max_length=50, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         unique_together = ['category', 'size', 'forecast_month']
+        indexes = [
+            # Month-range queries without a category; the unique index covers category-first lookups
+            models.Index(fields=['forecast_month', 'size'], name='demandforecast_month_size_idx'),
+        ]
 
     def __str__(self):
-        return f"{self.category.name} {self.size} - {self.predicted_demand}"
\ No newline at end of file
+        return f"{self.category.name} {self.size} - {self.predicted_demand}"
+
+class ForecastRun(models.Model):
+    """One forecast generation job, executed by ``run_forecast_worker``.
+
+    A run forecasts ``months`` consecutive months from ``forecast_month``.
+    At most one run per start month and horizon can be queued or running
+    at a time, so concurrent duplicate requests share a single run.
+    """
+    STATUS_CHOICES = [
+        ('QUEUED', 'Queued'),
+        ('RUNNING', 'Running'),
+        ('SUCCEEDED', 'Succeeded'),
+        ('FAILED', 'Failed'),
+    ]
+    ACTIVE_STATUSES = ['QUEUED', 'RUNNING']
+
+    forecast_month = models.DateField()
+    months = models.PositiveSmallIntegerField(default=1)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='QUEUED')
+    model_version = models.CharField(max_length=50, blank=True)
+    total_categories = models.PositiveIntegerField(default=0)
+    completed_categories = models.PositiveIntegerField(default=0)
+    forecasts_written = models.PositiveIntegerField(default=0)
+    # category name -> {"seconds": float, "forecasts": int, "error": str}
+    category_results = models.JSONField(default=dict, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['forecast_month', 'months'],
+                condition=models.Q(status__in=['QUEUED', 'RUNNING']),
+                name='forecastrun_one_active_per_horizon',
+            ),
+        ]
+
+    def __str__(self):
+        return f"ForecastRun {self.pk} {self.forecast_month:%Y-%m} +{self.months} - {self.status}"
+
+class DailySales(models.Model):
+    """Completed order lines summed per local day, category, outfit type and size.
+
+    Maintained by the signals in ``forecasting.signals`` and rebuilt with
+    ``manage.py backfill_daily_sales``; see ``forecasting.daily_sales``.
+    """
+    date = models.DateField()
+    category = models.ForeignKey(Category, on_delete=models.CASCADE)
+    outfit_type = models.CharField(max_length=50, blank=True)
+    size = models.CharField(max_length=20)
+    quantity = models.PositiveIntegerField()
+    # Quantity times the order's average SKU price
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'category', 'outfit_type', 'size'], name='dailysales_unique_key'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.category.name} {self.outfit_type} {self.size} - {self.quantity}"
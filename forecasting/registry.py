@@ -0,0 +1,133 @@
+"""Versioned store for trained forecasting models.
+
+Layout under ``FORECASTING_MODEL_DIR``::
+
+    manifest.json               active version, activation history, metrics
+    versions/<version>/...      artifacts written by DemandForecaster.save_artifacts
+
+Each process keeps the active forecaster in memory and only reloads it when
+the manifest points at a different version.
+"""
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+
+from .services import DemandForecaster
+
+MANIFEST_FILE = 'manifest.json'
+
+
+class RegistryError(Exception):
+    pass
+
+
+class ModelRegistry:
+    def __init__(self, root=None):
+        self.root = Path(root or getattr(settings, 'FORECASTING_MODEL_DIR', 'forecasting_models'))
+
+    @property
+    def manifest_path(self):
+        return self.root / MANIFEST_FILE
+
+    def version_dir(self, version):
+        return self.root / 'versions' / version
+
+    def read_manifest(self):
+        try:
+            return json.loads(self.manifest_path.read_text())
+        except FileNotFoundError:
+            return {'active': None, 'history': [], 'versions': {}}
+
+    def _write_manifest(self, manifest):
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps(manifest, indent=2))
+        os.replace(tmp_path, self.manifest_path)
+
+    def active_version(self):
+        return self.read_manifest()['active']
+
+    def save(self, forecaster, metrics=None, activate=True):
+        """Store ``forecaster`` as a new version and return its name."""
+        version = timezone.now().strftime('%Y%m%d-%H%M%S-%f')
+        staging = self.root / 'versions' / f'.{version}'
+        forecaster.save_artifacts(staging)
+        os.replace(staging, self.version_dir(version))
+
+        manifest = self.read_manifest()
+        manifest['versions'][version] = {
+            'created_at': timezone.now().isoformat(),
+            'metrics': metrics or {},
+        }
+        self._write_manifest(manifest)
+        if activate:
+            self.activate(version)
+        return version
+
+    def load(self, version):
+        if version not in self.read_manifest()['versions']:
+            raise RegistryError(f'Unknown model version: {version}')
+        forecaster = DemandForecaster()
+        forecaster.load_artifacts(self.version_dir(version))
+        return forecaster
+
+    def activate(self, version):
+        manifest = self.read_manifest()
+        if version not in manifest['versions']:
+            raise RegistryError(f'Unknown model version: {version}')
+        if manifest['active'] and manifest['active'] != version:
+            manifest['history'].append(manifest['active'])
+        manifest['active'] = version
+        self._write_manifest(manifest)
+
+    def rollback(self):
+        """Re-activate the previously active version and return it."""
+        manifest = self.read_manifest()
+        while manifest['history']:
+            version = manifest['history'].pop()
+            if version in manifest['versions']:
+                manifest['active'] = version
+                self._write_manifest(manifest)
+                return version
+        raise RegistryError('No earlier version to roll back to')
+
+    def delete(self, version):
+        manifest = self.read_manifest()
+        if version == manifest['active']:
+            raise RegistryError('Cannot delete the active version')
+        manifest['versions'].pop(version, None)
+        manifest['history'] = [v for v in manifest['history'] if v != version]
+        self._write_manifest(manifest)
+        shutil.rmtree(self.version_dir(version), ignore_errors=True)
+
+
+_cache_lock = threading.Lock()
+_cache = {'stat': None, 'current': (None, None)}
+
+
+def get_active_forecaster():
+    """``(version, forecaster)`` for the active model, or ``(None, None)`` if none is trained.
+
+    Costs one ``stat`` per call once warm; the manifest is only re-read when
+    it changes on disk, and models only reloaded when the active version moves.
+    """
+    registry = ModelRegistry()
+    try:
+        stat = os.stat(registry.manifest_path)
+        key = (str(registry.manifest_path), stat.st_mtime_ns, stat.st_size)
+    except FileNotFoundError:
+        key = None
+
+    if key != _cache['stat']:
+        with _cache_lock:
+            if key != _cache['stat']:
+                version = registry.active_version() if key else None
+                if version != _cache['current'][0]:
+                    _cache['current'] = (version, registry.load(version) if version else None)
+                _cache['stat'] = key
+    return _cache['current']
@@ -0,0 +1,158 @@
+"""Completed-order sales lines as a month-partitioned Parquet dataset.
+
+Layout under ``FORECASTING_SALES_DATASET``::
+
+    order_month=2025-01/<export>.parquet    one file per month per export
+    _watermark.json                          last exported (updated_at, order id)
+
+Rows are streamed from a server-side cursor and written batch by batch, so
+memory use does not grow with the size of the order history. Incremental
+exports only append orders whose last update is past the watermark; an
+order touched again after completion is appended again, and ``read_sales``
+keeps the newest copy of each line.
+"""
+import json
+import os
+import shutil
+import uuid
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils.dateparse import parse_datetime
+
+WATERMARK_FILE = '_watermark.json'
+PARTITION_COLUMN = 'order_month'
+DEFAULT_CHUNK_SIZE = 20000
+
+SCHEMA = pa.schema([
+    ('order_item_id', pa.int64()),
+    ('order_id', pa.int64()),
+    ('order_date', pa.date32()),
+    ('category', pa.string()),
+    ('size', pa.string()),
+    ('quantity', pa.int64()),
+    ('price', pa.float64()),
+    ('completed_at', pa.timestamp('us', tz='UTC')),
+])
+
+# One row per order line. Price is the order's average SKU price, looked up
+# per order so lines are never multiplied by the SKUs in their category.
+QUERY = """
+SELECT
+    oi.id AS order_item_id,
+    o.id AS order_id,
+    o.created_at::date AS order_date,
+    c.name AS category,
+    oi.size,
+    oi.quantity,
+    (SELECT AVG(sku.price)::float8 FROM sku_productsku sku WHERE sku.order_id = o.id) AS price,
+    o.updated_at AS completed_at
+FROM supplier_orderitem oi
+JOIN supplier_order o ON oi.order_id = o.id
+JOIN core_category c ON o.category_id = c.id
+WHERE o.status = 'COMPLETED'
+  {watermark_filter}
+ORDER BY o.updated_at, o.id, oi.id
+"""
+
+
+def dataset_path():
+    return Path(getattr(settings, 'FORECASTING_SALES_DATASET', 'sales_data'))
+
+
+def read_watermark(path):
+    try:
+        state = json.loads((Path(path) / WATERMARK_FILE).read_text())
+    except FileNotFoundError:
+        return None
+    return parse_datetime(state['completed_at']), state['order_id']
+
+
+def _write_watermark(path, completed_at, order_id):
+    target = Path(path) / WATERMARK_FILE
+    tmp_path = target.with_suffix('.tmp')
+    tmp_path.write_text(json.dumps({'completed_at': completed_at.isoformat(), 'order_id': order_id}))
+    os.replace(tmp_path, target)
+
+
+def _write_batches(cursor, root, chunk_size):
+    """Write cursor rows into per-month files under ``root``; return ``(rows, last_row)``."""
+    basename = f'{uuid.uuid4().hex}.parquet'
+    writers = {}
+    total = 0
+    last_row = None
+    try:
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            batch = pa.RecordBatch.from_arrays(
+                [pa.array(column, type=field.type) for column, field in zip(zip(*rows), SCHEMA)],
+                schema=SCHEMA,
+            )
+            months = pa.array([row[2].strftime('%Y-%m') for row in rows])
+            for month in months.unique().to_pylist():
+                part = batch.filter(pc.equal(months, month))
+                if month not in writers:
+                    directory = root / f'{PARTITION_COLUMN}={month}'
+                    directory.mkdir(parents=True, exist_ok=True)
+                    writers[month] = pq.ParquetWriter(directory / basename, SCHEMA)
+                writers[month].write_batch(part)
+            total += len(rows)
+            last_row = rows[-1]
+    finally:
+        for writer in writers.values():
+            writer.close()
+    return total, last_row
+
+
+def export_sales(path=None, incremental=False, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Export completed order lines and return the number of rows written.
+
+    A full export builds the dataset in a staging directory and swaps it in
+    at the end; an incremental one appends to the existing dataset.
+    """
+    root = Path(path or dataset_path())
+    watermark = read_watermark(root) if incremental else None
+    if watermark:
+        query = QUERY.format(watermark_filter='AND (o.updated_at, o.id) > (%s, %s)')
+        params = list(watermark)
+        target = root
+    else:
+        query = QUERY.format(watermark_filter='')
+        params = []
+        target = root.with_name(f'.{root.name}.staging')
+        shutil.rmtree(target, ignore_errors=True)
+        target.mkdir(parents=True)
+
+    # Server-side cursors only live inside a transaction
+    with transaction.atomic(), connection.chunked_cursor() as cursor:
+        cursor.execute(query, params)
+        total, last_row = _write_batches(cursor, target, chunk_size)
+
+    if last_row:
+        _write_watermark(target, last_row[7], last_row[1])
+
+    if target != root:
+        shutil.rmtree(root, ignore_errors=True)
+        os.replace(target, root)
+    return total
+
+
+def read_sales(path=None, columns=None):
+    """Load the dataset as a DataFrame, reading only ``columns`` when given.
+
+    Lines exported more than once by incremental runs are collapsed to the
+    most recent copy.
+    """
+    dataset = ds.dataset(path or dataset_path(), format='parquet', partitioning='hive')
+    wanted = list(columns) if columns else dataset.schema.names
+    read_columns = list(dict.fromkeys(wanted + ['order_item_id', 'completed_at']))
+    df = dataset.to_table(columns=read_columns).to_pandas()
+    df = df.sort_values('completed_at', kind='stable').drop_duplicates('order_item_id', keep='last')
+    return df[wanted].reset_index(drop=True)
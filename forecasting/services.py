@@ -1,18 +1,49 @@
+import json
+import numpy as np
 import pandas as pd
-import pickle
 from datetime import datetime, timedelta
-from prophet import Prophet
+from pathlib import Path
 import xgboost as xgb
 from sklearn.preprocessing import LabelEncoder
-from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_absolute_error
+from .engines import TOTAL_SERIES, get_engine
+
+XGB_FILE = 'xgb.ubj'
+ENCODERS_FILE = 'encoders.json'
+ENGINE_FILE = 'engine.json'
+DEFAULT_ENGINE = 'prophet'
+TREND_CACHE_SIZE = 1024
+
+# XGBoost feature columns; calendar columns come from calendar_features()
+FEATURE_SETS = {
+    'default': ['category_encoded', 'size_encoded', 'month', 'day_of_week'],
+    'calendar': ['category_encoded', 'size_encoded', 'month', 'day_of_week', 'day_of_month', 'week_of_year'],
+    'series': ['category_encoded', 'size_encoded'],
+}
+DEFAULT_FEATURES = 'default'
+
+def calendar_features(dates):
+    return pd.DataFrame({
+        'month': dates.dt.month,
+        'day_of_week': dates.dt.dayofweek,
+        'day_of_month': dates.dt.day,
+        'week_of_year': dates.dt.isocalendar().week.astype(int),
+    }, index=dates.index)
 
 class DemandForecaster:
-    def __init__(self):
-        self.prophet_model = None
+    def __init__(self, engine=DEFAULT_ENGINE, features=DEFAULT_FEATURES):
+        self.engine = get_engine(engine)
+        if features not in FEATURE_SETS:
+            raise ValueError(f"Unknown feature set: {features}. Choose from {', '.join(FEATURE_SETS)}")
+        self.feature_set = features
         self.xgb_model = None
         self.label_encoders = {}
+        self._trend_cache = {}
         
+    @property
+    def features(self):
+        return FEATURE_SETS[self.feature_set]
+    
     def prepare_data(self, df):
         # Aggregate daily sales by category and size
         df['order_date'] = pd.to_datetime(df['order_date'])
@@ -26,67 +57,149 @@ class DemandForecaster:
             
         return daily_sales
     
-    def train_prophet(self, df):
-        # Prophet expects 'ds' and 'y' columns
-        prophet_data = df.groupby('order_date')['quantity'].sum().reset_index()
-        prophet_data.columns = ['ds', 'y']
-        
-        self.prophet_model = Prophet(yearly_seasonality='auto', weekly_seasonality='auto')
-        self.prophet_model.fit(prophet_data)
+    def train_series(self, df, jobs=None):
+        """Fit the engine on the total, each category, and each category x
+        size with at least ``engine.min_series_days`` days of sales.
+
+        ``jobs`` is passed to engines that fit in a process pool. A series
+        that fails to fit is recorded in the returned report and predictions
+        fall back to its parent series.
+        """
+        series = {TOTAL_SERIES: df.groupby('order_date')['quantity'].sum()}
+        for category, rows in df.groupby('category'):
+            series[(category, None)] = rows.groupby('order_date')['quantity'].sum()
+        for (category, size), rows in df.groupby(['category', 'size']):
+            if rows['order_date'].nunique() >= self.engine.min_series_days:
+                series[(category, size)] = rows.groupby('order_date')['quantity'].sum()
+        # Days without sales are zero demand, not missing data
+        series = {key: history.asfreq('D', fill_value=0) for key, history in series.items()}
         
-    def train_xgboost(self, df):
-        # Features: category, size, month, day_of_week, price
-        df['month'] = df['order_date'].dt.month
-        df['day_of_week'] = df['order_date'].dt.dayofweek
+        report = self.engine.fit(series, jobs=jobs)
+        if TOTAL_SERIES not in self.engine:
+            raise RuntimeError(f"{self.engine.name} failed on total demand: {report[TOTAL_SERIES].get('error')}")
+        self._trend_cache = {}
+        return report
         
-        features = ['category_encoded', 'size_encoded', 'month', 'day_of_week']
-        X = df[features]
+    def train_xgboost(self, df, validation_fraction=0.2):
+        """Fit XGBoost on ``self.features`` and return its MAE on the most recent days.
+
+        The model is first fitted on the earlier days and scored on the
+        latest ``validation_fraction`` of them, so no future sales leak into
+        the score, then refitted on everything.
+        """
+        df = df.join(calendar_features(df['order_date']))
+        X = df[self.features]
         y = df['quantity']
         
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+        dates = df['order_date'].drop_duplicates().sort_values()
+        cutoff = dates.iloc[int(len(dates) * (1 - validation_fraction))]
+        train = df['order_date'] < cutoff
         
-        self.xgb_model = xgb.XGBRegressor(n_estimators=100, random_state=42)
-        self.xgb_model.fit(X_train, y_train)
+        validation_model = xgb.XGBRegressor(n_estimators=100, random_state=42)
+        validation_model.fit(X[train], y[train])
+        mae = mean_absolute_error(y[~train], validation_model.predict(X[~train]))
         
-        # Calculate accuracy
-        y_pred = self.xgb_model.predict(X_test)
-        mae = mean_absolute_error(y_test, y_pred)
+        self.xgb_model = xgb.XGBRegressor(n_estimators=100, random_state=42)
+        self.xgb_model.fit(X, y)
         return mae
     
     def predict_demand(self, category, size, forecast_date):
-        # Prophet prediction for overall trend
-        if self.prophet_model is None or self.xgb_model is None:
-            raise ValueError("Models must be trained before making predictions. Call train_prophet() and train_xgboost() first.")
+        results = self.predict_demand_batch([(category, size)], [forecast_date])
+        if not results:
+            raise ValueError(f"Unknown category/size combination: {category}/{size}")
+        return results[0]['predicted_demand'], results[0]['confidence']
+    
+    def _series_key(self, category, size):
+        """Most specific trained series covering a category/size pair."""
+        for key in ((category, size), (category, None)):
+            if key in self.engine:
+                return key
+        return TOTAL_SERIES
+    
+    def _trend(self, key, dates):
+        """Engine output for one series at ``dates``, memoised since it only depends on the two."""
+        cache_key = (key, tuple(dates))
+        if cache_key not in self._trend_cache:
+            if len(self._trend_cache) >= TREND_CACHE_SIZE:
+                self._trend_cache.clear()
+            yhat, yhat_upper = self.engine.predict(key, dates)
+            self._trend_cache[cache_key] = pd.DataFrame({
+                'forecast_date': dates,
+                # Trend relative to the series' own history, so every series scales XGBoost alike
+                'trend_factor': yhat / self.engine.means[key],
+                'yhat': yhat,
+                'yhat_upper': yhat_upper,
+            })
+        return self._trend_cache[cache_key]
+    
+    def predict_demand_batch(self, pairs, forecast_dates):
+        """Predict demand for every (category, size) pair at every date in one pass.
+
+        Each pair takes its trend from the most specific series trained for
+        it, the engine runs once per series for all dates, and XGBoost scores
+        a single feature matrix. Pairs whose category or size was not seen in training are
+        left out of the result rather than raising.
+        """
+        if TOTAL_SERIES not in self.engine or self.xgb_model is None:
+            raise ValueError("Models must be trained before making predictions. Call train_series() and train_xgboost() first.")
         
-        future_df = pd.DataFrame({'ds': [forecast_date]})
-        prophet_forecast = self.prophet_model.predict(future_df)
-        trend_factor = prophet_forecast['yhat'].iloc[0]
+        dates = pd.to_datetime(pd.Series(forecast_dates)).drop_duplicates().sort_values().reset_index(drop=True)
         
-        # XGBoost prediction for category/size specific demand
-        category_encoded = self.label_encoders['category'].transform([category])[0]
-        size_encoded = self.label_encoders['size'].transform([size])[0]
+        grid = pd.DataFrame(pairs, columns=['category', 'size']).drop_duplicates()
+        for col in ['category', 'size']:
+            classes = self.label_encoders[col].classes_
+            grid[f'{col}_encoded'] = grid[col].map(pd.Series(range(len(classes)), index=classes))
+        grid = grid.dropna(subset=['category_encoded', 'size_encoded'])
+        if grid.empty:
+            return []
         
-        features = [[category_encoded, size_encoded, forecast_date.month, forecast_date.weekday()]]
-        xgb_prediction = self.xgb_model.predict(features)[0]
+        grid['series'] = [self._series_key(c, sz) for c, sz in zip(grid['category'], grid['size'])]
+        trend = pd.concat(
+            [self._trend(key, dates).assign(series=[key] * len(dates)) for key in dict.fromkeys(grid['series'])],
+            ignore_index=True,
+        )
+        grid = grid.merge(trend, on='series')
+        features = grid[['category_encoded', 'size_encoded']].astype(int).join(calendar_features(grid['forecast_date']))
+        xgb_prediction = self.xgb_model.predict(features[self.features])
         
         # Combine predictions
-        final_prediction = max(1, int(xgb_prediction * (trend_factor / 10)))
-        confidence = min(0.9, prophet_forecast['yhat_upper'].iloc[0] / prophet_forecast['yhat'].iloc[0])
+        demand = np.maximum(1, (xgb_prediction * grid['trend_factor'].to_numpy()).astype(int))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            confidence = np.nan_to_num(np.minimum(0.9, grid['yhat_upper'].to_numpy() / grid['yhat'].to_numpy()), nan=0.9)
         
-        return final_prediction, confidence
+        return [{
+            'category': category,
+            'size': size,
+            'forecast_date': forecast_date.date(),
+            'predicted_demand': int(d),
+            'confidence': float(c),
+        } for category, size, forecast_date, d, c in zip(
+            grid['category'], grid['size'], grid['forecast_date'], demand, confidence
+        )]
     
-    def save_models(self, filepath='forecasting_models.pkl'):
-        models = {
-            'prophet': self.prophet_model,
-            'xgb': self.xgb_model,
-            'encoders': self.label_encoders
-        }
-        with open(filepath, 'wb') as f:
-            pickle.dump(models, f)
+    def save_artifacts(self, directory):
+        """Write each model in its native format: XGBoost UBJSON, engine state and encoders as JSON."""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        self.xgb_model.save_model(directory / XGB_FILE)
+        self.engine.save(directory)
+        (directory / ENGINE_FILE).write_text(json.dumps({'engine': self.engine.name, 'features': self.feature_set}))
+        encoders = {col: le.classes_.tolist() for col, le in self.label_encoders.items()}
+        (directory / ENCODERS_FILE).write_text(json.dumps(encoders))
     
-    def load_models(self, filepath='forecasting_models.pkl'):
-        with open(filepath, 'rb') as f:
-            models = pickle.load(f)
-        self.prophet_model = models['prophet']
-        self.xgb_model = models['xgb']
-        self.label_encoders = models['encoders']
\ No newline at end of file
+    def load_artifacts(self, directory):
+        directory = Path(directory)
+        self.xgb_model = xgb.XGBRegressor()
+        self.xgb_model.load_model(directory / XGB_FILE)
+        config = {'engine': DEFAULT_ENGINE}
+        if (directory / ENGINE_FILE).exists():
+            config = json.loads((directory / ENGINE_FILE).read_text())
+        self.engine = get_engine(config['engine'])
+        self.feature_set = config.get('features', DEFAULT_FEATURES)
+        self.engine.load(directory)
+        self._trend_cache = {}
+        self.label_encoders = {}
+        for col, classes in json.loads((directory / ENCODERS_FILE).read_text()).items():
+            le = LabelEncoder()
+            le.classes_ = np.array(classes, dtype=object)
+            self.label_encoders[col] = le
@@ -0,0 +1,66 @@
+import weakref
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+from supplier.models import Order, OrderItem
+from .daily_sales import local_date, refresh_daily_sales
+
+_UNKNOWN = object()
+
+
+def _refresh_on_commit(created_at):
+    # After commit, so order lines saved later in the same transaction (e.g. admin inlines) are included
+    day = local_date(created_at)
+    # One refresh per day per transaction, however many of its lines change. Holding the
+    # callbacks weakly drops the entries of a rollback, which discards its callbacks.
+    db = transaction.get_connection()
+    pending = db.__dict__.setdefault('daily_sales_pending', weakref.WeakValueDictionary())
+    if day in pending:
+        return
+
+    def refresh():
+        pending.pop(day, None)
+        refresh_daily_sales(day)
+    pending[day] = refresh
+    transaction.on_commit(refresh)
+
+
+@receiver(post_init, sender=Order)
+def remember_stored_status(sender, instance, **kwargs):
+    # A deferred status stays unknown rather than cost a query per loaded order
+    instance._stored_status = instance.__dict__.get('status', _UNKNOWN)
+
+
+@receiver(pre_save, sender=Order)
+def remember_order_status(sender, instance, **kwargs):
+    stored = getattr(instance, '_stored_status', _UNKNOWN)
+    if instance.pk is None:
+        instance._was_completed = False
+    elif stored is _UNKNOWN or instance._state.adding:
+        # Not loaded from the database (or status deferred), so ask it
+        instance._was_completed = Order.objects.filter(pk=instance.pk, status='COMPLETED').exists()
+    else:
+        instance._was_completed = stored == 'COMPLETED'
+
+
+@receiver(post_save, sender=Order)
+def order_saved(sender, instance, update_fields=None, **kwargs):
+    if instance.status == 'COMPLETED' or getattr(instance, '_was_completed', False):
+        _refresh_on_commit(instance.created_at)
+    if update_fields is None or 'status' in update_fields:
+        instance._stored_status = instance.status
+
+
+@receiver(post_delete, sender=Order)
+def order_deleted(sender, instance, **kwargs):
+    if instance.status == 'COMPLETED':
+        _refresh_on_commit(instance.created_at)
+
+
+@receiver(post_save, sender=OrderItem)
+@receiver(post_delete, sender=OrderItem)
+def order_item_changed(sender, instance, **kwargs):
+    order = Order.objects.filter(pk=instance.order_id, status='COMPLETED').values('created_at').first()
+    if order:
+        _refresh_on_commit(order['created_at'])
@@ -0,0 +1,213 @@
+import tempfile
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from django.db import connection, transaction
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from core.models import Category
+from sku.models import ProductSKU
+from supplier.models import Order, OrderItem, Supplier
+from .daily_sales import DAY_LOCK_CLASS, local_date, refresh_daily_sales
+from .engines import SmoothingEngine
+from .forecasts import cache_key, horizon_forecasts, month_range
+from .models import DailySales, DemandForecast
+
+
+class DailySalesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name='Bridal', prefix='BR')
+        cls.supplier = Supplier.objects.create(name='Weaves', email='w@example.com', region='North')
+
+    def completed_order(self, *quantities):
+        order = Order.objects.create(category=self.category, outfit_type='Lehenga', supplier=self.supplier)
+        ProductSKU.objects.create(category=self.category, supplier=self.supplier, order=order, price=Decimal('100.00'))
+        for quantity in quantities:
+            OrderItem.objects.create(order=order, description='Lehenga', color='Red', size='M', quantity=quantity)
+        order.status = 'COMPLETED'
+        order.save()
+        return order
+
+    def test_refresh_is_idempotent_and_drops_stale_rows(self):
+        order = self.completed_order(2, 3)
+        day = local_date(order.created_at)
+        self.assertEqual(refresh_daily_sales(day), 1)
+        self.assertEqual(refresh_daily_sales(day), 1)
+        row = DailySales.objects.get()
+        self.assertEqual((row.quantity, row.revenue), (5, Decimal('500.00')))
+
+        Order.objects.filter(pk=order.pk).update(status='CANCELLED')
+        self.assertEqual(refresh_daily_sales(day), 0)
+        self.assertFalse(DailySales.objects.exists())
+
+    def test_one_refresh_per_day_per_transaction(self):
+        # Created without signals, so no refresh is pending yet
+        order, = Order.objects.bulk_create([
+            Order(category=self.category, outfit_type='Lehenga', supplier=self.supplier, status='COMPLETED'),
+        ])
+        with self.captureOnCommitCallbacks() as callbacks:
+            for quantity in (1, 2, 3):
+                OrderItem.objects.create(order=order, description='Lehenga', color='Red', size='L', quantity=quantity)
+        self.assertEqual(len(callbacks), 1)
+
+    def test_rolled_back_refresh_is_not_pending(self):
+        order, = Order.objects.bulk_create([
+            Order(category=self.category, outfit_type='Lehenga', supplier=self.supplier, status='COMPLETED'),
+        ])
+        with self.captureOnCommitCallbacks() as callbacks:
+            try:
+                with transaction.atomic():
+                    OrderItem.objects.create(order=order, description='Lehenga', color='Red', size='L', quantity=1)
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            OrderItem.objects.create(order=order, description='Lehenga', color='Red', size='L', quantity=2)
+        self.assertEqual(len(callbacks), 1)
+
+    def test_saving_a_loaded_order_does_not_query_its_status(self):
+        order = self.completed_order()
+        order = Order.objects.get(pk=order.pk)
+        order.status = 'CANCELLED'
+        with CaptureQueriesContext(connection) as queries, self.captureOnCommitCallbacks() as callbacks:
+            order.save()
+        self.assertFalse([query for query in queries if query['sql'].startswith('SELECT')])
+        # Leaving COMPLETED still refreshes the day
+        self.assertEqual(len(callbacks), 1)
+
+    def test_refresh_runs_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.completed_order(4)
+        self.assertEqual(DailySales.objects.get().quantity, 4)
+
+    def test_refresh_locks_the_days(self):
+        if connection.vendor != 'postgresql':
+            self.skipTest('advisory locks are PostgreSQL only')
+        day = timezone.localdate()
+        refresh_daily_sales(day)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT count(*) FROM pg_locks WHERE locktype = 'advisory' AND classid = %s AND pid = pg_backend_pid()",
+                [DAY_LOCK_CLASS],
+            )
+            # Held by the test transaction until it rolls back
+            self.assertEqual(cursor.fetchone()[0], 1)
+
+
+class ForecastListTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name='Bridal', prefix='BR')
+        DemandForecast.objects.bulk_create(
+            DemandForecast(category=category, size=size, predicted_demand=10, forecast_month=date(2025, 1, 1),
+                           confidence_score=0.8)
+            for size in ('S', 'M', 'L')
+        )
+
+    def test_limit(self):
+        response = self.client.get('/api/forecast/', {'limit': 2})
+        self.assertEqual(len(response.json()['forecasts']), 2)
+        response = self.client.get('/api/forecast/', {'limit': 10000})
+        self.assertEqual(len(response.json()['forecasts']), 3)
+
+    def test_rejects_bad_limit(self):
+        for limit in ('-1', '0', 'ten', '2.5'):
+            with self.subTest(limit=limit):
+                self.assertEqual(self.client.get('/api/forecast/', {'limit': limit}).status_code, 400)
+
+
+
+class FakeForecaster:
+    def __init__(self):
+        self.calls = []
+
+    def predict_demand_batch(self, pairs, dates):
+        self.calls.append((pairs, dates))
+        return [
+            {'category': name, 'size': size, 'forecast_date': day, 'predicted_demand': 5, 'confidence': 0.9}
+            for name, size in pairs for day in dates
+        ]
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'forecast-tests'}})
+class HorizonForecastTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.categories = [Category.objects.create(name=name, prefix=name[:2].upper()) for name in ('Bridal', 'Casual')]
+        self.months = month_range(date(2026, 1, 1), 3)
+
+    def test_cached_per_month(self):
+        forecaster = FakeForecaster()
+        first = horizon_forecasts('v1', forecaster, self.categories, ['S', 'M'], self.months)
+        self.assertEqual(len(first), 12)
+        self.assertEqual(len(forecaster.calls), 1)
+        # One entry per month holds every category and size
+        self.assertEqual(len(cache.get(cache_key('v1', self.months[0]))), 4)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(horizon_forecasts('v1', forecaster, self.categories, ['S', 'M'], self.months), first)
+        self.assertEqual(len(forecaster.calls), 1)
+
+    def test_stored_rows_refill_the_cache(self):
+        forecaster = FakeForecaster()
+        horizon_forecasts('v1', forecaster, self.categories, ['S'], self.months)
+        cache.clear()
+        self.assertEqual(len(horizon_forecasts('v1', forecaster, self.categories, ['S'], self.months)), 6)
+        self.assertEqual(len(forecaster.calls), 1)
+        self.assertEqual(len(cache.get(cache_key('v1', self.months[0]))), 2)
+
+class SmoothingEngineTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        days = pd.date_range('2025-01-01', periods=140, freq='D')
+        # Weekends sell double; one series only starts selling in March
+        weekly = pd.Series(np.where(days.dayofweek >= 5, 20.0, 10.0), index=days)
+        cls.series = {
+            ('Bridal', 'M'): weekly,
+            ('Bridal', 'L'): weekly[59:],
+            # Four units every fifth day
+            ('Party', 'XS'): pd.Series(np.where(np.arange(len(days)) % 5 == 0, 4.0, 0.0), index=days),
+        }
+        cls.engine = SmoothingEngine()
+        cls.report = cls.engine.fit(cls.series)
+        cls.future = pd.date_range(days[-1] + pd.Timedelta(days=1), periods=14, freq='D')
+
+    def test_methods_follow_demand_intervals(self):
+        self.assertEqual({key: report['method'] for key, report in self.report.items()}, {
+            ('Bridal', 'M'): 'holt_winters',
+            ('Bridal', 'L'): 'holt_winters',
+            ('Party', 'XS'): 'croston',
+        })
+        self.assertEqual(self.report[('Bridal', 'L')]['days'], 81)
+
+    def test_holt_winters_keeps_the_weekly_season(self):
+        for key in (('Bridal', 'M'), ('Bridal', 'L')):
+            yhat, upper = self.engine.predict(key, self.future)
+            weekend = self.future.dayofweek >= 5
+            np.testing.assert_allclose(yhat[~weekend], 10.0, atol=1.5)
+            # Seasons start at zero, so the shorter history has not fully learnt the weekend peak
+            self.assertGreater(yhat[weekend].min(), yhat[~weekend].max() + 5)
+            self.assertTrue((upper >= yhat).all())
+
+    def test_croston_forecasts_the_demand_rate(self):
+        yhat, _ = self.engine.predict(('Party', 'XS'), self.future)
+        self.assertEqual(len(set(yhat.round(6))), 1)
+        # Four units per five days, less the Syntetos-Boylan correction
+        self.assertAlmostEqual(yhat[0], 0.8, delta=0.1)
+        self.assertLess(yhat[0], 0.8)
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.engine.save(Path(directory))
+            loaded = SmoothingEngine()
+            loaded.load(Path(directory))
+        self.assertEqual(loaded.report, self.report)
+        for key in self.series:
+            np.testing.assert_array_equal(loaded.predict(key, self.future)[0], self.engine.predict(key, self.future)[0])
@@ -3,5 +3,6 @@ from . import views
 
 urlpatterns = [
     path('generate/', views.generate_forecast, name='generate_forecast'),
+    path('runs/<int:run_id>/', views.forecast_run_detail, name='forecast_run_detail'),
     path('', views.get_forecasts, name='get_forecasts'),
 ]
\ No newline at end of file
@@ -1,67 +1,130 @@
+from django.shortcuts import get_object_or_404
+from rest_framework import status
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
-from datetime import datetime, timedelta
+from rest_framework.reverse import reverse
+from datetime import datetime
 from core.models import Category
-from .models import DemandForecast
-from .services import DemandForecaster
-import os
+from .forecasts import MAX_HORIZON_MONTHS, horizon_forecasts, month_range
+from .jobs import enqueue_run, next_month_start, run_to_dict
+from .models import DemandForecast, ForecastRun
+from .registry import get_active_forecaster
+
+MAX_LIST_LIMIT = 500
+
+def _parse_month(value):
+    return datetime.strptime(value, '%Y-%m').date()
+
+def _parse_months(value):
+    months = int(value)
+    if not 1 <= months <= MAX_HORIZON_MONTHS:
+        raise ValueError
+    return months
+
+def _parse_limit(value):
+    limit = int(value)
+    if limit < 1:
+        raise ValueError
+    return min(limit, MAX_LIST_LIMIT)
 
 @api_view(['POST'])
 def generate_forecast(request):
-    """Generate demand forecast for next month"""
-    forecaster = DemandForecaster()
+    """Queue a demand forecast run for `months` months (default 1) from `month` (default next month)"""
+    try:
+        month = request.data.get('month')
+        forecast_month = _parse_month(month) if month else next_month_start()
+    except (TypeError, ValueError):
+        return Response({'error': 'month must be in YYYY-MM format'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        months = _parse_months(request.data.get('months', 1))
+    except (TypeError, ValueError):
+        return Response({'error': f'months must be between 1 and {MAX_HORIZON_MONTHS}'}, status=status.HTTP_400_BAD_REQUEST)
     
-    if not os.path.exists('forecasting_models.pkl'):
-        return Response({'error': 'Models not trained. Run train_models command first.'}, status=400)
-    
-    forecaster.load_models()
-    
-    # Get next month date
-    next_month = datetime.now().replace(day=1) + timedelta(days=32)
-    next_month = next_month.replace(day=1)
+    run, created = enqueue_run(forecast_month, months)
+    return Response({
+        'run_id': run.id,
+        'status': run.status,
+        'forecast_month': run.forecast_month,
+        'months': run.months,
+        'created': created,
+        'status_url': reverse('forecast_run_detail', args=[run.id], request=request),
+    }, status=status.HTTP_202_ACCEPTED)
+
+@api_view(['GET'])
+def forecast_run_detail(request, run_id):
+    """Status and per-category progress of a forecast run"""
+    run = get_object_or_404(ForecastRun, pk=run_id)
+    return Response(run_to_dict(run))
+
+@api_view(['GET'])
+def get_forecasts(request):
+    """Stored forecasts filtered by `category` (id or name), `size` and `from`/`to` months.
+
+    With `months=N` returns the N-month horizon from `from` (default next
+    month) for the active model instead, computing any forecasts that are
+    not cached or stored yet.
+    """
+    params = request.query_params
+    try:
+        start = _parse_month(params['from']) if params.get('from') else None
+        end = _parse_month(params['to']) if params.get('to') else None
+    except ValueError:
+        return Response({'error': 'from and to must be in YYYY-MM format'}, status=status.HTTP_400_BAD_REQUEST)
     
-    forecasts = []
     categories = Category.objects.all()
-    sizes = ['XS', 'S', 'M', 'L', 'XL', 'XXL']  # Common sizes
+    category = params.get('category')
+    if category:
+        categories = categories.filter(pk=category) if category.isdigit() else categories.filter(name__iexact=category)
+    size = params.get('size')
     
-    for category in categories:
-        for size in sizes:
-            try:
-                demand, confidence = forecaster.predict_demand(category.name, size, next_month)
-                
-                # Save to database
-                forecast, created = DemandForecast.objects.update_or_create(
-                    category=category,
-                    size=size,
-                    forecast_month=next_month,
-                    defaults={
-                        'predicted_demand': demand,
-                        'confidence_score': confidence
-                    }
-                )
-                
-                forecasts.append({
-                    'category': category.name,
-                    'size': size,
-                    'predicted_demand': demand,
-                    'confidence_score': round(confidence, 2)
-                })
-            except Exception as e:
-                continue
+    if params.get('months'):
+        try:
+            months = _parse_months(params['months'])
+        except ValueError:
+            return Response({'error': f'months must be between 1 and {MAX_HORIZON_MONTHS}'}, status=status.HTTP_400_BAD_REQUEST)
+        model_version, forecaster = get_active_forecaster()
+        if forecaster is None:
+            return Response({'error': 'Models not trained. Run train_models command first.'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        categories = list(categories.order_by('name', 'id'))
+        sizes = [size] if size else list(forecaster.label_encoders['size'].classes_)
+        forecast_months = month_range(start or next_month_start(), months)
+        results = horizon_forecasts(model_version, forecaster, categories, sizes, forecast_months)
+        
+        data = [{
+            'category': c.name,
+            'size': s,
+            'predicted_demand': results[(c.id, s, m)]['predicted_demand'],
+            'confidence_score': round(results[(c.id, s, m)]['confidence_score'], 2),
+            'forecast_month': m,
+        } for c in categories for s in sizes for m in forecast_months if (c.id, s, m) in results]
+        return Response({'model_version': model_version, 'forecasts': data})
     
-    return Response({'forecasts': forecasts})
-
-@api_view(['GET'])
-def get_forecasts(request):
-    """Get existing forecasts"""
-    forecasts = DemandForecast.objects.select_related('category').order_by('-created_at')[:50]
+    forecasts = DemandForecast.objects.select_related('category')
+    if category:
+        forecasts = forecasts.filter(category__in=categories)
+    if size:
+        forecasts = forecasts.filter(size=size)
+    if start:
+        forecasts = forecasts.filter(forecast_month__gte=start)
+    if end:
+        forecasts = forecasts.filter(forecast_month__lte=end)
+    if category or size or start or end:
+        forecasts = forecasts.order_by('forecast_month', 'category__name', 'size')
+    else:
+        forecasts = forecasts.order_by('-created_at')
+    try:
+        limit = _parse_limit(params.get('limit', 50))
+    except ValueError:
+        return Response({'error': 'limit must be a positive integer'}, status=status.HTTP_400_BAD_REQUEST)
     
     data = [{
         'category': f.category.name,
         'size': f.size,
         'predicted_demand': f.predicted_demand,
         'confidence_score': f.confidence_score,
-        'forecast_month': f.forecast_month
-    } for f in forecasts]
+        'forecast_month': f.forecast_month,
+        'model_version': f.model_version,
+    } for f in forecasts[:limit]]
     
-    return Response({'forecasts': data})
\ No newline at end of file
+    return Response({'forecasts': data})
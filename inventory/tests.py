@@ -1,3 +1,103 @@
-from django.test import TestCase
+from decimal import Decimal
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from core.fastlist import fast_rows
+from core.models import Category, OutfitType
+from core.renderers import ORJSONRenderer
+from sku.models import ProductSKU
+from supplier.models import Order, Supplier
+from .models import InventoryItem
+from .serializers import InventoryListSerializer
+from .views import InventoryViewSet
+
+LOCMEM = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'inventory-tests'}}
+
+
+class InventoryTestData:
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name='Bridal', prefix='BR')
+        outfit_type = OutfitType.objects.create(name='Lehenga', code='LHG')
+        supplier = Supplier.objects.create(name='Weaves', email='w@example.com', region='North')
+        order = Order.objects.create(category=cls.category, outfit_type='Lehenga', supplier=supplier)
+        cls.items = [
+            InventoryItem.objects.create(quantity=quantity, sku=ProductSKU.objects.create(
+                sku_code=code, category=cls.category, outfit_type=outfit, supplier=supplier, order=order,
+                price=Decimal('2500.00'),
+            ))
+            for code, outfit, quantity in [('BR-LHG-1', outfit_type, 3), ('BR-2', None, 0), (None, outfit_type, 7)]
+        ]
+
+
+@override_settings(CACHES=LOCMEM)
+class ConditionalGetTests(InventoryTestData, TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def get(self, path='/api/inventory/', **headers):
+        return self.client.get(path, **headers)
+
+    def test_unchanged_list_is_not_modified(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Last-Modified', response)
+
+        # Only the aggregate behind the validators runs
+        with self.assertNumQueries(1):
+            response = self.get(HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_writes_change_the_etag(self):
+        etag = self.get()['ETag']
+        item = self.items[0]
+        item.quantity += 1
+        item.save()
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        etag = self.get()['ETag']
+        self.items[1].delete()
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_renamed_category_changes_the_etag(self):
+        etag = self.get()['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.category.name = 'Bridal Wear'
+            self.category.save()
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Bridal Wear', response.content.decode())
+
+    def test_etag_depends_on_path_and_format(self):
+        etags = {self.get(path)['ETag'] for path in (
+            '/api/inventory/', '/api/inventory/?format=json', f'/api/inventory/{self.items[0].pk}/',
+        )}
+        self.assertEqual(len(etags), 3)
+
+    def test_detail_is_not_modified(self):
+        path = f'/api/inventory/{self.items[0].pk}/'
+        response = self.get(path)
+        self.assertEqual(self.get(path, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        self.assertEqual(self.get(path, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code, 304)
+
+
+class FastListTests(InventoryTestData, TestCase):
+    def test_fast_rows_match_the_serializer(self):
+        queryset = InventoryViewSet.queryset.order_by('pk')
+        expected = InventoryListSerializer(queryset, many=True).data
+        rows = fast_rows(queryset, InventoryListSerializer())
+        self.assertEqual(rows, expected)
+        # The SKU without an outfit type leaves the key out, as the serializer does
+        self.assertNotIn('outfit_type', rows[1])
+        self.assertEqual(ORJSONRenderer().render(rows), JSONRenderer().render(expected))
+
+    def test_list_endpoint_serves_the_fast_rows(self):
+        request = Request(APIRequestFactory().get('/api/inventory/'))
+        expected = InventoryListSerializer(InventoryViewSet.queryset, many=True, context={'request': request}).data
+        response = self.client.get('/api/inventory/')
+        self.assertEqual(sorted(response.json(), key=str), sorted(map(dict, expected), key=str))
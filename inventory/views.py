@@ -2,6 +2,8 @@ from rest_framework import viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.shortcuts import render
+from core.conditional import ConditionalGetMixin
+from core.fastlist import FastListMixin
 from .models import Discrepancy, InventoryItem
 from .serializers import DiscrepancySerializer, InventoryItemSerializer, InventoryListSerializer
 
@@ -13,9 +15,11 @@ class DiscrepancyViewSet(viewsets.ModelViewSet):
     queryset = Discrepancy.objects.all()
     serializer_class = DiscrepancySerializer
 
-class InventoryViewSet(viewsets.ModelViewSet):
+class InventoryViewSet(ConditionalGetMixin, FastListMixin, viewsets.ModelViewSet):
     queryset = InventoryItem.objects.select_related('sku__category', 'sku__outfit_type').all()
     serializer_class = InventoryItemSerializer
+    conditional_timestamps = ['updated_at', 'sku__updated_at']
+    conditional_reference_kinds = ['categories', 'outfit_types']
 
     def get_serializer_class(self) -> type:
         if self.action == 'list':
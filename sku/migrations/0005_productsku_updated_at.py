@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:05
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def copy_created_at(apps, schema_editor):
+    ProductSKU = apps.get_model('sku', 'ProductSKU')
+    ProductSKU.objects.update(updated_at=models.F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sku', '0004_productsku_order_productsku_supplier_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productsku',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(copy_created_at, migrations.RunPython.noop),
+    ]
@@ -13,6 +13,7 @@ class ProductSKU(models.Model):
     variation_id = models.CharField(max_length=100, blank=True, null=True)
     barcode_image = models.ImageField(upload_to='barcodes/', blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.sku_code or "Unknown SKU"
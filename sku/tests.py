@@ -1,3 +1,61 @@
+from decimal import Decimal
+
 from django.test import TestCase
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from core.fastlist import Unsupported, compile_serializer, fast_rows
+from core.models import Category, OutfitType
+from core.renderers import ORJSONRenderer
+from supplier.models import Order, Supplier
+from .models import ProductSKU
+from .serializers import ProductSKUSerializer
+
+
+class FastListTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name='Bridal', prefix='BR')
+        outfit_type = OutfitType.objects.create(name='Lehenga', code='LHG')
+        supplier = Supplier.objects.create(name='Weaves', email='w@example.com', region='North')
+        order = Order.objects.create(category=category, outfit_type='Lehenga', supplier=supplier)
+        ProductSKU.objects.create(
+            sku_code='BR-LHG-1', category=category, outfit_type=outfit_type, supplier=supplier, order=order,
+            price=Decimal('2500.00'), barcode_image='barcodes/BR-LHG-1.png',
+        )
+        ProductSKU.objects.create(category=category, supplier=supplier, order=order, price=Decimal('999.50'))
+
+    def setUp(self):
+        self.context = {'request': Request(APIRequestFactory().get('/api/sku/'))}
+
+    def test_fast_rows_match_the_serializer(self):
+        queryset = ProductSKU.objects.order_by('pk')
+        expected = ProductSKUSerializer(queryset, many=True, context=self.context).data
+        rows = fast_rows(queryset, ProductSKUSerializer(context=self.context))
+        self.assertEqual(rows, expected)
+        self.assertEqual([list(row) for row in rows], [list(row) for row in expected])
+        self.assertEqual(rows[0]['barcode_image'], 'http://testserver/media/barcodes/BR-LHG-1.png')
+        self.assertEqual(ORJSONRenderer().render(rows), JSONRenderer().render(expected))
+
+    def test_nested_serializer_shares_the_query(self):
+        paths, _ = compile_serializer(ProductSKUSerializer(context=self.context), ProductSKU)
+        self.assertIn('category__name', paths)
+        with self.assertNumQueries(1):
+            fast_rows(ProductSKU.objects.all(), ProductSKUSerializer(context=self.context))
+
+    def test_unsupported_sources_are_refused(self):
+        class WithMethod(ProductSKUSerializer):
+            order_status = serializers.SerializerMethodField()
+
+            def get_order_status(self, obj):
+                return obj.order.status
+
+        with self.assertRaises(Unsupported):
+            compile_serializer(WithMethod(), ProductSKU)
 
-# Create your tests here.
+    def test_list_endpoint(self):
+        response = self.client.get('/api/sku/')
+        expected = ProductSKUSerializer(ProductSKU.objects.all(), many=True, context=self.context).data
+        self.assertEqual(sorted(response.json(), key=lambda row: row['id']), sorted(expected, key=lambda row: row['id']))
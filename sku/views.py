@@ -6,6 +6,9 @@ from django.db.models import Max
 from .models import ProductSKU
 from .serializers import ProductSKUSerializer
 from .utils import generate_barcode_image
+from core import reference
+from core.conditional import ConditionalGetMixin
+from core.fastlist import FastListMixin
 from core.models import Category, OutfitType
 from supplier.models import Supplier, Order
 import datetime
@@ -25,10 +28,10 @@ def sku_generate(request):
         if not all([category_id, outfit_type_id, supplier_id, order_id, price]):
             context = {
                 'error': 'All fields are required',
-                'categories': Category.objects.all(),
-                'outfit_types': OutfitType.objects.all(),
-                'suppliers': Supplier.objects.all(),
-                'orders': Order.objects.all()
+                'categories': reference.get('categories'),
+                'outfit_types': reference.get('outfit_types'),
+                'suppliers': reference.get('suppliers'),
+                'orders': Order.objects.select_related('supplier').only('id', 'supplier__name')
             }
             return render(request, 'sku/sku_generate.html', context)
         
@@ -66,10 +69,10 @@ def sku_generate(request):
         return redirect('/sku/')
     
     context = {
-        'categories': Category.objects.all(),
-        'outfit_types': OutfitType.objects.all(),
-        'suppliers': Supplier.objects.all(),
-        'orders': Order.objects.select_related('supplier').all()
+        'categories': reference.get('categories'),
+        'outfit_types': reference.get('outfit_types'),
+        'suppliers': reference.get('suppliers'),
+        'orders': Order.objects.select_related('supplier').only('id', 'supplier__name')
     }
     return render(request, 'sku/sku_generate.html', context)
 
@@ -91,9 +94,10 @@ def sku_delete(request, pk):
     sku.delete()
     return redirect('/sku/')
 
-class ProductSKUViewSet(viewsets.ModelViewSet):
+class ProductSKUViewSet(ConditionalGetMixin, FastListMixin, viewsets.ModelViewSet):
     queryset = ProductSKU.objects.all()
     serializer_class = ProductSKUSerializer
+    conditional_reference_kinds = ['categories']
 
     @action(detail=False, methods=['post'], url_path='generate')
     def generate_sku(self, request):
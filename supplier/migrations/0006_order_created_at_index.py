@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_outfittype'),
+        ('supplier', '0005_purchaseorder_is_discrepancy'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['created_at'], name='supplier_order_created_idx'),
+        ),
+    ]
@@ -8,6 +8,7 @@ class Supplier(models.Model):
     name = models.CharField(max_length=255)
     email = models.EmailField()
     region = models.CharField(max_length=100)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.name
@@ -29,6 +30,12 @@ class Order(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Day-range scans when refreshing forecasting.DailySales
+            models.Index(fields=['created_at'], name='supplier_order_created_idx'),
+        ]
+
     def __str__(self):
         return f"Order {self.id} - {self.supplier.name}"
 
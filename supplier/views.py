@@ -12,6 +12,7 @@ import uuid
 import qrcode
 from .models import Supplier, Order, OrderItem, SecureOrderLink, PurchaseOrder, PurchaseOrderItem
 from .serializers import SupplierSerializer, OrderSerializer, OrderItemSerializer
+from core import reference
 
 
 def supplier_list(request):
@@ -133,8 +134,7 @@ def secure_order_form(request, token):
         return redirect(reverse('supplier:po_qr', args=[po.pk]))
 
     # GET
-    from core.models import Category
-    categories = Category.objects.all()
+    categories = reference.get('categories')
     supplier = link.supplier
     return render(request, 'supplier/order_form.html', {'link': link, 'categories': categories, 'supplier': supplier})
 
@@ -185,9 +185,10 @@ def po_qr_view(request, pk):
     })
 
 
-class SupplierViewSet(viewsets.ModelViewSet):
+class SupplierViewSet(reference.ReferenceListMixin, viewsets.ModelViewSet):
     queryset = Supplier.objects.all()
     serializer_class = SupplierSerializer
+    reference_kind = 'suppliers'
 
 
 class OrderViewSet(viewsets.ModelViewSet):